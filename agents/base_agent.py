@@ -1,5 +1,8 @@
 import abc
 
+from .context_window import context_window
+from .validator import get_validator_or_none
+
 class BaseAgent(abc.ABC):
     """
     모든 에이전트 클래스가 상속받아야 하는 추상 기본 클래스입니다.
@@ -8,6 +11,14 @@ class BaseAgent(abc.ABC):
     에이전트 시스템의 구조를 통일하고 확장성을 보장합니다.
     """
     
+    # 답변 검증 서비스 (agents.validator.ValidatorService). AgentRouter가 공유 인스턴스를 주입하며,
+    # 없으면 검증을 요청받았을 때 프로세스 공유 싱글턴을 사용합니다.
+    validator = None
+    # 대화 기록을 변환한 메시지 목록의 캐시 구분자. 같은 메시지 형식을 쓰는 에이전트는 캐시를 공유합니다.
+    history_format = "chat"
+    # 대화 기록에 쓸 수 있는 토큰 예산 (agents.context_window). None이면 기록 전체를 보냅니다.
+    context_budget = None
+
     def __init__(self):
         self.name = "기본 에이전트"
         self.description = "기본적인 LLM 응답을 생성하는 에이전트입니다."
@@ -25,6 +36,65 @@ class BaseAgent(abc.ABC):
             use_validation (bool): 결과 검증 여부.
             
         Returns:
-            dict: 응답 콘텐츠와 소스 정보를 포함하는 딕셔너리.
+            dict: 응답 콘텐츠와 소스 정보를 포함하는 딕셔너리. 요청에 따라 표시 이름이 달라지면
+                  agent_name(과 agent_description)을 함께 담습니다. 에이전트는 여러 요청이 동시에 공유하므로
+                  self.name 등 속성을 요청마다 바꾸지 않습니다.
         """
         raise NotImplementedError("하위 클래스는 process_request() 메서드를 반드시 구현해야 합니다.")
+
+    async def stream_request(self, prompt, chat_history):
+        """
+        응답을 생성되는 대로 이벤트 단위로 전달하는 비동기 제너레이터입니다.
+
+        토큰 스트리밍을 지원하는 하위 클래스는 이 메서드를 재정의하여 `token` 이벤트를
+        순서대로 보낸 뒤, 마지막에 `message` 이벤트를 보냅니다. 텍스트 응답의 `message`는
+        렌더링 전 원본 텍스트(response_text)를 담고, HTML 렌더링은 호출자(AgentRouter)가
+        검증 요청과 겹쳐서 수행합니다. 이미지처럼 이미 HTML인 응답은 response_content로 전달합니다.
+        기본 구현은 process_request 결과를 하나의 `message` 이벤트로 전달합니다.
+
+        Args:
+            prompt (str): 사용자의 현재 프롬프트.
+            chat_history (list): 이전 대화 기록.
+
+        Yields:
+            dict: {"event": "token", "data": {"text": ...}} 또는
+                  {"event": "message", "data": {"response_text" | "response_content": ..., "source_info": [...]}}
+        """
+        response_data = await self.process_request(prompt, chat_history, False)
+        yield {"event": "message", "data": response_data}
+
+    def format_history_turn(self, turn):
+        """대화 기록 한 턴({"role", "parts"})을 공급자 메시지 형식으로 변환합니다. 기본은 role/content 형식입니다."""
+        return {"role": "user" if turn["role"] == "user" else "assistant", "content": turn["parts"][0]["text"]}
+
+    def format_history(self, chat_history):
+        """
+        chat_history를 토큰 예산(context_budget)에 맞게 줄인 뒤 공급자 메시지 목록으로 변환합니다.
+
+        예산을 넘는 이전 턴은 요약 턴으로 대체됩니다(agents.context_window.ContextWindow).
+        서버 대화 저장소의 기록(utils.conversation_store.ConversationHistory)이면 대화에 캐시된
+        변환 결과를 재사용하고 새 턴만 변환합니다. 반환된 목록은 호출자가 수정해도 됩니다.
+        """
+        chat_history = context_window.fit(chat_history, self.context_budget)
+        formatted = getattr(chat_history, "formatted", None)
+        if formatted is not None:
+            return formatted(self.history_format, self.format_history_turn)
+        return [self.format_history_turn(turn) for turn in chat_history]
+
+    def get_validator(self):
+        """이 에이전트가 사용할 검증 서비스를 반환합니다. 검증 모델이 설정되지 않았으면 None을 반환합니다."""
+        return self.validator or get_validator_or_none()
+
+    async def _call_validation_agent(self, original_prompt, generated_content, chat_history):
+        """
+        공유 검증 서비스로 답변을 채점하고, 필요하면 개선된 답변을 생성합니다.
+
+        Args:
+            original_prompt (str): 사용자의 원본 프롬프트.
+            generated_content (str): 렌더링 전 원본 답변 텍스트(마크다운).
+            chat_history (list): 이전 대화 기록.
+
+        Returns:
+            dict: scores, average_score, feedback_html, reconsideration_prompt, refinement_content 등.
+        """
+        return await self.get_validator().validate(original_prompt, generated_content)
@@ -0,0 +1,273 @@
+# agents/context_window.py
+# 2026-10-17 KST: 토큰 예산 기반 대화 기록 윈도잉
+#   - 최근 턴은 그대로 보내고, 예산을 넘는 이전 턴은 누적 요약(rolling summary)으로 압축합니다.
+#   - 이전 턴에 포함된 첨부 파일은 요약과 별도로 "고정된 첨부 파일" 영역에 참조 번호와 함께 남깁니다.
+#   - 요약은 대화별로 캐시하고 응답과 별개로 백그라운드에서 갱신하므로, 대화가 길어져도 턴마다의 지연과 비용이 일정합니다.
+
+import asyncio
+import logging
+import os
+import threading
+
+from utils.http_client import close_session
+from utils.text_chunking import ATTACHMENT_BLOCK, clip_tokens, estimate_tokens, strip_attachments
+from .validator import get_validator
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREAMBLE_REPLY = "네, 이전 대화 요약과 첨부 파일 내용을 참고하여 이어서 답변하겠습니다."
+
+# 모델별 대화 기록 토큰 예산 기본값. 환경 변수 <MODEL>_CONTEXT_TOKENS로 조정합니다. (예: CLAUDE_CONTEXT_TOKENS=60000)
+DEFAULT_CONTEXT_BUDGETS = {
+    "gemini": 32000,
+    "openai": 16000,
+    "claude": 16000,
+}
+
+
+def get_context_budget(model_name):
+    """모델의 대화 기록 토큰 예산을 반환합니다. 0 이하이면 제한하지 않습니다(None)."""
+    default = DEFAULT_CONTEXT_BUDGETS.get(model_name.lower(), 16000)
+    budget = int(os.getenv(f"{model_name.upper()}_CONTEXT_TOKENS", str(default)))
+    return budget if budget > 0 else None
+
+
+def turn_text(turn):
+    return "".join(part.get("text", "") for part in turn.get("parts", []) if isinstance(part, dict))
+
+
+def estimate_turn_tokens(turn):
+    # 역할/메시지 구분자 등 형식 오버헤드로 턴마다 4토큰을 더합니다.
+    return estimate_tokens(turn_text(turn)) + 4
+
+
+def turn_attachments(turn):
+    """사용자 턴에 포함된 첨부 파일 (이름, 본문) 목록을 반환합니다."""
+    if turn.get("role") != "user":
+        return []
+    return [(m.group("name"), m.group("body")) for m in ATTACHMENT_BLOCK.finditer(turn_text(turn))]
+
+
+def _per_turn(chat_history, name, compute):
+    """턴별 계산값 목록. 서버 대화 기록이면 대화에 캐시된 값을 사용합니다."""
+    derived = getattr(chat_history, "derived", None)
+    if derived is not None:
+        return derived(name, compute)
+    return [compute(turn) for turn in chat_history]
+
+
+class ContextWindow:
+    """
+    대화 기록을 모델별 토큰 예산에 맞게 줄입니다.
+
+    예산 안이면 기록을 그대로 반환합니다. 넘치면 최근 턴을 예산의 (1 - attachment_share) 범위에서
+    그대로 유지하고, 그 이전 턴은 앞에 붙는 요약 턴 한 쌍(사용자/모델)으로 대체합니다.
+    요약 턴에는 캐시된 누적 요약(summary_tokens 이내), 아직 요약되지 않은 턴의 발췌, 그리고
+    이전 턴의 첨부 파일(attachment_share 이내, 최근 파일 우선)이 들어갑니다.
+
+    서버 대화 저장소의 기록(ConversationHistory)이면 턴별 토큰 추정치와 요약을 대화에 캐시하고,
+    요약되지 않은 이전 턴이 min_summary_turns개 이상 쌓이면 보조 모델(검증 백엔드의 complete)로
+    요약을 백그라운드에서 갱신합니다. 클라이언트가 보낸 chat_history는 발췌 요약만 사용합니다.
+    요약 작업은 요청의 이벤트 루프가 아닌, 요청 간에 공유하는 장수명 백그라운드 이벤트 루프(전용 스레드)에서 실행하므로
+    요청마다 루프를 새로 만드는 환경(Flask)에서도 응답이 요약을 기다리지 않습니다. 종료 시 close()로 마무리합니다.
+    """
+
+    def __init__(self, min_recent_turns=2, summary_tokens=800, attachment_share=0.3,
+                 min_summary_turns=6, summarize=True, drain_timeout=20.0):
+        self.min_recent_turns = min_recent_turns
+        self.summary_tokens = summary_tokens
+        self.attachment_share = attachment_share
+        self.min_summary_turns = min_summary_turns
+        self.summarize = summarize
+        self.drain_timeout = drain_timeout
+        self._tasks = set()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._counters = {"windowed": 0, "summaries": 0, "summary_failures": 0}
+
+    def fit(self, chat_history, budget):
+        """chat_history를 budget 토큰 이내로 줄인 기록을 반환합니다. (마지막 min_recent_turns개 턴은 항상 유지)"""
+        if not budget or not chat_history:
+            return chat_history
+        counts = _per_turn(chat_history, "tokens", estimate_turn_tokens)
+        if sum(counts) <= budget:
+            return chat_history
+
+        start = self._recent_start(chat_history, counts, int(budget * (1 - self.attachment_share)) - self.summary_tokens)
+        if start == 0:
+            return chat_history
+        older = chat_history[:start]
+        conversation = getattr(chat_history, "conversation", None)
+        offset = getattr(chat_history, "start", 0)
+
+        summary_text, covered = "", 0
+        if conversation is not None and conversation.summary is not None:
+            covered, summary_text = conversation.summary
+            covered = max(0, min(covered - offset, start))
+        attachments = _per_turn(chat_history, "attachments", turn_attachments)[:start]
+        preamble = self._build_preamble(summary_text, older[covered:], attachments, int(budget * self.attachment_share))
+        self._counters["windowed"] += 1
+        logger.info(
+            f"Context window: kept {len(chat_history) - start} recent turns, compacted {start} older turns "
+            f"({sum(counts)} -> ~{sum(counts[start:]) + estimate_tokens(preamble)} tokens)."
+        )
+
+        prefix = [
+            {"role": "user", "parts": [{"text": preamble}]},
+            {"role": "model", "parts": [{"text": SUMMARY_PREAMBLE_REPLY}]},
+        ]
+        if conversation is not None:
+            if self.summarize and start - covered >= self.min_summary_turns:
+                self._schedule_summary(conversation, offset + start)
+            return chat_history.window(start, prefix)
+        return prefix + list(chat_history[start:])
+
+    def _recent_start(self, chat_history, counts, recent_budget):
+        """recent_budget 안에 들어가는 최근 턴의 시작 위치를 찾습니다. 시작 턴은 사용자 턴으로 맞춥니다."""
+        start = len(chat_history)
+        total = 0
+        while start > 0 and total + counts[start - 1] <= recent_budget:
+            start -= 1
+            total += counts[start]
+        start = min(start, max(0, len(chat_history) - self.min_recent_turns))
+        while start < len(chat_history) and chat_history[start].get("role") != "user":
+            start += 1
+        return start if start < len(chat_history) else max(0, len(chat_history) - self.min_recent_turns)
+
+    def _build_preamble(self, summary_text, unsummarized, older_attachments, attachment_budget):
+        """요약 턴의 본문(누적 요약 + 요약되지 않은 턴 발췌 + 고정된 첨부 파일)을 만듭니다."""
+        sections = []
+        remaining = self.summary_tokens
+        if summary_text:
+            summary_text = clip_tokens(summary_text, remaining)
+            remaining -= estimate_tokens(summary_text)
+            sections.append(summary_text)
+        excerpts = []
+        # 최근 턴부터 발췌하여 남은 요약 예산을 채웁니다.
+        for turn in reversed(unsummarized):
+            if remaining <= 0:
+                break
+            speaker = "사용자" if turn.get("role") == "user" else "어시스턴트"
+            excerpt = clip_tokens(" ".join(strip_attachments(turn_text(turn)).split()), min(remaining, 120))
+            excerpts.append(f"- {speaker}: {excerpt}")
+            remaining -= estimate_tokens(excerpt) + 3
+        if excerpts:
+            sections.append("\n".join(reversed(excerpts)))
+        text = "[이전 대화 요약]\n" + ("\n\n".join(sections) or "(요약 없음)")
+
+        attachments = self._pinned_attachments(older_attachments, attachment_budget)
+        if attachments:
+            text += "\n\n[고정된 첨부 파일]\n" + "\n\n".join(attachments)
+        return text
+
+    @staticmethod
+    def _pinned_attachments(older_attachments, budget):
+        """이전 턴의 첨부 파일을 최근 파일부터 예산 안에서 '첨부 #번호: 이름' 형식으로 모읍니다. 같은 파일은 한 번만 넣습니다."""
+        found = []
+        seen = set()
+        for attachments in older_attachments:
+            for name, body in attachments:
+                key = (name, body[:200])
+                if key not in seen:
+                    seen.add(key)
+                    found.append((name, body))
+        pinned = []
+        remaining = budget
+        for index in range(len(found) - 1, -1, -1):
+            if remaining <= 0:
+                break
+            name, body = found[index]
+            body = clip_tokens(body, remaining)
+            remaining -= estimate_tokens(body) + 8
+            pinned.append(f"--- 첨부 #{index + 1}: {name} ---\n{body}")
+        return list(reversed(pinned))
+
+    def _background_loop(self):
+        """요약 작업을 실행하는 백그라운드 이벤트 루프를 반환합니다. 처음 호출할 때 전용 스레드에서 시작합니다."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="context-summary-loop", daemon=True).start()
+            return self._loop
+
+    def _schedule_summary(self, conversation, upto):
+        """대화의 앞쪽 upto개 턴을 요약하는 작업을 백그라운드 루프에서 시작합니다. (대화별로 하나만 실행)"""
+        if getattr(conversation, "summarizing", False):
+            return
+        conversation.summarizing = True
+        future = asyncio.run_coroutine_threadsafe(self._refresh_summary(conversation, upto), self._background_loop())
+        self._tasks.add(future)
+        future.add_done_callback(self._tasks.discard)
+        # 시작되기 전에 취소된 작업은 _refresh_summary의 finally가 실행되지 않으므로 여기서도 표시를 해제합니다.
+        future.add_done_callback(lambda _: setattr(conversation, "summarizing", False))
+
+    async def close(self, timeout=None):
+        """
+        진행 중인 요약 작업을 timeout초(기본 drain_timeout)까지 기다리고 남은 작업은 취소한 뒤,
+        백그라운드 루프의 공유 세션/클라이언트를 닫고 루프를 멈춥니다. 워커 종료 시 호출합니다.
+        """
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        tasks = [asyncio.wrap_future(future) for future in list(self._tasks)]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout if timeout is None else timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Cancelled {len(pending)} unfinished conversation summary task(s).")
+                await asyncio.gather(*pending, return_exceptions=True)
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close_session(), loop))
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _refresh_summary(self, conversation, upto):
+        covered, previous = conversation.summary or (0, "")
+        new_turns = conversation.turns[covered:upto]
+        lines = []
+        for turn in new_turns:
+            speaker = "사용자" if turn.get("role") == "user" else "어시스턴트"
+            lines.append(f"{speaker}: {clip_tokens(strip_attachments(turn_text(turn)), 1500)}")
+        prompt = (
+            f"다음은 지금까지의 대화 요약과 그 이후 이어진 대화입니다. 두 내용을 합쳐 {self.summary_tokens}토큰 이내의 "
+            "한국어 요약으로 갱신해주세요. 사용자의 목표와 요구사항, 확정된 사실과 결정, 아직 남은 질문을 보존하고, "
+            "첨부 파일은 [첨부: 파일명] 형식의 이름으로만 언급하세요. 요약만 작성하세요.\n\n"
+            f"### 지금까지의 요약\n{previous or '(없음)'}\n\n### 이후 대화\n" + "\n".join(lines)
+        )
+        try:
+            summary = await get_validator().backend.complete(prompt)
+            conversation.summary = (upto, clip_tokens(summary.strip(), self.summary_tokens))
+            self._counters["summaries"] += 1
+            logger.info(f"Conversation '{conversation.id}' summary refreshed through turn {upto}.")
+        except Exception as e:
+            self._counters["summary_failures"] += 1
+            logger.warning(f"Conversation summary refresh failed: {e}")
+        finally:
+            conversation.summarizing = False
+
+    def stats(self):
+        return {**self._counters, "summaries_in_progress": len(self._tasks)}
+
+
+def create_context_window_from_env():
+    """
+    환경 변수로 대화 기록 윈도잉을 구성합니다.
+
+    - CONTEXT_MIN_RECENT_TURNS: 항상 그대로 보내는 최근 턴 수 (기본 2)
+    - CONTEXT_SUMMARY_TOKENS: 이전 대화 요약의 최대 토큰 수 (기본 800)
+    - CONTEXT_ATTACHMENT_SHARE: 고정된 첨부 파일에 쓰는 예산 비율 (기본 0.3)
+    - CONTEXT_SUMMARY_MIN_TURNS: 요약을 갱신하기 위해 쌓여야 하는 요약되지 않은 턴 수 (기본 6)
+    - CONTEXT_SUMMARY: 보조 모델 요약 사용 여부 (기본 true, false면 발췌 요약만 사용)
+    - CONTEXT_SUMMARY_DRAIN_TIMEOUT: 워커 종료 시 진행 중인 요약을 기다리는 최대 시간(초) (기본 20)
+    """
+    return ContextWindow(
+        min_recent_turns=int(os.getenv("CONTEXT_MIN_RECENT_TURNS", "2")),
+        summary_tokens=int(os.getenv("CONTEXT_SUMMARY_TOKENS", "800")),
+        attachment_share=float(os.getenv("CONTEXT_ATTACHMENT_SHARE", "0.3")),
+        min_summary_turns=int(os.getenv("CONTEXT_SUMMARY_MIN_TURNS", "6")),
+        summarize=os.getenv("CONTEXT_SUMMARY", "true").lower() in ("1", "true", "yes", "on"),
+        drain_timeout=float(os.getenv("CONTEXT_SUMMARY_DRAIN_TIMEOUT", "20")),
+    )
+
+
+context_window = create_context_window_from_env()
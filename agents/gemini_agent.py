@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import json
 import markdown
+import os
 import re
 from .base_agent import BaseAgent
+from .context_window import get_context_budget
 from tools.web_search import web_search_tool
 from tools.image_generation import image_generation_tool
-from utils.api_calls import fetch_with_exponential_backoff
+from utils.api_calls import fetch_with_exponential_backoff, stream_sse_json
 from utils.exceptions import APIException
 from utils.config import get_api_key
 
@@ -13,12 +16,21 @@ logger = logging.getLogger(__name__)
 
 class GeminiAgent(BaseAgent):
     """Gemini API를 호출하고 Function Calling을 처리하는 에이전트."""
+    history_format = "gemini"
+
     def __init__(self):
         self.name = "Gemini 에이전트"
         self.description = "Google Gemini 모델과 다양한 툴을 사용하여 복합적인 작업을 수행합니다."
         self.api_key = get_api_key("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY is not set.")
+        # 대화 기록 토큰 예산 (GEMINI_CONTEXT_TOKENS)
+        self.context_budget = get_context_budget("gemini")
+        # 2026-10-17 KST: 툴 실행 루프 설정 - 한 턴의 함수 호출을 모두 동시에 실행하고 결과를 모델에 돌려주며,
+        # 최대 GEMINI_TOOL_MAX_ROUNDS번 반복합니다. 툴 하나는 GEMINI_TOOL_TIMEOUT초, 루프 전체는 GEMINI_TOOL_DEADLINE초 안에 끝냅니다.
+        self.tool_max_rounds = int(os.getenv("GEMINI_TOOL_MAX_ROUNDS", "3"))
+        self.tool_timeout = float(os.getenv("GEMINI_TOOL_TIMEOUT", "20"))
+        self.tool_deadline = float(os.getenv("GEMINI_TOOL_DEADLINE", "60"))
         self.api_base_url = "https://generativelanguage.googleapis.com/v1beta/models/"
         self.tools = [
             {
@@ -56,232 +68,249 @@ class GeminiAgent(BaseAgent):
             response, agent_info = await self._call_gemini_with_tools(prompt, chat_history)
 
             response_content = ""
+            response_text = ""
             source_info = []
+            # 표시 이름은 요청마다 정합니다. (공유 에이전트의 속성은 바꾸지 않음)
+            agent_name = self.name
+            agent_description = self.description
             
             # 응답 구조를 확인하고 적절한 에이전트 로직을 실행
             if "agent" in agent_info:
                 if agent_info["agent"] == "web_search":
-                    self.name = "실시간 웹 검색 에이전트"
-                    self.description = "Tavily를 통해 실시간 인터넷 정보를 검색하고 결과를 바탕으로 답변을 생성합니다."
-                    final_answer = response["candidates"][0]["content"]["parts"][0]["text"]
-                    grounding_metadata = response["candidates"][0].get("groundingMetadata")
-                    if grounding_metadata and grounding_metadata.get("groundingAttributions"):
-                        for attr in grounding_metadata["groundingAttributions"]:
-                            if "web" in attr:
-                                source_info.append({"type": "Web Search", "info": f"{attr['web'].get('title', '제목 없음')} ({attr['web'].get('uri', 'URL 없음')})"})
-                    response_content = markdown.markdown(final_answer)
+                    agent_name = "실시간 웹 검색 에이전트"
+                    agent_description = "Tavily를 통해 실시간 인터넷 정보를 검색하고 결과를 바탕으로 답변을 생성합니다."
+                    response_text = self._response_text(response)
+                    source_info.extend(self._extract_web_sources(response))
+                    response_content = markdown.markdown(response_text)
                 elif agent_info["agent"] == "image_generation":
-                    self.name = "이미지 생성 에이전트"
-                    self.description = "Imagen-3.0을 사용하여 프롬프트에 맞는 이미지를 생성합니다."
-                    if response and "predictions" in response and response["predictions"]:
-                        base64_image = response["predictions"][0]["bytesBase64Encoded"]
-                        response_content = f"<img src='data:image/png;base64,{base64_image}' alt='Generated Image' class='max-w-full h-auto rounded-md shadow-md mt-4'>"
-                        source_info.append({"type": "Image Generation", "info": "Imagen-3.0"})
-                    else:
-                        response_content = "<p class='text-red-500'>이미지 생성에 실패했습니다.</p>"
+                    agent_name = "이미지 생성 에이전트"
+                    agent_description = "Imagen-3.0을 사용하여 프롬프트에 맞는 이미지를 생성합니다."
+                    response_content, source_info = self._render_image_response(response)
                 else: # 기본 LLM 응답인 경우
-                    final_answer = response["candidates"][0]["content"]["parts"][0]["text"]
-                    response_content = markdown.markdown(final_answer)
+                    response_text = self._response_text(response)
+                    response_content = markdown.markdown(response_text)
             else:
                 # 툴 호출이 실패했거나, agent_info가 없는 경우
                 raise APIException(agent_info, 500)
 
-            # 2. 결과 검증 (선택적)
-            if use_validation:
-                validation_result = await self._call_validation_agent(prompt, response_content, chat_history)
+            # 2. 결과 검증 (선택적) - 렌더링된 HTML이 아닌 원본 답변 텍스트를 검증
+            validator = self.get_validator() if use_validation and response_text else None
+            if validator is not None:
+                validation_result = await self._call_validation_agent(prompt, response_text, chat_history)
                 if validation_result.get("refinement_content"):
                     response_content = validation_result["refinement_content"]
                 response_content += f"<div class='mt-4 p-4 border border-blue-200 rounded-md bg-blue-50'><h3 class='font-semibold text-blue-800'>수행 결과 검증 </h3>{validation_result['feedback_html']}</div>"
-                source_info.append({"type": "Validation", "info": "최종 검토 에이전트 (Gemini)"})
-                self.name = f"{self.name} (검증 완료)"
+                source_info.extend(validator.source_info)
+                agent_name = f"{agent_name} (검증 완료)"
 
-            return {"response_content": response_content, "source_info": source_info}
+            return {"response_content": response_content, "response_text": response_text, "source_info": source_info,
+                    "agent_name": agent_name, "agent_description": agent_description}
 
         except Exception as e:
             logger.error(f"Gemini 에이전트 처리 실패: {e}")
             raise APIException(f"Gemini 에이전트 처리 중 오류가 발생했습니다: {str(e)}", 500)
     
-    async def _call_gemini_with_tools(self, prompt, chat_history):
-        """Gemini API를 호출하고 Function Calling을 처리합니다."""
-        url = f"{self.api_base_url}gemini-2.5-flash:generateContent?key={self.api_key}"
-        
-        contents = []
-        for chat in chat_history:
-            contents.append({"role": "user" if chat["role"] == "user" else "model", "parts": chat["parts"]})
+    async def stream_request(self, prompt, chat_history):
+        """
+        streamGenerateContent(SSE)로 Gemini 응답을 토큰 단위로 전달합니다.
+
+        모델이 웹 검색 툴을 요청하면 한 턴의 검색을 모두 동시에 수행하고 결과를 돌려준 뒤 후속 응답을 다시 스트리밍하며,
+        이를 최대 tool_max_rounds번 반복합니다. (_run_tool_calls 참고)
+        이미지 생성 툴을 요청하면 생성된 이미지를 하나의 `message` 이벤트로 전달합니다.
+        텍스트 응답의 `message` 이벤트는 렌더링 전 원본 텍스트(response_text)를 담습니다.
+        """
+        logger.info(f"Gemini 에이전트 스트리밍 요청 시작. 프롬프트: {prompt[:50]}...")
+        url = f"{self.api_base_url}gemini-2.5-flash:streamGenerateContent?alt=sse&key={self.api_key}"
+        contents = self._build_contents(prompt, chat_history)
+        deadline = asyncio.get_running_loop().time() + self.tool_deadline
+
+        text_parts = []
+        source_info = []
+        agent_name = self.name
+        rounds = 0
+        while True:
+            allow_tools = self._tools_allowed(rounds, deadline)
+            model_parts = []
+            tool_calls = []
+            async for chunk in stream_sse_json(url, self._tool_payload(contents, allow_tools), provider="gemini"):
+                for part in self._iter_parts(chunk):
+                    model_parts.append(part)
+                    if "functionCall" in part:
+                        tool_calls.append(part["functionCall"])
+                    elif part.get("text"):
+                        text_parts.append(part["text"])
+                        yield {"event": "token", "data": {"text": part["text"]}}
+                if rounds:
+                    source_info.extend(self._extract_web_sources(chunk))
+            if not tool_calls or not allow_tools:
+                break
+
+            image_call = self._find_image_call(tool_calls)
+            if image_call is not None:
+                result = await self._run_image_tool(image_call, deadline)
+                response_content, source_info = self._render_image_response(result)
+                yield {"event": "message", "data": {
+                    "agent_name": "이미지 생성 에이전트",
+                    "response_content": response_content,
+                    "source_info": source_info,
+                }}
+                return
+
+            rounds += 1
+            agent_name = "실시간 웹 검색 에이전트"
+            contents = contents + [
+                {"role": "model", "parts": model_parts},
+                {"role": "function", "parts": await self._run_tool_calls(tool_calls, rounds, deadline)},
+            ]
+
+        yield {"event": "message", "data": {
+            "agent_name": agent_name,
+            "response_text": "".join(text_parts),
+            "source_info": source_info,
+        }}
+
+    def format_history_turn(self, turn):
+        """대화 기록 한 턴을 Gemini contents 형식으로 변환합니다."""
+        return {"role": "user" if turn["role"] == "user" else "model", "parts": turn["parts"]}
+
+    def _build_contents(self, prompt, chat_history):
+        """chat_history와 현재 프롬프트를 Gemini contents 형식으로 변환합니다."""
+        contents = self.format_history(chat_history)
         contents.append({"role": "user", "parts": [{"text": prompt}]})
+        return contents
 
-        payload = {
-            "contents": contents,
-            "tools": self.tools,
-            "toolConfig": { "functionCallingConfig": { "mode": "AUTO" } }
-        }
+    @staticmethod
+    def _response_text(response):
+        """응답의 텍스트 part를 모두 이어 붙입니다. (함수 호출 part나 생각 서명만 있는 part는 건너뜀)"""
+        return "".join(part.get("text", "") for part in GeminiAgent._iter_parts(response))
 
-        try:
-            response = await fetch_with_exponential_backoff(url, payload)
-            
-            candidates = response.get("candidates", [])
-            if not candidates:
-                raise APIException("No candidates found in the response.", 500)
-
-            candidate = candidates[0]
-            parts = candidate.get("content", {}).get("parts", [])
-
-            tool_call = None
-            for p in parts:
-                if isinstance(p, dict) and "functionCall" in p:
-                    tool_call = p["functionCall"]
-                    break
-
-            if tool_call:
-                tool_name = tool_call.get("name")
-                tool_args = tool_call.get("args", {})
-                logger.info(f"LLM requested tool: {tool_name} with args: {tool_args}")
-
-                if tool_name == "web_search_tool":
-                    result = await web_search_tool(**tool_args)
-                    followup_contents = contents[:]
-                    followup_contents.append({"role": "model", "parts": [{"functionCall": tool_call}]})
-                    followup_contents.append({"role": "function", "parts": [{"functionResponse": {"name": "web_search_tool", "response": result}}]})
-                    
-                    followup_payload = {
-                        "contents": followup_contents,
-                        "tools": self.tools,
-                        "toolConfig": {"functionCallingConfig": {"mode": "AUTO"}}
-                    }
-                    final_response = await fetch_with_exponential_backoff(url, followup_payload)
-                    return final_response, {"agent": "web_search"}
-
-                elif tool_name == "image_generation_tool":
-                    result = await image_generation_tool(**tool_args)
-                    return result, {"agent": "image_generation"}
-                else:
-                    raise APIException(f"Unknown tool requested: {tool_name}", 400)
-            
-            return response, {"agent": "basic_llm"}
-            
-        except Exception as e:
-            logger.error(f"Error in _call_gemini_with_tools: {e}")
-            raise APIException(f"API call failed: {str(e)}", 500)
+    @staticmethod
+    def _iter_parts(response):
+        """응답(또는 스트리밍 청크)의 첫 번째 후보에서 parts 목록을 반환합니다."""
+        candidates = response.get("candidates") or [{}]
+        return [p for p in candidates[0].get("content", {}).get("parts", []) if isinstance(p, dict)]
 
-    async def _call_validation_agent(self, original_prompt, generated_content, chat_history):
-        """
-        최종 검토 에이전트 로직.
+    @staticmethod
+    def _extract_web_sources(response):
+        """groundingMetadata에서 웹 검색 출처 정보를 추출합니다."""
+        sources = []
+        candidates = response.get("candidates") or [{}]
+        grounding_metadata = candidates[0].get("groundingMetadata")
+        if grounding_metadata and grounding_metadata.get("groundingAttributions"):
+            for attr in grounding_metadata["groundingAttributions"]:
+                if "web" in attr:
+                    sources.append({"type": "Web Search", "info": f"{attr['web'].get('title', '제목 없음')} ({attr['web'].get('uri', 'URL 없음')})"})
+        return sources
+
+    @staticmethod
+    def _render_image_response(response):
+        """이미지 생성 툴 응답을 HTML과 출처 정보로 변환합니다."""
+        if response and "predictions" in response and response["predictions"]:
+            base64_image = response["predictions"][0]["bytesBase64Encoded"]
+            response_content = f"<img src='data:image/png;base64,{base64_image}' alt='Generated Image' class='max-w-full h-auto rounded-md shadow-md mt-4'>"
+            return response_content, [{"type": "Image Generation", "info": "Imagen-3.0"}]
+        return "<p class='text-red-500'>이미지 생성에 실패했습니다.</p>", []
+
+    async def _call_gemini_with_tools(self, prompt, chat_history):
         """
-        logger.info(f"Validating content for prompt: '{original_prompt[:50]}'")
-
-        validation_prompt = f"""
-        아래는 원본 질문과 생성된 답변입니다.
-
-        ### 원본 질문
-        {original_prompt}
-
-        ### 생성된 답변
-        {generated_content}
-
-        다음 5가지 기준에 따라 100점 만점으로 점수를 매기고, 각 항목에 대한 구체적인 피드백을 제공해주세요.
-        점수는 오직 숫자만 반환해야 합니다.
-
-        1. **정확성**: 답변의 내용이 사실에 부합하는가?
-        2. **관련성**: 답변이 원본 질문의 의도와 목적에 얼마나 부합하는가?
-        3. **완전성**: 질문의 모든 측면을 충분히 다루고 있는가?
-        4. **명확성 및 간결성**: 내용이 이해하기 쉽고 불필요한 부분이 없는가?
-        5. **논리적 일관성**: 내용의 흐름이 자연스럽고 논리적인가?
-
-        응답은 반드시 아래와 같은 JSON 형식으로 반환해야 합니다.
-        {{
-            "scores": {{
-                "정확성": 0,
-                "관련성": 0,
-                "완전성": 0,
-                "명확성_간결성": 0,
-                "논리적_일관성": 0
-            }},
-            "feedback": {{
-                "정확성": "피드백 내용",
-                "관련성": "피드백 내용",
-                "완전성": "피드백 내용",
-                "명확성_간결성": "피드백 내용",
-                "논리적_일관성": "피드백 내용"
-            }}
-        }}
+        Gemini API를 호출하고 Function Calling을 처리합니다.
+
+        모델이 한 턴에 요청한 함수 호출을 모두 동시에 실행하고 결과를 한꺼번에 돌려주며, 모델이 더 이상 툴을
+        요청하지 않을 때까지 최대 tool_max_rounds번 반복합니다. 반복 횟수나 전체 제한 시간(tool_deadline)을 넘기면
+        툴 없이 지금까지의 결과로 답변하도록 마지막 요청을 보냅니다. 이미지 생성 툴은 결과 이미지를 바로 반환합니다.
         """
-        
         url = f"{self.api_base_url}gemini-2.5-flash:generateContent?key={self.api_key}"
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "contents": [{"role": "user", "parts": [{"text": validation_prompt}]}],
-            "generationConfig": {"responseMimeType": "application/json"}
-        }
-        
+        contents = self._build_contents(prompt, chat_history)
+        deadline = asyncio.get_running_loop().time() + self.tool_deadline
+        rounds = 0
+
         try:
-            response = await fetch_with_exponential_backoff(url, payload)
-            validation_data = json.loads(response["candidates"][0]["content"]["parts"][0]["text"])
-        except Exception as e:
-            logger.error(f"Validation API call failed: {e}")
-            return {
-                "scores": {"정확성": 0, "관련성": 0, "완전성": 0, "명확성_간결성": 0, "논리적_일관성": 0},
-                "feedback": {"error": "검증 시스템 오류가 발생했습니다."},
-                "feedback_html": f"<p class='text-red-600 mt-2'>검증 시스템 오류가 발생했습니다: {str(e)}</p>",
-                "reconsideration_prompt": None,
-                "refinement_content": None
-            }
+            while True:
+                allow_tools = self._tools_allowed(rounds, deadline)
+                response = await fetch_with_exponential_backoff(url, self._tool_payload(contents, allow_tools), provider="gemini")
+                if not response.get("candidates"):
+                    raise APIException("No candidates found in the response.", 500)
 
-        scores = validation_data.get("scores", {})
-        feedback = validation_data.get("feedback", {})
-        
-        total_score = sum(scores.values())
-        average_score = total_score / len(scores) if len(scores) > 0 else 0
-
-        feedback_html = "<div>"
-        feedback_html += f"<p class='font-semibold'>평가 점수 (100점 만점):</p><ul class='list-disc list-inside'>"
-        for c, score in scores.items():
-            feedback_html += f"<li>{c}: {score}점</li>"
-        feedback_html += f"</ul><p class='font-bold mt-2'>전체 평균 점수: {average_score:.2f}점</p>"
-        
-        reconsideration_prompt = None
-        if average_score < 60:
-            feedback_html += "<p class='text-red-600 mt-2'>평균 점수가 60점 이하이므로 프롬프트 재설계를 통한 재수행을 제안합니다.</p>"
-            reconsideration_prompt = f"원본 프롬프트: '{original_prompt}'에 대한 결과의 평균 점수가 {average_score:.2f}점이므로, 프롬프트를 재설계하여 더 나은 답변을 생성해주세요."
-            
-            logger.info("Performing refinement...")
-            refinement_prompt = f"""
-            다음은 사용자의 원본 질문과 생성된 답변, 그리고 그에 대한 피드백입니다.
-            피드백을 참고하여 답변을 개선하고, 더 정확하고 완전한 답변을 다시 작성해주세요.
+                parts = self._iter_parts(response)
+                tool_calls = [part["functionCall"] for part in parts if "functionCall" in part]
+                if not tool_calls or not allow_tools:
+                    return response, {"agent": "web_search" if rounds else "basic_llm"}
 
-            ### 원본 질문
-            {original_prompt}
+                image_call = self._find_image_call(tool_calls)
+                if image_call is not None:
+                    return await self._run_image_tool(image_call, deadline), {"agent": "image_generation"}
 
-            ### 기존 답변
-            {generated_content}
-            
-            ### 피드백
-            {json.dumps(feedback, ensure_ascii=False, indent=2)}
+                rounds += 1
+                contents = contents + [
+                    {"role": "model", "parts": parts},
+                    {"role": "function", "parts": await self._run_tool_calls(tool_calls, rounds, deadline)},
+                ]
 
-            개선된 답변만 작성해주세요.
-            """
-            
-            try:
-                refinement_response = await fetch_with_exponential_backoff(url, {"contents": [{"role": "user", "parts": [{"text": refinement_prompt}]}]})
-                refinement_content = refinement_response["candidates"][0]["content"]["parts"][0]["text"]
-                return {
-                    "scores": scores,
-                    "average_score": average_score,
-                    "feedback_html": feedback_html,
-                    "reconsideration_prompt": reconsideration_prompt,
-                    "refinement_content": markdown.markdown(refinement_content)
-                }
-            except Exception as e:
-                logger.error(f"Refinement failed: {e}")
-                feedback_html += f"<p class='text-red-600 mt-2'>답변 개선에 실패했습니다: {str(e)}</p>"
-        else:
-            feedback_html += "<p class='text-green-600 mt-2'>전반적으로 좋은 결과입니다.</p>"
-
-        feedback_html += "</div>"
+        except Exception as e:
+            logger.error(f"Error in _call_gemini_with_tools: {e}")
+            raise APIException(f"API call failed: {str(e)}", 500)
 
+    def _tool_payload(self, contents, allow_tools=True):
+        """allow_tools가 False면 툴 선언은 유지한 채 함수 호출을 막아(mode=NONE) 텍스트 답변을 받습니다."""
         return {
-            "scores": scores,
-            "average_score": average_score,
-            "feedback_html": feedback_html,
-            "reconsideration_prompt": reconsideration_prompt,
-            "refinement_content": None
+            "contents": contents,
+            "tools": self.tools,
+            "toolConfig": {"functionCallingConfig": {"mode": "AUTO" if allow_tools else "NONE"}}
         }
+
+    def _tools_allowed(self, rounds, deadline):
+        if rounds >= self.tool_max_rounds:
+            logger.info(f"Tool loop reached {rounds} rounds. Asking Gemini for a final answer without tools.")
+            return False
+        if asyncio.get_running_loop().time() >= deadline:
+            logger.warning(f"Tool loop deadline ({self.tool_deadline:g}s) passed. Asking Gemini for a final answer without tools.")
+            return False
+        return True
+
+    @staticmethod
+    def _find_image_call(tool_calls):
+        return next((call for call in tool_calls if call.get("name") == "image_generation_tool"), None)
+
+    async def _run_image_tool(self, tool_call, deadline):
+        """이미지 생성 툴을 남은 제한 시간 안에 실행합니다."""
+        logger.info(f"LLM requested tool: image_generation_tool with args: {tool_call.get('args', {})}")
+        remaining = max(1.0, deadline - asyncio.get_running_loop().time())
+        try:
+            return await asyncio.wait_for(image_generation_tool(**(tool_call.get("args") or {})), remaining)
+        except asyncio.TimeoutError:
+            raise APIException("이미지 생성 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.", 504)
+
+    async def _run_tool_calls(self, tool_calls, round_number, deadline):
+        """
+        한 턴의 함수 호출을 asyncio.gather로 동시에 실행하고, 요청 순서대로 functionResponse part 목록을 반환합니다.
+
+        툴 하나는 tool_timeout초와 남은 전체 제한 시간 중 짧은 시간 안에 끝나야 합니다.
+        실패하거나 시간을 넘긴 호출은 오류 내용을 응답으로 돌려주어 모델이 나머지 결과로 답변할 수 있게 합니다.
+        """
+        timeout = min(self.tool_timeout, deadline - asyncio.get_running_loop().time())
+        logger.info(
+            f"Running {len(tool_calls)} tool call(s) in parallel (round {round_number}/{self.tool_max_rounds}): "
+            f"{[call.get('name') for call in tool_calls]}"
+        )
+        results = await asyncio.gather(*(self._run_tool(call, timeout) for call in tool_calls))
+        return [
+            {"functionResponse": {"name": call.get("name"), "response": result}}
+            for call, result in zip(tool_calls, results)
+        ]
+
+    async def _run_tool(self, tool_call, timeout):
+        tool_name = tool_call.get("name")
+        tool_args = tool_call.get("args") or {}
+        logger.info(f"LLM requested tool: {tool_name} with args: {tool_args}")
+        if tool_name != "web_search_tool":
+            return {"error": f"Unknown tool: {tool_name}"}
+        if timeout <= 0:
+            return {"error": "툴 실행 제한 시간이 지나 실행하지 않았습니다."}
+        try:
+            return await asyncio.wait_for(web_search_tool(**tool_args), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool '{tool_name}' timed out after {timeout:.1f}s (args: {tool_args})")
+            return {"error": f"검색 시간이 {timeout:.0f}초를 넘어 중단되었습니다."}
+        except Exception as e:
+            logger.warning(f"Tool '{tool_name}' failed (args: {tool_args}): {e}")
+            return {"error": str(e)}
@@ -1,10 +1,10 @@
 import logging
 import markdown
-import asyncio
-from openai import OpenAI
 from .base_agent import BaseAgent
+from .context_window import get_context_budget
 from utils.exceptions import APIException
 from utils.config import get_api_key
+from utils.llm_clients import openai_clients
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,10 @@ class OpenAIAgent(BaseAgent):
         self.api_key = get_api_key("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY is not set.")
-        self.client = OpenAI(api_key=self.api_key)
+        # 공유 AsyncOpenAI 클라이언트 풀 (타임아웃/동시 호출 제한 포함)
+        self.clients = openai_clients
+        # 대화 기록 토큰 예산 (OPENAI_CONTEXT_TOKENS)
+        self.context_budget = get_context_budget("openai")
 
     async def process_request(self, prompt, chat_history, use_validation):
         """
@@ -24,46 +27,68 @@ class OpenAIAgent(BaseAgent):
         """
         logger.info(f"OpenAI 에이전트 요청 처리 시작. 프롬프트: {prompt[:50]}...")
         try:
-            # OpenAI API 호출은 동기식이므로, 비동기 처리를 위해 run_in_executor 사용
-            response = await asyncio.to_thread(self._call_openai_api, prompt, chat_history)
+            response = await self._call_openai_api(prompt, chat_history)
 
             response_content = markdown.markdown(response["text"])
             source_info = []
+            agent_name = self.name
 
-            # 선택적: 수행 결과 검증
-            if use_validation:
-                validation_result = await self._call_validation_agent(prompt, response_content, chat_history)
+            # 선택적: 수행 결과 검증 - 렌더링된 HTML이 아닌 원본 답변 텍스트를 검증
+            validator = self.get_validator() if use_validation else None
+            if validator is not None:
+                validation_result = await self._call_validation_agent(prompt, response["text"], chat_history)
                 if validation_result.get("refinement_content"):
                     response_content = validation_result["refinement_content"]
                 response_content += f"<div class='mt-4 p-4 border border-blue-200 rounded-md bg-blue-50'><h3 class='font-semibold text-blue-800'>수행 결과 검증 </h3>{validation_result['feedback_html']}</div>"
-                source_info.append({"type": "Validation", "info": "최종 검토 에이전트 (Gemini)"})
-                self.name = f"{self.name} (검증 완료)"
+                source_info.extend(validator.source_info)
+                agent_name = f"{agent_name} (검증 완료)"
 
-            return {"response_content": response_content, "source_info": source_info}
+            return {"response_content": response_content, "response_text": response["text"], "source_info": source_info, "agent_name": agent_name}
 
         except Exception as e:
             logger.error(f"OpenAI API 호출 실패: {e}")
             raise APIException(f"OpenAI API 호출에 실패했습니다: {e}", 500)
 
-    def _call_openai_api(self, prompt, chat_history):
+    async def stream_request(self, prompt, chat_history):
         """
-        OpenAI Chat Completions 간단 래퍼
+        Chat Completions `stream=True`로 OpenAI 응답을 토큰 단위로 전달합니다.
         """
-        # chat_history를 OpenAI messages 형식에 맞게 변환
-        messages = [{"role": "user" if chat["role"] == "user" else "assistant", "content": chat["parts"][0]["text"]} for chat in chat_history]
+        logger.info(f"OpenAI 에이전트 스트리밍 요청 시작. 프롬프트: {prompt[:50]}...")
+        text_parts = []
+        # 스트림이 끝날 때까지 호출 슬롯을 보유하고, 응답 시작 전의 일시적 오류만 재시도
+        async with self.clients.limiter.slot():
+            stream = await self.clients.limiter.call(lambda: self.clients.get().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=self._build_messages(prompt, chat_history),
+                stream=True
+            ), acquire=False)
+            # 클라이언트 연결 종료 등으로 중간에 멈춰도 SDK 스트림(HTTP 응답)을 닫아 연결을 풀에 돌려줍니다.
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        text_parts.append(delta)
+                        yield {"event": "token", "data": {"text": delta}}
+
+        yield {"event": "message", "data": {"response_text": "".join(text_parts), "source_info": []}}
+
+    def _build_messages(self, prompt, chat_history):
+        """chat_history를 OpenAI messages 형식에 맞게 변환합니다."""
+        messages = self.format_history(chat_history)
         messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def _call_openai_api(self, prompt, chat_history):
+        """
+        OpenAI Chat Completions 간단 래퍼 (공유 AsyncOpenAI 클라이언트 사용)
+        """
+        messages = self._build_messages(prompt, chat_history)
 
-        completion = self.client.chat.completions.create(
+        completion = await self.clients.limiter.call(lambda: self.clients.get().chat.completions.create(
             model="gpt-4o-mini",
             messages=messages
-        )
+        ))
         text = completion.choices[0].message.content
         return {"text": text}
-
-    async def _call_validation_agent(self, original_prompt, generated_content, chat_history):
-        # GeminiAgent의 검증 로직을 복사하거나, 별도의 유틸리티 함수로 분리하여 사용
-        # 여기서는 설명을 위해 임시로 복사함. 실제로는 코드 재사용을 권장.
-        from agents.gemini_agent import GeminiAgent
-        gemini_agent = GeminiAgent()
-        validation_result = await gemini_agent._call_validation_agent(original_prompt, generated_content, chat_history)
-        return validation_result
@@ -0,0 +1,140 @@
+# agents/retrieval.py
+# 2026-10-17 KST: 참고자료 검색 기반 프롬프트 보강 (retrieval-augmented prompting)
+#   - 과거 산출물(Abstract_*.json)을 다시 업로드하지 않아도 답변에 활용할 수 있도록, 질문과 관련된
+#     참고자료 섹션을 검색하여 토큰 예산 안에서 프롬프트 앞에 붙이고 출처를 source_info로 알려줍니다.
+#   - 검색은 utils.reference_index의 FTS5 인덱스(bm25)를 사용하므로 문서 전체를 첨부하는 것보다 프롬프트가 작고 빠릅니다.
+
+import logging
+import os
+import threading
+
+from utils.text_chunking import clip_tokens, estimate_tokens, strip_attachments
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_BLOCK_HEADER = (
+    "--- 참고자료 검색 결과 ---\n"
+    "다음은 사내 참고자료에서 질문과 관련하여 검색한 발췌입니다. 질문과 관련이 있을 때만 활용하고, "
+    "활용한 내용에는 [참고 1]처럼 출처 번호를 표시해주세요.\n"
+)
+REFERENCE_BLOCK_FOOTER = "--- 참고자료 끝 ---"
+
+
+class ReferenceRetriever:
+    """
+    질문과 관련된 참고자료 섹션을 골라 프롬프트에 붙입니다.
+
+    질문(첨부 파일 블록 제외)으로 bm25 상위 candidates개 섹션을 찾은 뒤, 질문 토큰의 min_coverage 이상을 포함하고
+    점수가 1위의 min_relative_score배 이상인 섹션만 남깁니다. 남은 섹션을 점수순으로 최대 top_k개,
+    합계 token_budget 이내로 넣습니다. 첫 섹션이 예산보다 크면 예산에 맞게 자릅니다.
+    """
+
+    def __init__(self, index, top_k=4, token_budget=1500, min_coverage=0.35, min_relative_score=0.25,
+                 candidates=12, max_query_chars=1000):
+        self.index = index
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.min_coverage = min_coverage
+        self.min_relative_score = min_relative_score
+        self.candidates = candidates
+        self.max_query_chars = max_query_chars
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "augmented": 0, "passages": 0, "tokens": 0, "errors": 0}
+
+    def retrieve(self, prompt):
+        """프롬프트에 넣을 참고자료 발췌 목록을 반환합니다. 각 항목에 tokens(추정 토큰 수)가 들어갑니다."""
+        query = strip_attachments(prompt).strip()[:self.max_query_chars]
+        if not query:
+            return []
+        ranked = self.index.rank_sections(query, limit=self.candidates)
+        if not ranked:
+            return []
+        best = ranked[0]["score"]
+        passages = []
+        seen = set()
+        remaining = self.token_budget
+        for section in ranked:
+            if len(passages) >= self.top_k:
+                break
+            if section["coverage"] < self.min_coverage or section["score"] < best * self.min_relative_score:
+                continue
+            # 문서 요약(개요)이 본문 섹션과 같은 경우가 있어 같은 내용은 한 번만 넣습니다.
+            if section["text"] in seen:
+                continue
+            seen.add(section["text"])
+            tokens = estimate_tokens(section["text"])
+            if tokens > remaining:
+                if passages:
+                    continue
+                section = {**section, "text": clip_tokens(section["text"], remaining)}
+                tokens = estimate_tokens(section["text"])
+            passages.append({**section, "tokens": tokens})
+            remaining -= tokens
+        return passages
+
+    def augment(self, prompt):
+        """
+        참고자료 발췌를 프롬프트 앞에 붙입니다.
+
+        Returns:
+            tuple: (보강된 프롬프트, source_info 목록). 관련 자료가 없으면 (원래 프롬프트, [])
+        """
+        try:
+            passages = self.retrieve(prompt)
+        except Exception as e:
+            logger.warning(f"Reference retrieval failed, continuing without references: {e}")
+            self._count(errors=1)
+            return prompt, []
+
+        self._count(requests=1)
+        if not passages:
+            return prompt, []
+
+        blocks = []
+        source_info = []
+        for number, passage in enumerate(passages, 1):
+            label = f"{passage['title']} > {passage['section']}"
+            blocks.append(f"[참고 {number}] {label} ({passage['original_file_name']})\n{passage['text']}")
+            source_info.append({"type": "Reference", "info": f"[참고 {number}] {label} ({passage['original_file_name']})"})
+        tokens = sum(passage["tokens"] for passage in passages)
+        self._count(augmented=1, passages=len(passages), tokens=tokens)
+        logger.info(f"Added {len(passages)} reference passages (~{tokens} tokens) to the prompt.")
+        block = REFERENCE_BLOCK_HEADER + "\n" + "\n\n".join(blocks) + "\n" + REFERENCE_BLOCK_FOOTER
+        return f"{block}\n\n{prompt}", source_info
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "top_k": self.top_k,
+            "token_budget": self.token_budget,
+            "min_coverage": self.min_coverage,
+            **counters,
+            "avg_tokens": round(counters["tokens"] / counters["augmented"], 1) if counters["augmented"] else 0.0,
+        }
+
+
+def create_retriever_from_env(index):
+    """
+    환경 변수로 참고자료 검색 단계를 구성합니다. 사용하지 않으면 None을 반환합니다.
+
+    - RAG_ENABLED: true | false(기본). 켜면 모든 채팅 프롬프트에 발췌가 추가되므로 명시적으로 켤 때만 사용합니다.
+    - RAG_TOP_K: 프롬프트에 넣을 최대 발췌 수 (기본 4)
+    - RAG_TOKEN_BUDGET: 발췌 합계 토큰 예산 (기본 1500)
+    - RAG_MIN_COVERAGE: 질문 토큰 중 발췌에 포함되어야 하는 최소 비율 (기본 0.35)
+    """
+    if index is None or os.getenv("RAG_ENABLED", "false").lower() not in ("1", "true", "yes", "on"):
+        return None
+    retriever = ReferenceRetriever(
+        index,
+        top_k=int(os.getenv("RAG_TOP_K", "4")),
+        token_budget=int(os.getenv("RAG_TOKEN_BUDGET", "1500")),
+        min_coverage=float(os.getenv("RAG_MIN_COVERAGE", "0.35")),
+    )
+    logger.info(f"Reference retrieval enabled (top_k={retriever.top_k}, token_budget={retriever.token_budget})")
+    return retriever
@@ -1,33 +1,529 @@
 # agents/router.py
 import logging
 import asyncio
-from .gemini_agent import GeminiAgent
-from .openai_agent import OpenAIAgent
-from .claude_agent import ClaudeAgent
+import importlib
+import os
+import threading
+import time
+import aiohttp
+from .context_window import context_window
+from .validator import get_validator_or_none
+from utils.circuit_breaker import CircuitBreaker, LatencyTracker
+from utils.config import get_api_key
 from utils.exceptions import APIException
+from utils.markdown_render import render_markdown
+from utils.rate_limit import start_retry_budget
 
 logger = logging.getLogger(__name__)
 
+# 모델 키 -> (에이전트 모듈, 클래스 이름, 필요한 API 키 환경 변수)
+# 에이전트 모듈과 공급자 SDK는 해당 모델이 처음 요청될 때 불러옵니다.
+AGENT_SPECS = {
+    "Gemini": ("agents.gemini_agent", "GeminiAgent", "GEMINI_API_KEY"),
+    "OpenAI": ("agents.openai_agent", "OpenAIAgent", "OPENAI_API_KEY"),
+    "Claude": ("agents.claude_agent", "ClaudeAgent", "ANTHROPIC_API_KEY"),
+}
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def is_provider_error(error):
+    """공급자 장애(5xx, 429, 타임아웃, 연결 오류)로 볼 수 있는 오류인지 판단합니다. 사용자 입력 오류(4xx)는 제외합니다."""
+    if isinstance(error, APIException):
+        return error.status_code >= 500 or error.status_code in (408, 429)
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError)):
+        return True
+    # SDK 오류 등 그 밖의 예외도 공급자 장애로 보되, 코드 오류로 인한 예외는 제외합니다.
+    return not isinstance(error, (ValueError, TypeError, KeyError, AttributeError))
+
+
 class AgentRouter:
-    """사용자 요청을 분석하여 적절한 에이전트로 라우팅합니다."""
-    def __init__(self):
-        self.agents = {
-            "Gemini": GeminiAgent(),
-            "OpenAI": OpenAIAgent(),
-            "Claude": ClaudeAgent()
+    """
+    사용자 요청을 분석하여 적절한 에이전트로 라우팅합니다.
+
+    2026-10-17 KST: 공급자 장애 대응
+      - 서킷 브레이커: 오류율이 높은 공급자는 ROUTER_CIRCUIT_COOLDOWN초 동안 우회하고 다음 공급자로 보냅니다.
+      - 페일오버: 응답 전에 공급자 오류로 실패하면 ROUTER_FALLBACK_ORDER 순서의 다음 공급자로 재요청합니다.
+      - 헤지 요청(ROUTER_HEDGING=true): 기본 공급자가 최근 응답 시간의 ROUTER_HEDGE_PERCENTILE 백분위수
+        안에 응답하지 않으면 같은 요청을 다음 공급자에도 보내고, 먼저 끝난 응답을 쓰고 나머지는 취소합니다.
+    """
+    def __init__(self, response_cache=None, validator=None, hedging=None, failover=None, conversation_store=None,
+                 retriever=None):
+        # 2026-10-17 KST: 에이전트는 모델이 처음 요청될 때 생성합니다. API 키가 없는 모델만 사용할 수 없고
+        # 나머지 모델은 정상 동작합니다. (provider_status, /api/health 참고)
+        self.agent_specs = dict(AGENT_SPECS)
+        self.agents = {}
+        self.agent_errors = {}
+        self._agents_lock = threading.Lock()
+        # 모든 에이전트가 공유하는 검증 서비스 (agents.validator.ValidatorService). 검증을 요청받았을 때 생성하며,
+        # 검증 모델의 API 키가 없어도 다른 모델의 답변 생성은 영향을 받지 않습니다.
+        self._validator = validator
+        # 선택적 응답 캐시 (utils.response_cache.ResponseCache). None이면 캐시하지 않음
+        self.response_cache = response_cache
+        # 선택적 서버 대화 저장소 (utils.conversation_store.ConversationStore). None이면 클라이언트가 보낸 chat_history만 사용
+        self.conversation_store = conversation_store
+        # 선택적 참고자료 검색 단계 (agents.retrieval.ReferenceRetriever). None이면 프롬프트를 보강하지 않음
+        self.retriever = retriever
+
+        self.failover = _env_flag("ROUTER_FAILOVER", "true") if failover is None else failover
+        self.hedging = _env_flag("ROUTER_HEDGING", "false") if hedging is None else hedging
+        self.hedge_percentile = float(os.getenv("ROUTER_HEDGE_PERCENTILE", "0.9"))
+        # 응답 시간 기록이 ROUTER_HEDGE_MIN_SAMPLES개 미만이면 ROUTER_HEDGE_DELAY(초)를 기준으로 사용
+        self.hedge_default_delay = float(os.getenv("ROUTER_HEDGE_DELAY", "8"))
+        self.hedge_min_samples = int(os.getenv("ROUTER_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_min_delay = float(os.getenv("ROUTER_HEDGE_MIN_DELAY", "1"))
+        self.hedge_max_delay = float(os.getenv("ROUTER_HEDGE_MAX_DELAY", "30"))
+        fallback_order = [m.strip() for m in os.getenv("ROUTER_FALLBACK_ORDER", "Gemini,OpenAI,Claude").split(",")]
+        self.fallback_order = [m for m in fallback_order if m in self.agent_specs] + \
+            [m for m in self.agent_specs if m not in fallback_order]
+        self.breakers = {
+            key: CircuitBreaker(
+                key,
+                failure_threshold=float(os.getenv("ROUTER_CIRCUIT_FAILURE_RATE", "0.5")),
+                window=int(os.getenv("ROUTER_CIRCUIT_WINDOW", "20")),
+                min_requests=int(os.getenv("ROUTER_CIRCUIT_MIN_REQUESTS", "5")),
+                cooldown=float(os.getenv("ROUTER_CIRCUIT_COOLDOWN", "30")),
+            )
+            for key in self.agent_specs
         }
-        logger.info("AgentRouter initialized successfully.")
+        # (모델 키, 측정 대상) -> 최근 응답 시간. 측정 대상: "response", "validated_response", "first_event"
+        self.latency = {}
+        self.hedge_counters = {"hedged": 0, "hedge_wins": 0, "failovers": 0}
+        logger.info(
+            f"AgentRouter initialized successfully. (failover={self.failover}, hedging={self.hedging})"
+        )
+
+    @property
+    def validator(self):
+        """공유 검증 서비스. 검증 모델이 설정되지 않았으면 None입니다. (요청마다 다시 확인)"""
+        if self._validator is None:
+            self._validator = get_validator_or_none()
+        return self._validator
+
+    def get_agent(self, model_key):
+        """모델 키의 에이전트를 반환합니다. 처음 요청되면 에이전트 모듈을 불러와 생성합니다."""
+        agent = self.agents.get(model_key)
+        if agent is not None:
+            return agent
+        with self._agents_lock:
+            agent = self.agents.get(model_key)
+            if agent is None:
+                module_name, class_name, _ = self.agent_specs[model_key]
+                try:
+                    agent = getattr(importlib.import_module(module_name), class_name)()
+                except Exception as e:
+                    self.agent_errors[model_key] = str(e)
+                    logger.error(f"Failed to initialize '{model_key}' agent: {e}")
+                    raise APIException(f"{model_key} 모델을 사용할 수 없습니다: {e}", 503)
+                # 주입된 검증 서비스만 전달합니다. 없으면 에이전트가 검증을 요청받았을 때 공유 싱글턴을 찾습니다.
+                agent.validator = self._validator
+                self.agents[model_key] = agent
+                self.agent_errors.pop(model_key, None)
+                logger.info(f"'{model_key}' agent initialized.")
+        return agent
+
+    def provider_ready(self, model_key):
+        """에이전트가 생성되었거나 API 키가 설정되어 있어 호출할 수 있는 모델인지 확인합니다."""
+        if model_key in self.agents:
+            return True
+        return bool(get_api_key(self.agent_specs[model_key][2])) and model_key not in self.agent_errors
+
+    def provider_status(self):
+        """모델별 준비 상태(API 키 설정, 생성 여부, 오류, 서킷 상태)를 반환합니다. 에이전트를 생성하지 않습니다."""
+        status = {}
+        for key, (_, _, env_name) in self.agent_specs.items():
+            configured = key in self.agents or bool(get_api_key(env_name))
+            error = self.agent_errors.get(key) or (None if configured else f"{env_name} is not set.")
+            status[key] = {
+                "ready": self.provider_ready(key),
+                "initialized": key in self.agents,
+                "circuit": self.breakers[key].state,
+                "error": error,
+            }
+        return status
+
+    def _resolve_model(self, model_choice):
+        """모델 선택 값을 정규화(공백 제거, 대소문자 무시)하여 등록된 에이전트 키를 반환합니다."""
+        normalized = (model_choice or "").strip().lower()
+        for key in self.agent_specs:
+            if key.lower() == normalized:
+                return key
+        raise APIException(f"지원되지 않는 모델 선택: {model_choice}", 400)
+
+    def _open_conversation(self, conversation_id, chat_history):
+        """
+        conversation_id가 주어지면 서버에 저장된 대화 기록을 chat_history 대신 사용합니다.
+        빈 문자열이면 새 대화를 만듭니다. 서버 대화 저장소가 꺼져 있으면 빈 문자열은 chat_history를 그대로 사용합니다.
+        (conversation_id, chat_history)를 반환합니다.
+        """
+        if conversation_id is None or (not conversation_id and self.conversation_store is None):
+            return None, chat_history
+        if self.conversation_store is None:
+            raise APIException("서버 대화 저장소가 비활성화되어 있습니다. chat_history로 대화 기록을 보내주세요.", 400)
+        if not conversation_id:
+            conversation_id = self.conversation_store.create()
+        history = self.conversation_store.get_history(conversation_id)
+        if history is None:
+            raise APIException("대화를 찾을 수 없습니다. 만료되었을 수 있으니 새 대화를 시작해주세요.", 404)
+        return conversation_id, history
 
-    async def handle_request(self, prompt, chat_history, model_choice, use_validation):
+    def _save_exchange(self, conversation_id, prompt, response_text):
+        """응답이 끝난 턴을 서버 대화 기록에 추가합니다. 텍스트가 없는 응답(이미지 등)은 안내 문구로 남깁니다."""
+        if conversation_id is None:
+            return
+        try:
+            self.conversation_store.append_exchange(conversation_id, prompt, response_text or "(텍스트가 아닌 응답)")
+        except Exception as e:
+            logger.warning(f"Failed to save conversation turn: {e}")
+
+    async def handle_request(self, prompt, chat_history, model_choice, use_validation, conversation_id=None):
         """
         요청을 처리하고, 선택된 모델에 따라 적절한 에이전트를 호출합니다.
+
+        응답 캐시가 설정되어 있으면 동일한 요청의 이전 응답을 반환하며,
+        response_data["cached"]로 캐시 적중 여부를 알려줍니다.
+        conversation_id를 주면 서버에 저장된 대화 기록을 사용하고 이번 턴을 이어 붙이며,
+        response_data["conversation_id"]로 대화 ID를 돌려줍니다. (빈 문자열이면 새 대화)
+        참고자료 검색 단계가 설정되어 있으면 관련 발췌를 프롬프트에 붙이고 출처를 source_info 앞에 추가합니다.
+        """
+        model_key = self._resolve_model(model_choice)
+        conversation_id, chat_history = self._open_conversation(conversation_id, chat_history)
+        conversation = {"conversation_id": conversation_id} if conversation_id else {}
+        # 이 요청의 모든 API 호출(생성, 툴, 검증)이 공유하는 재시도 예산
+        start_retry_budget()
+        augmented_prompt, reference_sources = await self._augment(prompt)
+
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(model_key, chat_history, augmented_prompt, use_validation)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Response cache hit for '{model_key}' request.")
+                self._save_exchange(conversation_id, prompt, cached["response_data"].get("response_text"))
+                return cached["agent_name"], cached["agent_description"], {**cached["response_data"], **conversation, "cached": True}
+
+        kind = "validated_response" if use_validation else "response"
+        served_key, response_data = await self._race(
+            model_key, kind,
+            lambda agent: agent.process_request(augmented_prompt, chat_history, use_validation),
+        )
+        agent = self.agents[served_key]
+        # 에이전트가 이번 요청의 표시 이름(툴 사용, 검증 완료 등)을 돌려주면 그것을 사용합니다.
+        response_data = dict(response_data)
+        agent_name = response_data.pop("agent_name", agent.name)
+        agent_description = response_data.pop("agent_description", agent.description)
+        if reference_sources:
+            response_data["source_info"] = reference_sources + list(response_data.get("source_info", []))
+        self._save_exchange(conversation_id, prompt, response_data.get("response_text"))
+
+        # 캐시 키는 요청한 모델 기준이므로, 다른 공급자가 대신 답한 응답(페일오버/헤지)은 캐시하지 않습니다.
+        if cache_key is not None and served_key == model_key:
+            self.response_cache.set(cache_key, {
+                "agent_name": agent_name,
+                "agent_description": agent_description,
+                "response_data": response_data,
+            })
+
+        return agent_name, agent_description, {**response_data, **conversation, "cached": False}
+
+    async def stream_request(self, prompt, chat_history, model_choice, use_validation, conversation_id=None):
         """
-        if model_choice not in self.agents:
-            raise APIException(f"지원되지 않는 모델 선택: {model_choice}", 400)
-        
-        agent = self.agents[model_choice]
-        logger.info(f"Routing request to '{agent.name}' agent.")
-        
-        response_data = await agent.process_request(prompt, chat_history, use_validation)
-        
-        return agent.name, agent.description, response_data
\ No newline at end of file
+        선택된 에이전트의 응답을 이벤트 단위로 스트리밍합니다.
+
+        `meta` → `token`* → `message` 순서로 전달합니다. 검증을 요청한 경우 생성이 끝나는 즉시
+        원본 텍스트로 채점을 시작하여 HTML 렌더링 및 `message` 전송과 겹쳐 수행하고,
+        채점 결과는 `validation` 이벤트로, 개선된 답변이 필요하면 이후 `refinement` 이벤트로 전달합니다.
+        conversation_id를 주면 서버 대화 기록을 사용하며, `meta` 이벤트로 대화 ID를 알려주고
+        `message` 이벤트 직후 이번 턴을 대화 기록에 추가합니다.
+        참고자료 발췌의 출처는 `message` 이벤트의 source_info 앞에 추가합니다.
+        """
+        model_key = self._resolve_model(model_choice)
+        conversation_id, chat_history = self._open_conversation(conversation_id, chat_history)
+        conversation = {"conversation_id": conversation_id} if conversation_id else {}
+        start_retry_budget()
+        augmented_prompt, reference_sources = await self._augment(prompt)
+
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(model_key, chat_history, augmented_prompt, use_validation)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Response cache hit for streaming '{model_key}' request.")
+                response_data = dict(cached["response_data"])
+                self._save_exchange(conversation_id, prompt, response_data.pop("response_text", None))
+                yield {"event": "meta", "data": {"agent_name": cached["agent_name"], "agent_description": cached["agent_description"], **conversation}}
+                yield {"event": "message", "data": {**response_data, "agent_name": cached["agent_name"], **conversation, "cached": True}}
+                return
+
+        # 첫 이벤트가 도착한 스트림을 선택합니다. (페일오버/헤지는 첫 이벤트 이전에만 수행)
+        served_key, (stream, first_event) = await self._race(
+            model_key, "first_event",
+            lambda agent: self._open_stream(agent, augmented_prompt, chat_history),
+            discard=self._discard_stream,
+        )
+        agent = self.agents[served_key]
+        yield {"event": "meta", "data": {"agent_name": agent.name, "agent_description": agent.description, **conversation}}
+
+        validator = self.validator if use_validation else None
+        message = None
+        response_text = ""
+        score_task = None
+        events = self._continue_stream(served_key, stream, first_event)
+        try:
+            async for event in events:
+                if event["event"] == "message":
+                    message = dict(event["data"])
+                    message["source_info"] = reference_sources + list(message.get("source_info", []))
+                    response_text = message.pop("response_text", None) or ""
+                    if validator is not None and response_text:
+                        # 채점 요청을 먼저 시작하고, 렌더링은 스레드에서 수행하여 두 작업을 겹침
+                        score_task = asyncio.create_task(validator.score_response(prompt, response_text))
+                    if "response_content" not in message:
+                        message["response_content"] = await asyncio.to_thread(render_markdown, response_text)
+                    event = {"event": "message", "data": {**message, **conversation, "cached": False, "validation_pending": score_task is not None}}
+                    self._save_exchange(conversation_id, prompt, response_text)
+                yield event
+
+            if message is None:
+                return
+
+            agent_name = message.get("agent_name", agent.name)
+            response_content = message["response_content"]
+            source_info = list(message.get("source_info", []))
+
+            if score_task is not None:
+                verdict = await score_task
+                score_task = None
+                feedback_html = f"<div class='mt-4 p-4 border border-blue-200 rounded-md bg-blue-50'><h3 class='font-semibold text-blue-800'>수행 결과 검증 </h3>{verdict['feedback_html']}</div>"
+                validation_source = validator.source_info
+                yield {"event": "validation", "data": {
+                    "scores": verdict.get("scores", {}),
+                    "average_score": verdict.get("average_score"),
+                    "feedback_html": feedback_html,
+                    "refinement_pending": verdict["needs_refinement"],
+                    "source_info": validation_source,
+                }}
+
+                if verdict["needs_refinement"]:
+                    refinement = await validator.refine_response(prompt, response_text, verdict["feedback"])
+                    yield {"event": "refinement", "data": refinement}
+                    if refinement["refinement_content"]:
+                        response_content = refinement["refinement_content"]
+                    feedback_html += refinement["error_html"]
+
+                response_content += feedback_html
+                source_info.extend(validation_source)
+                agent_name = f"{agent_name} (검증 완료)"
+        finally:
+            if score_task is not None:
+                score_task.cancel()
+            await events.aclose()
+            await stream.aclose()
+
+        if cache_key is not None and served_key == model_key:
+            self.response_cache.set(cache_key, {
+                "agent_name": agent_name,
+                "agent_description": agent.description,
+                "response_data": {"response_content": response_content, "response_text": response_text, "source_info": source_info},
+            })
+
+    async def _augment(self, prompt):
+        """참고자료 검색 단계로 프롬프트를 보강합니다. 대화 기록에는 원래 프롬프트를 저장합니다."""
+        if self.retriever is None:
+            return prompt, []
+        return await asyncio.to_thread(self.retriever.augment, prompt)
+
+    def _latency(self, model_key, kind):
+        tracker = self.latency.get((model_key, kind))
+        if tracker is None:
+            tracker = self.latency.setdefault((model_key, kind), LatencyTracker())
+        return tracker
+
+    def _hedge_delay(self, model_key, kind):
+        """헤지 요청을 보낼 때까지 기다릴 시간(초). 최근 응답 시간의 백분위수를 최소/최대값으로 제한합니다."""
+        tracker = self._latency(model_key, kind)
+        if len(tracker) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile)))
+
+    def _candidates(self, model_key):
+        """
+        호출할 공급자 순서를 반환합니다. 선택한 모델이 먼저이고, 페일오버가 켜져 있으면
+        ROUTER_FALLBACK_ORDER 순서의 나머지 공급자가 뒤따릅니다. API 키가 없는 공급자는 제외하고,
+        서킷이 열린 공급자는 뒤로 보냅니다.
+        """
+        if not self.failover:
+            return [model_key]
+        ordered = [key for key in [model_key] + self.fallback_order if self.provider_ready(key)]
+        ordered = list(dict.fromkeys(ordered))
+        if not ordered:
+            # 사용할 수 있는 공급자가 없으면 선택한 모델로 시도하여 원인을 그대로 알립니다.
+            return [model_key]
+        if ordered[0] != model_key:
+            logger.warning(f"'{model_key}' is not configured. Routing to '{ordered[0]}' instead.")
+        available = [key for key in ordered if self.breakers[key].available()]
+        # 모든 서킷이 열려 있으면 선택한 모델로 시도합니다.
+        return available + [key for key in ordered if key not in available]
+
+    async def _call(self, model_key, kind, make_call):
+        """에이전트 호출 하나를 실행하고 결과를 서킷 브레이커와 응답 시간 기록에 반영합니다."""
+        breaker = self.breakers[model_key]
+        try:
+            agent = self.get_agent(model_key)
+        except APIException:
+            breaker.record_cancel()
+            raise
+        started = time.monotonic()
+        try:
+            result = await make_call(agent)
+        except asyncio.CancelledError:
+            breaker.record_cancel()
+            raise
+        except Exception as e:
+            if is_provider_error(e):
+                breaker.record_failure()
+            else:
+                breaker.record_cancel()
+            raise
+        self._latency(model_key, kind).add(time.monotonic() - started)
+        # 스트림은 끝까지 받은 뒤 성공으로 기록합니다. (_continue_stream)
+        if kind != "first_event":
+            breaker.record_success()
+        return result
+
+    async def _race(self, model_key, kind, make_call, discard=None):
+        """
+        선택한 모델로 호출하고, 공급자 오류 시 다음 후보로 페일오버하며, 헤지가 켜져 있으면
+        응답이 늦을 때 다음 후보에도 같은 요청을 보냅니다. 가장 먼저 성공한 (모델 키, 결과)를 반환하고
+        나머지 호출은 취소합니다. 동시에 성공한 나머지 결과는 discard(모델 키, 결과) 코루틴으로 정리합니다.
+        """
+        queue = self._candidates(model_key)
+        pending = {}
+        hedged = False
+        last_error = None
+
+        def launch(reason):
+            while queue:
+                key = queue.pop(0)
+                if not self.breakers[key].allow_request():
+                    logger.warning(f"Circuit for '{key}' is open. Skipping it.")
+                    continue
+                if reason:
+                    logger.info(f"Sending {reason} request to '{key}' agent.")
+                else:
+                    logger.info(f"Routing request to '{key}' agent.")
+                pending[asyncio.create_task(self._call(key, kind, make_call))] = key
+                return True
+            return False
+
+        if not launch(None if queue[0] == model_key else "failover"):
+            raise APIException("모든 LLM 공급자가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요.", 503)
+
+        try:
+            while pending:
+                timeout = None
+                if self.hedging and not hedged and queue:
+                    timeout = self._hedge_delay(next(iter(pending.values())), kind)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if launch("hedged"):
+                        self.hedge_counters["hedged"] += 1
+                    continue
+
+                winner = None
+                fatal = None
+                for task in done:
+                    key = pending.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        if not is_provider_error(error):
+                            fatal = fatal or error
+                            continue
+                        logger.warning(f"'{key}' agent failed: {error}")
+                        last_error = error
+                    elif winner is None:
+                        winner = (key, task.result())
+                    elif discard is not None:
+                        await discard(key, task.result())
+                if fatal is not None:
+                    # 함께 끝난 호출의 오류로 요청이 실패하면 이미 받은 결과(열린 스트림)도 정리합니다.
+                    if winner is not None and discard is not None:
+                        await discard(*winner)
+                    raise fatal
+                if winner is not None:
+                    if winner[0] != model_key:
+                        self.hedge_counters["hedge_wins" if hedged else "failovers"] += 1
+                        logger.info(f"Request for '{model_key}' was served by '{winner[0]}'.")
+                    return winner
+                if not pending and not launch("failover"):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # 취소 직전에 끝난 호출은 cancel()이 효과가 없으므로, 성공한 결과를 discard로 정리합니다.
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for key, result in zip(pending.values(), results):
+                        if not isinstance(result, BaseException):
+                            await discard(key, result)
+
+        if last_error is not None:
+            raise last_error
+        raise APIException("모든 LLM 공급자가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요.", 503)
+
+    async def _open_stream(self, agent, prompt, chat_history):
+        """에이전트 스트림을 시작하고 첫 이벤트까지 받아 (스트림, 첫 이벤트)를 반환합니다."""
+        stream = agent.stream_request(prompt, chat_history)
+        try:
+            first_event = await stream.__anext__()
+        except StopAsyncIteration:
+            first_event = None
+        except BaseException:
+            await stream.aclose()
+            raise
+        return stream, first_event
+
+    async def _discard_stream(self, model_key, opened):
+        self.breakers[model_key].record_cancel()
+        await opened[0].aclose()
+
+    async def _continue_stream(self, model_key, stream, first_event):
+        """첫 이벤트와 나머지 스트림을 이어서 전달하고, 결과를 서킷 브레이커에 기록합니다."""
+        breaker = self.breakers[model_key]
+        outcome = None
+        try:
+            if first_event is not None:
+                yield first_event
+            async for event in stream:
+                yield event
+            outcome = "success"
+        except Exception as e:
+            if is_provider_error(e):
+                outcome = "failure"
+            raise
+        finally:
+            # 클라이언트 연결 종료나 취소로 끝까지 받지 못한 스트림은 결과로 기록하지 않습니다.
+            if outcome == "success":
+                breaker.record_success()
+            elif outcome == "failure":
+                breaker.record_failure()
+            else:
+                breaker.record_cancel()
+
+    def stats(self):
+        """공급자별 서킷 상태, 응답 시간 백분위수, 헤지/페일오버 횟수를 반환합니다."""
+        return {
+            "providers": self.provider_status(),
+            "conversations": self.conversation_store.stats() if self.conversation_store is not None else None,
+            "context_window": context_window.stats(),
+            "retrieval": self.retriever.stats() if self.retriever is not None else None,
+            "failover": self.failover,
+            "hedging": self.hedging,
+            "circuits": {key: breaker.stats() for key, breaker in self.breakers.items()},
+            "latency": {f"{key}:{kind}": tracker.stats() for (key, kind), tracker in self.latency.items()},
+            **self.hedge_counters,
+        }
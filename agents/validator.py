@@ -0,0 +1,346 @@
+# agents/validator.py
+import abc
+import json
+import logging
+import os
+import threading
+
+from utils.api_calls import fetch_with_exponential_backoff
+from utils.config import get_api_key
+from utils.http_client import HTTPClient
+from utils.markdown_render import render_markdown
+from utils.rate_limit import ConcurrencyLimiter
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_CRITERIA = ["정확성", "관련성", "완전성", "명확성_간결성", "논리적_일관성"]
+
+
+def build_validation_prompt(original_prompt, generated_text):
+    """채점 요청 프롬프트를 만듭니다."""
+    return f"""
+        아래는 원본 질문과 생성된 답변입니다.
+
+        ### 원본 질문
+        {original_prompt}
+
+        ### 생성된 답변
+        {generated_text}
+
+        다음 5가지 기준에 따라 100점 만점으로 점수를 매기고, 각 항목에 대한 구체적인 피드백을 제공해주세요.
+        점수는 오직 숫자만 반환해야 합니다.
+
+        1. **정확성**: 답변의 내용이 사실에 부합하는가?
+        2. **관련성**: 답변이 원본 질문의 의도와 목적에 얼마나 부합하는가?
+        3. **완전성**: 질문의 모든 측면을 충분히 다루고 있는가?
+        4. **명확성 및 간결성**: 내용이 이해하기 쉽고 불필요한 부분이 없는가?
+        5. **논리적 일관성**: 내용의 흐름이 자연스럽고 논리적인가?
+
+        응답은 반드시 아래와 같은 JSON 형식으로 반환해야 합니다.
+        {{
+            "scores": {{
+                "정확성": 0,
+                "관련성": 0,
+                "완전성": 0,
+                "명확성_간결성": 0,
+                "논리적_일관성": 0
+            }},
+            "feedback": {{
+                "정확성": "피드백 내용",
+                "관련성": "피드백 내용",
+                "완전성": "피드백 내용",
+                "명확성_간결성": "피드백 내용",
+                "논리적_일관성": "피드백 내용"
+            }}
+        }}
+        """
+
+
+def build_refinement_prompt(original_prompt, generated_text, feedback):
+    """채점 피드백을 반영한 답변 개선 요청 프롬프트를 만듭니다."""
+    return f"""
+            다음은 사용자의 원본 질문과 생성된 답변, 그리고 그에 대한 피드백입니다.
+            피드백을 참고하여 답변을 개선하고, 더 정확하고 완전한 답변을 다시 작성해주세요.
+
+            ### 원본 질문
+            {original_prompt}
+
+            ### 기존 답변
+            {generated_text}
+
+            ### 피드백
+            {json.dumps(feedback, ensure_ascii=False, indent=2)}
+
+            개선된 답변만 작성해주세요.
+            """
+
+
+class ValidationBackend(abc.ABC):
+    """
+    검증에 사용하는 모델 백엔드의 추상 기본 클래스입니다.
+
+    score()는 {"scores": {...}, "feedback": {...}} 딕셔너리를, refine()은 개선된 답변 텍스트(마크다운)를 반환합니다.
+    complete()는 프롬프트에 대한 텍스트 응답을 반환하며, 대화 요약 등 보조 작업에 사용합니다.
+    """
+
+    label = "검증 모델"
+
+    @abc.abstractmethod
+    async def score(self, original_prompt, generated_text):
+        raise NotImplementedError("하위 클래스는 score() 메서드를 반드시 구현해야 합니다.")
+
+    @abc.abstractmethod
+    async def refine(self, original_prompt, generated_text, feedback):
+        raise NotImplementedError("하위 클래스는 refine() 메서드를 반드시 구현해야 합니다.")
+
+    @abc.abstractmethod
+    async def complete(self, prompt):
+        raise NotImplementedError("하위 클래스는 complete() 메서드를 반드시 구현해야 합니다.")
+
+
+class GeminiValidationBackend(ValidationBackend):
+    """Gemini generateContent API로 채점/개선을 수행하는 백엔드."""
+
+    def __init__(self, api_key, model="gemini-2.5-flash", http_client=None):
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is not set.")
+        self.api_key = api_key
+        self.model = model
+        self.label = f"Gemini {model}"
+        self.http_client = http_client or HTTPClient()
+        self.api_base_url = "https://generativelanguage.googleapis.com/v1beta/models/"
+
+    def _url(self):
+        return f"{self.api_base_url}{self.model}:generateContent?key={self.api_key}"
+
+    async def score(self, original_prompt, generated_text):
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": build_validation_prompt(original_prompt, generated_text)}]}],
+            "generationConfig": {"responseMimeType": "application/json"}
+        }
+        response = await fetch_with_exponential_backoff(self._url(), payload, session=self.http_client.get_session(), provider="gemini")
+        return json.loads(response["candidates"][0]["content"]["parts"][0]["text"])
+
+    async def refine(self, original_prompt, generated_text, feedback):
+        return await self.complete(build_refinement_prompt(original_prompt, generated_text, feedback))
+
+    async def complete(self, prompt):
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        response = await fetch_with_exponential_backoff(self._url(), payload, session=self.http_client.get_session(), provider="gemini")
+        return response["candidates"][0]["content"]["parts"][0]["text"]
+
+
+class OpenAICompatibleValidationBackend(ValidationBackend):
+    """
+    OpenAI 호환 Chat Completions API(/v1/chat/completions)로 채점/개선을 수행하는 백엔드.
+
+    OpenAI의 경량 모델뿐 아니라 Ollama, vLLM 등 로컬에서 실행하는 OpenAI 호환 서버도 사용할 수 있습니다.
+    """
+
+    def __init__(self, model, base_url="https://api.openai.com/v1", api_key=None, http_client=None, provider="openai"):
+        self.model = model
+        self.provider = provider
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.label = model
+        self.http_client = http_client or HTTPClient()
+
+    async def _complete(self, prompt, json_mode):
+        payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+        response = await fetch_with_exponential_backoff(
+            f"{self.base_url}/chat/completions", payload, session=self.http_client.get_session(), headers=headers,
+            provider=self.provider
+        )
+        return response["choices"][0]["message"]["content"]
+
+    async def score(self, original_prompt, generated_text):
+        return json.loads(await self._complete(build_validation_prompt(original_prompt, generated_text), json_mode=True))
+
+    async def refine(self, original_prompt, generated_text, feedback):
+        return await self._complete(build_refinement_prompt(original_prompt, generated_text, feedback), json_mode=False)
+
+    async def complete(self, prompt):
+        return await self._complete(prompt, json_mode=False)
+
+
+class ValidatorService:
+    """
+    모든 에이전트가 공유하는 답변 검증 서비스.
+
+    백엔드(ValidationBackend)로 채점과 답변 개선을 수행하며, 동시에 진행되는 검증 호출 수를
+    max_concurrency로 제한합니다. 평균 점수가 pass_score 미만이면 개선이 필요하다고 판정합니다.
+    """
+
+    def __init__(self, backend, max_concurrency=8, pass_score=60):
+        self.backend = backend
+        self.pass_score = pass_score
+        self.limiter = ConcurrencyLimiter(max_concurrency)
+        self.source_info = [{"type": "Validation", "info": f"최종 검토 에이전트 ({backend.label})"}]
+        self.validations = 0
+        self.refinements = 0
+        self.failures = 0
+
+    async def score_response(self, original_prompt, generated_text):
+        """
+        원본 답변 텍스트를 5가지 기준으로 채점합니다.
+
+        Returns:
+            dict: scores, feedback, average_score, feedback_html, reconsideration_prompt,
+                  needs_refinement(평균 점수가 pass_score 미만이면 True)
+        """
+        logger.info(f"Validating content for prompt: '{original_prompt[:50]}'")
+        self.validations += 1
+        try:
+            async with self.limiter:
+                validation_data = await self.backend.score(original_prompt, generated_text)
+        except Exception as e:
+            logger.error(f"Validation API call failed: {e}")
+            self.failures += 1
+            return {
+                "scores": {criterion: 0 for criterion in VALIDATION_CRITERIA},
+                "feedback": {"error": "검증 시스템 오류가 발생했습니다."},
+                "average_score": 0,
+                "feedback_html": f"<p class='text-red-600 mt-2'>검증 시스템 오류가 발생했습니다: {str(e)}</p>",
+                "reconsideration_prompt": None,
+                "needs_refinement": False
+            }
+
+        scores = validation_data.get("scores", {})
+        feedback = validation_data.get("feedback", {})
+
+        total_score = sum(scores.values())
+        average_score = total_score / len(scores) if len(scores) > 0 else 0
+
+        feedback_html = "<div>"
+        feedback_html += f"<p class='font-semibold'>평가 점수 (100점 만점):</p><ul class='list-disc list-inside'>"
+        for c, score in scores.items():
+            feedback_html += f"<li>{c}: {score}점</li>"
+        feedback_html += f"</ul><p class='font-bold mt-2'>전체 평균 점수: {average_score:.2f}점</p>"
+
+        reconsideration_prompt = None
+        needs_refinement = average_score < self.pass_score
+        if needs_refinement:
+            feedback_html += f"<p class='text-red-600 mt-2'>평균 점수가 {self.pass_score:g}점 이하이므로 프롬프트 재설계를 통한 재수행을 제안합니다.</p>"
+            reconsideration_prompt = f"원본 프롬프트: '{original_prompt}'에 대한 결과의 평균 점수가 {average_score:.2f}점이므로, 프롬프트를 재설계하여 더 나은 답변을 생성해주세요."
+        else:
+            feedback_html += "<p class='text-green-600 mt-2'>전반적으로 좋은 결과입니다.</p>"
+
+        feedback_html += "</div>"
+
+        return {
+            "scores": scores,
+            "feedback": feedback,
+            "average_score": average_score,
+            "feedback_html": feedback_html,
+            "reconsideration_prompt": reconsideration_prompt,
+            "needs_refinement": needs_refinement
+        }
+
+    async def refine_response(self, original_prompt, generated_text, feedback):
+        """
+        채점 피드백을 바탕으로 개선된 답변을 생성합니다.
+
+        Returns:
+            dict: refinement_content(렌더링된 HTML, 실패 시 None), error_html(실패 안내, 성공 시 빈 문자열)
+        """
+        logger.info("Performing refinement...")
+        self.refinements += 1
+        try:
+            async with self.limiter:
+                refinement_content = await self.backend.refine(original_prompt, generated_text, feedback)
+            return {"refinement_content": render_markdown(refinement_content), "error_html": ""}
+        except Exception as e:
+            logger.error(f"Refinement failed: {e}")
+            self.failures += 1
+            return {"refinement_content": None, "error_html": f"<p class='text-red-600 mt-2'>답변 개선에 실패했습니다: {str(e)}</p>"}
+
+    async def validate(self, original_prompt, generated_text):
+        """채점 후 필요하면 답변 개선까지 수행한 결과를 반환합니다."""
+        verdict = await self.score_response(original_prompt, generated_text)
+        refinement_content = None
+        if verdict["needs_refinement"]:
+            refinement = await self.refine_response(original_prompt, generated_text, verdict["feedback"])
+            refinement_content = refinement["refinement_content"]
+            verdict["feedback_html"] += refinement["error_html"]
+        return {**verdict, "refinement_content": refinement_content}
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "model": self.backend.label,
+            "validations": self.validations,
+            "refinements": self.refinements,
+            "failures": self.failures,
+            **self.limiter.stats(),
+        }
+
+
+def create_validator_from_env():
+    """
+    환경 변수로 검증 서비스를 구성합니다.
+
+    - VALIDATOR_BACKEND: gemini(기본) | openai-compatible
+    - VALIDATOR_MODEL: 검증 모델 (기본 gemini-2.5-flash / gpt-4o-mini)
+    - VALIDATOR_BASE_URL: openai-compatible 백엔드의 API 주소 (기본 https://api.openai.com/v1, 로컬 서버 주소 가능)
+    - VALIDATOR_API_KEY: openai-compatible 백엔드의 API 키 (기본 OPENAI_API_KEY)
+    - VALIDATOR_MAX_CONCURRENCY: 동시 검증 호출 수 (기본 8)
+    - VALIDATOR_POOL_LIMIT: 검증 전용 커넥션 풀 크기 (기본 20)
+    - VALIDATOR_PASS_SCORE: 개선 없이 통과하는 평균 점수 (기본 60)
+    """
+    backend_name = os.getenv("VALIDATOR_BACKEND", "gemini").lower()
+    pool_limit = int(os.getenv("VALIDATOR_POOL_LIMIT", "20"))
+    http_client = HTTPClient(limit=pool_limit, limit_per_host=pool_limit)
+
+    if backend_name == "gemini":
+        backend = GeminiValidationBackend(
+            get_api_key("GEMINI_API_KEY"),
+            model=os.getenv("VALIDATOR_MODEL", "gemini-2.5-flash"),
+            http_client=http_client,
+        )
+    elif backend_name == "openai-compatible":
+        base_url = os.getenv("VALIDATOR_BASE_URL", "https://api.openai.com/v1")
+        backend = OpenAICompatibleValidationBackend(
+            model=os.getenv("VALIDATOR_MODEL", "gpt-4o-mini"),
+            base_url=base_url,
+            api_key=os.getenv("VALIDATOR_API_KEY") or get_api_key("OPENAI_API_KEY"),
+            http_client=http_client,
+            # OpenAI가 아닌 로컬/사설 서버는 별도의 속도 제한(LOCAL_VALIDATOR_*)을 사용
+            provider="openai" if "api.openai.com" in base_url else "local-validator",
+        )
+    else:
+        raise ValueError(f"Unknown VALIDATOR_BACKEND: {backend_name}")
+
+    logger.info(f"Validator initialized (backend={backend_name}, model={backend.label})")
+    return ValidatorService(
+        backend,
+        max_concurrency=int(os.getenv("VALIDATOR_MAX_CONCURRENCY", "8")),
+        pass_score=float(os.getenv("VALIDATOR_PASS_SCORE", "60")),
+    )
+
+
+_validator = None
+_validator_lock = threading.Lock()
+
+
+def get_validator():
+    """프로세스에서 공유하는 검증 서비스를 반환합니다. 처음 호출할 때 환경 변수로 생성합니다."""
+    global _validator
+    with _validator_lock:
+        if _validator is None:
+            _validator = create_validator_from_env()
+        return _validator
+
+
+def get_validator_or_none():
+    """
+    공유 검증 서비스를 반환하되, 설정 오류(검증 모델의 API 키 누락 등)로 만들 수 없으면 경고를 남기고 None을 반환합니다.
+    검증 모델을 쓸 수 없어도 답변 생성은 계속할 수 있도록 호출자는 None이면 검증을 건너뜁니다.
+    """
+    try:
+        return get_validator()
+    except ValueError as e:
+        logger.warning(f"Validation is unavailable, skipping it: {e}")
+        return None
@@ -0,0 +1,113 @@
+# asgi.py
+# 2026-10-17 KST: 운영용 ASGI 진입점
+#   - 채팅 API(/api/chat, /api/chat/stream)는 하나의 장수명 이벤트 루프에서 네이티브 비동기로 처리하여
+#     aiohttp 세션과 OpenAI/Anthropic SDK 클라이언트 풀을 요청 간에 재사용합니다.
+#   - 나머지 라우트(정적 파일, 참고자료, 템플릿 등)는 기존 Flask 앱을 WsgiToAsgi로 그대로 제공합니다.
+#   - 실행: uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4 (README 참고)
+
+import json
+import logging
+from contextlib import asynccontextmanager
+
+from asgiref.wsgi import WsgiToAsgi
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import backend
+from agents.context_window import context_window
+from utils.exceptions import APIException
+from utils.http_client import close_session, get_session
+
+logger = logging.getLogger(__name__)
+
+
+async def read_chat_form(request):
+    """채팅 요청 폼을 읽어 (프롬프트+첨부 텍스트, 대화 기록, 모델 선택, 검증 여부, 대화 ID)를 반환합니다."""
+    form = await request.form()
+    if 'prompt' not in form:
+        raise APIException("프롬프트가 비어있습니다.", 400)
+    try:
+        chat_history = json.loads(form.get('chat_history', '[]'))
+    except json.JSONDecodeError as e:
+        raise APIException(f"요청을 처리할 수 없습니다: {str(e)}", 400)
+
+    uploads = []
+    for file in form.getlist('files'):
+        if getattr(file, 'filename', None):
+            uploads.append((file.filename, await file.read()))
+    # 첨부 파일 텍스트 추출(PDF 파싱)은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 수행
+    prompt_with_context = await run_in_threadpool(backend.build_prompt_with_uploads, form.get('prompt', ''), uploads)
+    return (
+        prompt_with_context,
+        chat_history,
+        form.get('llm_model_choice', 'Gemini'),
+        form.get('use_validation', 'false').lower() == 'true',
+        form.get('conversation_id'),
+    )
+
+
+async def chat_endpoint(request):
+    if not backend.router:
+        return JSONResponse({"error": "서비스 준비 중입니다. 잠시 후 다시 시도해주세요."}, status_code=503)
+    try:
+        prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id = await read_chat_form(request)
+        agent_name, agent_description, response_data = await backend.router.handle_request(
+            prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id
+        )
+        return JSONResponse(backend.chat_response_body(agent_name, agent_description, response_data))
+    except APIException as e:
+        return JSONResponse({"error": e.message}, status_code=e.status_code)
+    except Exception as e:
+        logger.exception("Internal server error")
+        return JSONResponse({"error": f"내부 서버 오류가 발생했습니다: {str(e)}"}, status_code=500)
+
+
+async def chat_stream_endpoint(request):
+    if not backend.router:
+        return JSONResponse({"error": "서비스 준비 중입니다. 잠시 후 다시 시도해주세요."}, status_code=503)
+    try:
+        prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id = await read_chat_form(request)
+    except APIException as e:
+        return JSONResponse({"error": e.message}, status_code=e.status_code)
+    except Exception as e:
+        logger.exception("Invalid streaming chat request")
+        return JSONResponse({"error": f"요청을 처리할 수 없습니다: {str(e)}"}, status_code=400)
+
+    events = backend.router.stream_request(
+        prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id
+    )
+    return StreamingResponse(backend.generate_sse(events), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """워커 시작 시 공유 HTTP 세션을 준비하고, 종료 시 백그라운드 대화 요약을 마무리한 뒤 루프에 묶인 모든 클라이언트 풀을 닫습니다."""
+    get_session()
+    logger.info("ASGI worker started: pooled HTTP/SDK clients are shared on a single event loop.")
+    try:
+        yield
+    finally:
+        await context_window.close()
+        await close_session()
+        logger.info("ASGI worker stopped: pooled clients closed.")
+
+
+# 2026-10-17 KST: 라우트 단위 미들웨어는 라우트 매칭(POST만 허용) 뒤에 실행되어 OPTIONS 프리플라이트가 405로 끝나므로,
+# CORS 미들웨어를 앱 전체에 적용하여 라우팅 전에 프리플라이트에 응답합니다.
+# Flask 쪽 응답에는 flask-cors가 이미 헤더를 넣으므로 CORSMiddleware는 기존 헤더를 덮어쓰기만 합니다.
+app = Starlette(
+    routes=[
+        Route('/api/chat', chat_endpoint, methods=['POST']),
+        Route('/api/chat/stream', chat_stream_endpoint, methods=['POST']),
+        Mount('/', app=WsgiToAsgi(backend.app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+    lifespan=lifespan,
+)
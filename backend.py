@@ -4,24 +4,34 @@
 
 import os
 import json
+import queue
+import hashlib
 import logging
 import asyncio
+import threading
 import aiohttp
-import tempfile
-import markdown
-import fitz
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# .env 파일에서 환경 변수 로드 (내부 모듈이 import 시점에 환경 변수를 읽으므로 먼저 로드)
+load_dotenv()
+
 # 내부 모듈 임포트
 from utils.exceptions import APIException
 from utils.config import get_api_key, setup_logging
+from utils.cache import LRUCache
+from utils.http_client import close_session
+from utils.rate_limit import limiter_stats
+from utils.reference_index import create_reference_index_from_env, normalize_abstract
+from utils.conversation_store import create_conversation_store_from_env
+from utils.extraction_cache import extraction_cache
+from utils.response_cache import create_response_cache_from_env
+from utils.summary_renderer import render_summary_html
+from utils.text_extraction import DEFAULT_MAX_CHARS as MAX_FILE_CHARS, extract_text, extract_text_from_path
+from tools.web_search import web_search_stats
+from agents.retrieval import create_retriever_from_env
 from agents.router import AgentRouter
-from agents.gemini_agent import GeminiAgent
-
-# .env 파일에서 환경 변수 로드
-load_dotenv()
 
 # 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -42,9 +52,19 @@ if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# 2026-10-17 KST: 참고자료 전문 검색 인덱스 - 모든 폴더의 Abstract_*.json을 표준 레코드로 변환해 SQLite FTS5로 색인합니다.
+# 첫 검색 때 색인하고, 이후에는 REFERENCE_INDEX_REFRESH초마다 바뀐 파일만 다시 색인합니다.
+# /api/reference-search와 라우터의 참고자료 검색 단계(RAG)가 함께 사용합니다.
+reference_index = create_reference_index_from_env(DATA_FOLDER)
+
 # 라우터 에이전트 초기화
+# 2026-10-17 KST: 에이전트는 모델이 처음 요청될 때 생성되므로 API 키가 없는 모델이 있어도 라우터는 준비됩니다.
 try:
-    router = AgentRouter()
+    router = AgentRouter(
+        response_cache=create_response_cache_from_env(),
+        conversation_store=create_conversation_store_from_env(),
+        retriever=create_retriever_from_env(reference_index),
+    )
 except Exception as e:
     logger.error(f"Failed to initialize AgentRouter: {e}")
     router = None
@@ -53,27 +73,128 @@ except Exception as e:
 # --- 헬퍼 함수 ---
 def read_file_content(file_path):
     """파일 경로를 받아 확장자에 따라 텍스트 내용을 추출합니다."""
-    _, file_extension = os.path.splitext(file_path)
-    file_extension = file_extension.lower()
-
-    content = ""
     try:
-        if file_extension == '.pdf':
-            doc = fitz.open(file_path)
-            for page in doc:
-                content += page.get_text()
-            doc.close()
-            return content[:15000]
-        elif file_extension in ['.txt', '.md', '.json', '.csv', '.py', '.html', '.css', '.js']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()[:15000]
-        else:
-            return None
+        return extract_text_from_path(file_path, MAX_FILE_CHARS)
     except Exception as e:
         logger.error(f"Error reading file {file_path}: {e}")
         return f"파일('{os.path.basename(file_path)}')을 읽는 중 오류가 발생했습니다."
 
 
+def read_upload_content(filename, data):
+    """
+    업로드 파일의 텍스트를 추출합니다.
+
+    파일 내용의 해시로 추출 캐시를 먼저 조회하고, 캐시에 없을 때만 업로드 바이트를
+    메모리에서 바로 파싱합니다. 읽기에 실패한 결과는 캐시하지 않습니다.
+    """
+    cache_key = extraction_cache.make_key(data, filename, MAX_FILE_CHARS)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Extraction cache hit for '{filename}'")
+        return cached
+
+    try:
+        content = extract_text(data, filename, MAX_FILE_CHARS)
+    except Exception as e:
+        logger.error(f"Error reading file {filename}: {e}")
+        return f"파일('{os.path.basename(filename)}')을 읽는 중 오류가 발생했습니다."
+
+    if content is not None:
+        extraction_cache.set(cache_key, content)
+    return content
+
+
+def build_prompt_with_uploads(prompt, uploads):
+    """업로드된 (파일명, 바이트) 목록의 텍스트를 추출하여 프롬프트 앞에 붙입니다."""
+    file_contents = []
+    for filename, data in uploads:
+        content = read_upload_content(filename, data)
+        file_contents.append(f"--- 파일: {filename} ---\n{content or '(내용을 읽을 수 없음)'}\n--- 파일 끝 ---")
+
+    return "\n".join(file_contents) + "\n\n" + prompt if file_contents else prompt
+
+
+def build_prompt_with_files(prompt, files):
+    """Flask 업로드 파일(FileStorage)의 텍스트를 추출하여 프롬프트 앞에 붙입니다."""
+    return build_prompt_with_uploads(prompt, [(file.filename, file.read()) for file in files or [] if file.filename])
+
+
+def chat_response_body(agent_name, agent_description, response_data):
+    """/api/chat 응답 본문을 만듭니다."""
+    return {
+        "agent_name": agent_name,
+        "agent_description": agent_description,
+        "response_content": response_data.get("response_content", ""),
+        "source_info": response_data.get("source_info", []),
+        "cached": response_data.get("cached", False),
+        "conversation_id": response_data.get("conversation_id")
+    }
+
+
+def format_sse(event):
+    """이벤트 딕셔너리를 Server-Sent Events 형식의 문자열로 변환합니다."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+
+async def generate_sse(events):
+    """
+    에이전트 이벤트 제너레이터를 SSE 문자열 스트림으로 변환합니다.
+
+    처리 중 오류는 `error` 이벤트로 전달하고, 마지막에 항상 `done` 이벤트를 보냅니다.
+    """
+    try:
+        async for event in events:
+            yield format_sse(event)
+    except APIException as e:
+        yield format_sse({"event": "error", "data": {"error": e.message, "status": e.status_code}})
+    except Exception as e:
+        logger.exception("Streaming error")
+        yield format_sse({"event": "error", "data": {"error": f"내부 서버 오류가 발생했습니다: {str(e)}", "status": 500}})
+    finally:
+        await events.aclose()
+    yield format_sse({"event": "done", "data": {}})
+
+
+def iterate_async_events(make_events):
+    """
+    비동기 이벤트 제너레이터를 Flask 스트리밍 응답용 동기 제너레이터로 감쌉니다.
+
+    이벤트 루프를 별도 스레드에서 응답이 끝날 때까지 계속 실행하므로, Flask가 이벤트를
+    클라이언트로 전송하는 동안에도 백그라운드 작업(예: 검증 요청)이 진행됩니다.
+    공유 HTTP 세션도 그동안 재사용됩니다. 클라이언트 연결이 끊기면 남은 작업을 취소합니다.
+    """
+    loop = asyncio.new_event_loop()
+    pending = queue.Queue()
+    finished = threading.Event()
+
+    async def pump():
+        try:
+            async for chunk in generate_sse(make_events()):
+                pending.put(chunk)
+        finally:
+            try:
+                await close_session()
+            finally:
+                finished.set()
+
+    thread = threading.Thread(target=loop.run_forever, name="sse-event-loop", daemon=True)
+    thread.start()
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    future.add_done_callback(lambda _: pending.put(None))
+    try:
+        while True:
+            chunk = pending.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        future.cancel()
+        finished.wait(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
 # --- 기본 및 채팅 API 라우트 ---
 @app.route('/')
 def serve_index():
@@ -93,46 +214,117 @@ async def chat_endpoint():
         chat_history_str = data.get('chat_history', '[]')
         chat_history = json.loads(chat_history_str)
         llm_model_choice = data.get('llm_model_choice', 'Gemini')
+        # 2026-10-17 KST: conversation_id를 보내면 chat_history 대신 서버에 저장된 대화 기록을 사용 (빈 값이면 새 대화)
+        conversation_id = data.get('conversation_id')
         files = request.files.getlist('files')
 
-        file_contents = []
-        temp_files = []
-
-        if files:
-            for file in files:
-                if file.filename == '': continue
-                temp_dir = tempfile.mkdtemp()
-                temp_path = os.path.join(temp_dir, file.filename)
-                file.save(temp_path)
-                temp_files.append((temp_path, temp_dir))
-                content = read_file_content(temp_path)
-                file_contents.append(f"--- 파일: {file.filename} ---\n{content or '(내용을 읽을 수 없음)'}\n--- 파일 끝 ---")
-
-        prompt_with_context = "\n".join(file_contents) + "\n\n" + prompt if file_contents else prompt
+        prompt_with_context = build_prompt_with_files(prompt, files)
 
         agent_name, agent_description, response_data = await router.handle_request(
-            prompt_with_context, chat_history, llm_model_choice, use_validation
+            prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id
         )
 
-        for path, dir_path in temp_files:
-            try:
-                os.remove(path)
-                os.rmdir(dir_path)
-            except OSError as e:
-                logger.error(f"Error cleaning up temp file {path}: {e}")
-
-        return jsonify({
-            "agent_name": agent_name,
-            "agent_description": agent_description,
-            "response_content": response_data.get("response_content", ""),
-            "source_info": response_data.get("source_info", [])
-        })
+        return jsonify(chat_response_body(agent_name, agent_description, response_data))
 
     except APIException as e:
         return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         logger.exception("Internal server error")
         return jsonify({"error": f"내부 서버 오류가 발생했습니다: {str(e)}"}), 500
+    finally:
+        # Flask async 뷰는 요청마다 이벤트 루프를 새로 만들므로, 루프가 닫히기 전에 루프에 묶인 공유 세션을 정리
+        await close_session()
+
+
+# 2026-10-17 KST: 토큰 스트리밍(SSE) 채팅 API - 생성 중인 답변을 즉시 전달하고 검증 결과는 마지막 이벤트로 전달
+# 2026-10-17 KST: 검증은 원본 텍스트로 답변 렌더링/전송과 동시에 수행하고, 판정(validation)과 개선 답변(refinement)을 후속 이벤트로 전달
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream_endpoint():
+    if not router:
+        return jsonify({"error": "서비스 준비 중입니다. 잠시 후 다시 시도해주세요."}), 503
+    if 'prompt' not in request.form:
+        return jsonify({"error": "프롬프트가 비어있습니다."}), 400
+
+    try:
+        data = request.form
+        prompt = data.get('prompt', '')
+        use_validation = data.get('use_validation', 'false').lower() == 'true'
+        chat_history = json.loads(data.get('chat_history', '[]'))
+        llm_model_choice = data.get('llm_model_choice', 'Gemini')
+        conversation_id = data.get('conversation_id')
+        prompt_with_context = build_prompt_with_files(prompt, request.files.getlist('files'))
+    except Exception as e:
+        logger.exception("Invalid streaming chat request")
+        return jsonify({"error": f"요청을 처리할 수 없습니다: {str(e)}"}), 400
+
+    events = iterate_async_events(
+        lambda: router.stream_request(prompt_with_context, chat_history, llm_model_choice, use_validation, conversation_id)
+    )
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+# 2026-10-17 KST: 서버 대화 기록 조회/삭제 API
+@app.route('/api/conversations/<conversation_id>', methods=['GET', 'DELETE'])
+def conversation_endpoint(conversation_id):
+    store = router.conversation_store if router else None
+    if store is None:
+        return jsonify({"error": "서버 대화 저장소가 비활성화되어 있습니다."}), 404
+    if request.method == 'DELETE':
+        if not store.delete(conversation_id):
+            return jsonify({"error": "대화를 찾을 수 없습니다."}), 404
+        return jsonify({"deleted": conversation_id})
+    history = store.get_history(conversation_id)
+    if history is None:
+        return jsonify({"error": "대화를 찾을 수 없습니다."}), 404
+    return jsonify({"conversation_id": conversation_id, "chat_history": list(history)})
+
+
+# 2026-10-17 KST: 공급자별 속도 제한 지표(대기열 길이, 429 횟수, 재시도, 예산 소진) 모니터링 API
+@app.route('/api/rate-limit-stats')
+def get_rate_limit_stats():
+    return jsonify(limiter_stats())
+
+
+# 2026-10-17 KST: 헬스 체크 API - 모델별 준비 상태(API 키, 초기화 여부, 서킷 상태)를 보고합니다.
+# 하나 이상의 모델을 사용할 수 있으면 200, 없으면 503을 반환합니다. 에이전트를 생성하지 않으므로 가볍게 호출할 수 있습니다.
+@app.route('/api/health')
+def get_health():
+    if not router:
+        return jsonify({"status": "unavailable", "providers": {}}), 503
+    providers = router.provider_status()
+    available = [key for key, info in providers.items() if info["ready"] and info["circuit"] != "open"]
+    if len(available) == len(providers):
+        status = "ok"
+    elif available:
+        status = "degraded"
+    else:
+        status = "unavailable"
+    return jsonify({"status": status, "providers": providers}), 200 if available else 503
+
+
+# 2026-10-17 KST: 공급자별 서킷 상태, 응답 시간 백분위수, 헤지/페일오버 횟수 모니터링 API
+@app.route('/api/router-stats')
+def get_router_stats():
+    if not router:
+        return jsonify({"error": "서비스 준비 중입니다. 잠시 후 다시 시도해주세요."}), 503
+    return jsonify(router.stats())
+
+
+# 2026-10-17 KST: 캐시 적중률 모니터링 API
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    stats = {
+        "extraction": extraction_cache.stats(),
+        "reference": reference_cache.stats(),
+        "reference_index": reference_index.stats(),
+        "web_search": web_search_stats()
+    }
+    if router and router.response_cache is not None:
+        stats["response"] = router.response_cache.stats()
+    return jsonify(stats)
 
 
 # --- AX 방법론 관련 API 라우트 ---
@@ -163,466 +355,204 @@ def get_prompt_templates_for_task(task_id):
         return jsonify({"error": "Error reading prompt template file"}), 500
 
 
+# 2026-10-17 KST: 참고자료 응답 캐시 - 폴더 내 파일 구성과 수정 시각이 같으면 미리 만들어 둔 응답을 재사용
+# 렌더링 로직이 바뀌면 이 값을 올려 브라우저에 남아 있는 ETag를 무효화합니다.
+REFERENCE_RENDER_VERSION = 4
+
+# 2026-10-17 KST: 참고자료 API가 읽을 수 있는 폴더 (static/script.js의 menuIdToFolderMap과 같은 폴더)
+# 요청의 폴더 이름은 이 목록과 정확히 일치할 때만 DATA_FOLDER 아래 경로로 사용합니다.
+REFERENCE_FOLDERS = frozenset({
+    '901-proposal_files', '110-Env_files', '120-TechEnv_files', '130-BizReq_files', '140-AI_ITReq_files',
+    '210-Vision_files', '220-TargetModel_files', '310-Implementation_files', '323-vendor_files', '320-roadmap_files',
+})
+reference_cache = LRUCache(max_entries=512)
+
+
+def _reference_folder_signature(folder_path):
+    """폴더 내 Abstract_*.json 파일의 (이름, 수정 시각, 크기) 목록으로 캐시 검증용 서명을 만듭니다."""
+    signature = []
+    for entry in os.scandir(folder_path):
+        if entry.is_file() and entry.name.startswith('Abstract_') and entry.name.endswith('.json'):
+            stat = entry.stat()
+            signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    signature.sort()
+    return signature
+
+
+def _make_etag(*parts):
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def list_reference_materials(folder_path):
+    """
+    폴더 내의 Abstract_*.json 파일을 읽어 문서별 목록 정보(제목, 원본 파일명, 문서 유형, 키워드)를 만듭니다.
+
+    2026-10-17 KST: 스키마마다 다른 키(report_title, 주요 키워드, rfp_summary 하위 항목 등)는 참고자료 검색 인덱스와
+    같은 정규화(utils.reference_index.normalize_abstract)로 읽어 목록과 검색 결과의 제목/키워드가 일치하도록 합니다.
+    """
+    materials = []
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    for filename in os.listdir(folder_path):
+        if filename.startswith('Abstract_') and filename.endswith('.json'):
+            filepath = os.path.join(folder_path, filename)
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                record = normalize_abstract(content, folder_name, filename)
+                materials.append({
+                    "json_name": filename,
+                    "original_file_name": record["original_file_name"],
+                    "title": record["title"],
+                    "document_type": record["document_type"],
+                    "keywords": record["keywords"][:15]
+                })
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON decode error in {filepath}: {e}")
+            except Exception as e:
+                logger.error(f"Error reading reference file {filepath}: {e}")
+    
+    materials.sort(key=lambda x: x['json_name'])
+    return materials
+
+
+def load_reference_detail(filepath):
+    """Abstract_*.json 파일 하나를 읽어 전체 요약 HTML을 만듭니다."""
+    filename = os.path.basename(filepath)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+
+    summary_html = content.get('summary_html', '')
+    if not summary_html:
+        # 2025-01-17 14:00 KST: 기존 generate_comprehensive_summary_html을 
+        # generate_enhanced_summary_html로 대체하여 문서 유형별 최적화
+        # 2026-10-17 KST: 이스케이프 처리된 테이블 기반 렌더러(utils.summary_renderer)로 대체
+        summary_html = render_summary_html(content)
+
+    return {
+        "json_name": filename,
+        "original_file_name": content.get('original_file_name', 
+                                          content.get('원본이름', filename)),
+        "summary_html": summary_html
+    }
+
+
+def cached_json_response(body, etag):
+    """미리 직렬화된 JSON 본문을 ETag와 함께 반환합니다. If-None-Match가 일치하면 304를 반환합니다."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 # 2025-01-17 02:30 KST: 참고자료 API - 전체 내용 표시
 # 2025-01-17 14:00 KST: 참고자료 표시 기능 대폭 개선 - 문서 유형별 최적화된 렌더링
+# 2026-10-17 KST: 폴더 서명 기반 캐시 및 ETag/304 응답 적용
+# 2026-10-17 KST: 목록 API는 요약 정보만 반환하고 본문 HTML은 상세 API에서 문서별로 렌더링
 @app.route('/api/reference-materials/<string:folder_name>')
 def get_reference_materials(folder_name):
-    """지정된 폴더 내의 Abstract_*.json 파일 목록과 전체 내용을 반환합니다."""
+    """지정된 폴더 내의 Abstract_*.json 파일 목록(제목, 원본 파일명, 문서 유형, 키워드)을 반환합니다."""
+    if folder_name not in REFERENCE_FOLDERS:
+        return jsonify({"error": "잘못된 참고자료 폴더입니다."}), 400
     folder_path = os.path.join(DATA_FOLDER, folder_name)
     
     if not os.path.isdir(folder_path):
         logger.warning(f"Reference folder not found: {folder_path}")
         return jsonify([])
 
-    materials = []
     try:
-        for filename in os.listdir(folder_path):
-            if filename.startswith('Abstract_') and filename.endswith('.json'):
-                filepath = os.path.join(folder_path, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = json.load(f)
-                        
-                        original_name = content.get('original_file_name', 
-                                                   content.get('원본이름', filename))
-                        
-                        summary_html = content.get('summary_html', '')
-                        if not summary_html:
-                            # 2025-01-17 14:00 KST: 기존 generate_comprehensive_summary_html을 
-                            # generate_enhanced_summary_html로 대체하여 문서 유형별 최적화
-                            summary_html = generate_enhanced_summary_html(content)
-                        
-                        materials.append({
-                            "json_name": filename,
-                            "original_file_name": original_name,
-                            "summary_html": summary_html
-                        })
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error in {filepath}: {e}")
-                except Exception as e:
-                    logger.error(f"Error reading reference file {filepath}: {e}")
-        
-        materials.sort(key=lambda x: x['json_name'])
-        return jsonify(materials)
+        etag = _make_etag(REFERENCE_RENDER_VERSION, folder_name, _reference_folder_signature(folder_path))
+        cached = reference_cache.get(folder_name)
+        if cached is None or cached[0] != etag:
+            materials = list_reference_materials(folder_path)
+            cached = (etag, json.dumps(materials, ensure_ascii=False))
+            reference_cache.set(folder_name, cached)
+        return cached_json_response(cached[1], etag)
     
     except Exception as e:
         logger.error(f"Error listing reference materials in {folder_name}: {e}")
         return jsonify({"error": "참고자료 목록 조회 실패"}), 500
 
 
-# 2025-01-17 14:00 KST: 새로 추가 - 향상된 문서 유형별 HTML 생성 함수
-def generate_enhanced_summary_html(content):
-    """JSON 내용을 문서 유형에 따라 최적화된 HTML로 생성합니다."""
-    
-    # 문서 유형 감지
-    doc_type = detect_document_type(content)
-    
-    html = '<div class="reference-content">'
-    
-    # 공통 헤더 정보
-    html += generate_header_section(content)
-    
-    # 문서 유형별 본문 생성
-    if doc_type == 'proposal':
-        html += generate_proposal_content(content)
-    elif doc_type == 'kickoff':
-        html += generate_kickoff_content(content)
-    elif doc_type == 'environment':
-        html += generate_environment_content(content)
-    elif doc_type == 'it_analysis':
-        html += generate_it_analysis_content(content)
-    else:
-        html += generate_generic_content(content)
-    
-    html += '</div>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 문서 유형 감지 함수
-def detect_document_type(content):
-    """JSON 내용을 분석하여 문서 유형을 감지합니다."""
-    if '제안' in content.get('프로젝트 이름', '') or '제안' in content.get('original_file_name', ''):
-        return 'proposal'
-    elif '착수' in content.get('original_file_name', '') or 'kickoff' in content.get('original_file_name', '').lower():
-        return 'kickoff'
-    elif '환경분석' in content.get('original_file_name', '') or 'Env' in content.get('original_file_name', ''):
-        return 'environment'
-    elif 'IT' in content.get('original_file_name', '') or 'IT' in content.get('프로젝트_이름', ''):
-        return 'it_analysis'
-    else:
-        return 'generic'
+@app.route('/api/reference-materials/<string:folder_name>/<string:json_name>')
+def get_reference_material_detail(folder_name, json_name):
+    """참고자료 문서 하나의 전체 요약 HTML을 반환합니다."""
+    if folder_name not in REFERENCE_FOLDERS:
+        return jsonify({"error": "잘못된 참고자료 폴더입니다."}), 400
+    if not (json_name.startswith('Abstract_') and json_name.endswith('.json')):
+        return jsonify({"error": "잘못된 참고자료 이름입니다."}), 400
 
+    filepath = os.path.join(DATA_FOLDER, folder_name, json_name)
+    if not os.path.isfile(filepath):
+        logger.warning(f"Reference file not found: {filepath}")
+        return jsonify({"error": "참고자료를 찾을 수 없습니다."}), 404
 
-# 2025-01-17 14:00 KST: 새로 추가 - 공통 헤더 섹션 생성 함수
-def generate_header_section(content):
-    """공통 헤더 섹션을 생성합니다."""
-    html = ''
-    
-    # 문서 제목
-    title = (content.get('프로젝트 이름') or 
-             content.get('프로젝트이름') or 
-             content.get('프로젝트_이름') or 
-             content.get('reportTitle') or
-             content.get('original_file_name', '문서'))
-    html += f'<h1 class="document-title">{title}</h1>'
-    
-    # 원본 파일명
-    original_name = content.get('original_file_name') or content.get('원본이름')
-    if original_name:
-        html += f'<div class="file-info"><strong>원본 파일:</strong> {original_name}</div>'
-    
-    # 핵심 키워드
-    keywords = (content.get('핵심키워드') or 
-                content.get('핵심_키워드') or 
-                content.get('주요 키워드 10개') or 
-                content.get('keywords', []))
-    if keywords:
-        html += '<div class="keywords-section">'
-        html += '<h3>핵심 키워드</h3>'
-        html += '<div class="keywords-container">'
-        for keyword in keywords[:15]:
-            html += f'<span class="keyword-tag">{keyword}</span>'
-        html += '</div></div>'
-    
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 제안서 유형 컨텐츠 생성 함수
-def generate_proposal_content(content):
-    """제안서 유형의 컨텐츠를 생성합니다."""
-    html = ''
-    
-    # 프로젝트 개요
-    html += '<section class="project-overview">'
-    html += '<h2>프로젝트 개요</h2>'
-    
-    if content.get('고객사 이름'):
-        html += f'<div class="info-item"><strong>고객사:</strong> {content["고객사 이름"]}</div>'
-    
-    # 배경, 범위, 목적
-    sections = [
-        ('프로젝트(제안)의 배경', '프로젝트 배경'),
-        ('프로젝트(제안)의 범위', '프로젝트 범위'),
-        ('프로젝트(제안)의 목적', '프로젝트 목적')
-    ]
-    
-    for key, title in sections:
-        if content.get(key):
-            html += f'<div class="subsection">'
-            html += f'<h4>{title}</h4>'
-            html += f'<p>{content[key]}</p>'
-            html += '</div>'
-    
-    html += '</section>'
-    
-    # 제안 전략 및 특장점
-    html += '<section class="proposal-strategy">'
-    html += '<h2>제안 전략 및 특장점</h2>'
-    
-    if content.get('제안 전략 혹은 컨설팅 전략'):
-        html += f'<div class="subsection">'
-        html += f'<h4>컨설팅 전략</h4>'
-        html += f'<p>{content["제안 전략 혹은 컨설팅 전략"]}</p>'
-        html += '</div>'
-    
-    if content.get('제안의 특장점'):
-        html += f'<div class="subsection">'
-        html += f'<h4>제안의 특장점</h4>'
-        html += f'<p>{content["제안의 특장점"]}</p>'
-        html += '</div>'
-    
-    if content.get('기대효과'):
-        html += f'<div class="subsection">'
-        html += f'<h4>기대 효과</h4>'
-        html += f'<p>{content["기대효과"]}</p>'
-        html += '</div>'
-    
-    html += '</section>'
-    
-    # 수행 방안
-    if content.get('수행방안 혹은 컨설팅 방안'):
-        html += generate_implementation_plan(content['수행방안 혹은 컨설팅 방안'])
-    
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 착수보고서 유형 컨텐츠 생성 함수
-def generate_kickoff_content(content):
-    """착수보고서 유형의 컨텐츠를 생성합니다."""
-    html = ''
-    
-    # 보고서 목표
-    if content.get('보고서목표'):
-        html += '<section class="report-objectives">'
-        html += '<h2>프로젝트 목표</h2>'
-        html += '<ul class="objectives-list">'
-        for objective in content['보고서목표']:
-            html += f'<li>{objective}</li>'
-        html += '</ul>'
-        html += '</section>'
-    
-    # 보고서 목차
-    if content.get('보고서목차'):
-        html += generate_table_of_contents(content['보고서목차'])
-    
-    # 본문 요약
-    if content.get('본문요약'):
-        html += generate_content_summary(content['본문요약'])
-    
-    # 개선기회 및 Key Finding
-    if content.get('개선기회키파인딩'):
-        html += generate_key_findings(content['개선기회키파인딩'])
-    
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 환경분석서 유형 컨텐츠 생성 함수
-def generate_environment_content(content):
-    """환경분석서 유형의 컨텐츠를 생성합니다."""
-    html = ''
-    
-    # 보고서 목표
-    if content.get('보고서목표'):
-        html += '<section class="report-objectives">'
-        html += '<h2>분석 목표</h2>'
-        html += '<ul class="objectives-list">'
-        for objective in content['보고서목표']:
-            html += f'<li>{objective}</li>'
-        html += '</ul>'
-        html += '</section>'
-    
-    # 보고서 목차
-    if content.get('보고서목차'):
-        html += '<section class="table-of-contents">'
-        html += '<h2>보고서 목차</h2>'
-        html += '<div class="toc-container">'
-        for key, value in content['보고서목차'].items():
-            html += f'<div class="toc-item"><strong>{key}.</strong> {value}</div>'
-        html += '</div>'
-        html += '</section>'
-    
-    # 본문 요약
-    if content.get('본문요약'):
-        html += '<section class="content-summary">'
-        html += '<h2>상세 분석 내용</h2>'
-        for key, value in content['본문요약'].items():
-            if key != '수행단계' and key != '환경분석프로세스':
-                html += f'<div class="analysis-item">'
-                html += f'<h4>{key.replace("_", " ")}</h4>'
-                html += f'<p>{value}</p>'
-                html += '</div>'
-        html += '</section>'
-    
-    # 개선기회
-    if content.get('개선기회'):
-        html += generate_improvement_opportunities(content['개선기회'])
-    
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - IT 현황분석서 유형 컨텐츠 생성 함수
-def generate_it_analysis_content(content):
-    """IT 현황분석서 유형의 컨텐츠를 생성합니다."""
-    html = ''
-    
-    # 보고서 목표
-    if content.get('보고서의_목표'):
-        html += '<section class="report-objectives">'
-        html += '<h2>분석 목표</h2>'
-        html += '<ul class="objectives-list">'
-        for objective in content['보고서의_목표']:
-            html += f'<li>{objective}</li>'
-        html += '</ul>'
-        html += '</section>'
-    
-    # 보고서 목차 (계층 구조)
-    if content.get('보고서_목차'):
-        html += generate_hierarchical_toc(content['보고서_목차'])
-    
-    # 본문 요약
-    if content.get('본문_요약'):
-        html += '<section class="content-summary">'
-        html += '<h2>IT 현황 분석 결과</h2>'
-        for key, value in content['본문_요약'].items():
-            html += f'<div class="analysis-item">'
-            html += f'<h4>{key.replace("_", " ")}</h4>'
-            html += f'<p>{value}</p>'
-            html += '</div>'
-        html += '</section>'
-    
-    # 개선기회
-    if content.get('개선기회_key_finding'):
-        html += generate_key_findings(content['개선기회_key_finding'])
-    
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 목차 정보 HTML 생성 함수
-def generate_table_of_contents(toc_data):
-    """목차 정보를 HTML로 생성합니다."""
-    html = '<section class="table-of-contents">'
-    html += '<h2>보고서 목차</h2>'
-    html += '<div class="toc-container">'
-    
-    if isinstance(toc_data, list):
-        for item in toc_data:
-            if isinstance(item, dict):
-                html += f'<div class="toc-major">{item.get("대분류", "")}</div>'
-                if item.get("소분류"):
-                    for sub_item in item["소분류"]:
-                        html += f'<div class="toc-minor">• {sub_item}</div>'
-            else:
-                html += f'<div class="toc-item">{item}</div>'
-    
-    html += '</div>'
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 계층적 목차 HTML 생성 함수
-def generate_hierarchical_toc(toc_data):
-    """계층적 목차를 HTML로 생성합니다."""
-    html = '<section class="table-of-contents">'
-    html += '<h2>보고서 목차</h2>'
-    html += '<div class="toc-hierarchical">'
-    
-    for key, value in toc_data.items():
-        level = len(key.split('.'))
-        indent_class = f'toc-level-{min(level, 4)}'
-        html += f'<div class="{indent_class}"><strong>{key}</strong> {value}</div>'
-    
-    html += '</div>'
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 본문 요약 HTML 생성 함수
-def generate_content_summary(summary_data):
-    """본문 요약을 HTML로 생성합니다."""
-    html = '<section class="content-summary">'
-    html += '<h2>상세 내용</h2>'
-    
-    if isinstance(summary_data, list):
-        for item in summary_data:
-            if isinstance(item, dict):
-                html += f'<div class="summary-item">'
-                html += f'<h4>{item.get("세부목차", "")}</h4>'
-                html += f'<p>{item.get("내용", "")}</p>'
-                html += '</div>'
-    elif isinstance(summary_data, dict):
-        for key, value in summary_data.items():
-            html += f'<div class="summary-item">'
-            html += f'<h4>{key.replace("_", " ")}</h4>'
-            html += f'<p>{value}</p>'
-            html += '</div>'
-    
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - Key Finding 및 개선기회 HTML 생성 함수
-def generate_key_findings(findings_data):
-    """개선기회 및 Key Finding을 HTML로 생성합니다."""
-    html = '<section class="key-findings">'
-    html += '<h2>핵심 발견사항 및 개선기회</h2>'
-    
-    for item in findings_data:
-        html += '<div class="finding-item">'
-        
-        # 유형별 아이콘 추가
-        finding_type = item.get('유형') or item.get('구분', '')
-        icon = '💡' if '개선기회' in finding_type else '🔍' if 'Key Finding' in finding_type else '📋'
-        
-        html += f'<div class="finding-header">'
-        html += f'<span class="finding-icon">{icon}</span>'
-        html += f'<span class="finding-type">{finding_type}</span>'
-        html += f'<span class="finding-title">{item.get("장표제목", "")}</span>'
-        html += '</div>'
-        
-        content = item.get('요약내용') or item.get('내용', '')
-        html += f'<div class="finding-content">{content}</div>'
-        
-        html += '</div>'
-    
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 개선기회 HTML 생성 함수
-def generate_improvement_opportunities(opportunities):
-    """개선기회를 HTML로 생성합니다."""
-    html = '<section class="improvement-opportunities">'
-    html += '<h2>개선기회</h2>'
-    
-    for opportunity in opportunities:
-        html += '<div class="opportunity-item">'
-        html += f'<h4>💡 {opportunity.get("세부목차", "")}</h4>'
-        html += f'<div class="opportunity-content">{opportunity.get("요약내용", "")}</div>'
-        html += '</div>'
-    
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 수행방안 HTML 생성 함수
-def generate_implementation_plan(plan_data):
-    """수행방안을 HTML로 생성합니다."""
-    html = '<section class="implementation-plan">'
-    html += '<h2>수행 방안</h2>'
-    
-    for key, value in plan_data.items():
-        html += f'<div class="plan-section">'
-        html += f'<h3>{key}</h3>'
-        
-        if isinstance(value, dict):
-            for sub_key, sub_value in value.items():
-                html += f'<div class="plan-subsection">'
-                html += f'<h4>{sub_key}</h4>'
-                html += f'<p>{sub_value}</p>'
-                html += '</div>'
-        else:
-            html += f'<p>{value}</p>'
-        
-        html += '</div>'
-    
-    html += '</section>'
-    return html
-
-
-# 2025-01-17 14:00 KST: 새로 추가 - 일반 문서 유형 컨텐츠 생성 함수
-def generate_generic_content(content):
-    """일반적인 문서 유형의 컨텐츠를 생성합니다."""
-    html = ''
-    
-    # 기본 정보들을 순서대로 표시
-    skip_keys = {'original_file_name', '원본이름', '핵심키워드', '핵심_키워드', '주요 키워드 10개', 'keywords'}
-    
-    for key, value in content.items():
-        if key in skip_keys:
-            continue
-            
-        html += f'<section class="content-section">'
-        html += f'<h2>{key.replace("_", " ")}</h2>'
-        
-        if isinstance(value, list):
-            html += '<ul>'
-            for item in value:
-                html += f'<li>{item}</li>'
-            html += '</ul>'
-        elif isinstance(value, dict):
-            for sub_key, sub_value in value.items():
-                html += f'<h4>{sub_key}</h4>'
-                html += f'<p>{sub_value}</p>'
-        else:
-            html += f'<p>{value}</p>'
-        
-        html += '</section>'
-    
-    return html
-
+    try:
+        stat = os.stat(filepath)
+        etag = _make_etag(REFERENCE_RENDER_VERSION, folder_name, json_name, stat.st_mtime_ns, stat.st_size)
+        cache_key = f"{folder_name}/{json_name}"
+        cached = reference_cache.get(cache_key)
+        if cached is None or cached[0] != etag:
+            detail = load_reference_detail(filepath)
+            cached = (etag, json.dumps(detail, ensure_ascii=False))
+            reference_cache.set(cache_key, cached)
+        return cached_json_response(cached[1], etag)
+
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON decode error in {filepath}: {e}")
+        return jsonify({"error": "참고자료 파일 형식이 올바르지 않습니다."}), 500
+    except Exception as e:
+        logger.error(f"Error reading reference file {filepath}: {e}")
+        return jsonify({"error": "참고자료 조회 실패"}), 500
+
+
+# 2026-10-17 KST: 참고자료 의미 검색용 임베딩 인덱스 (utils.embedding_index)
+# numpy와 벡터 파일은 첫 의미 검색 때 불러와 서버 시작 시간에 영향을 주지 않습니다.
+_embedding_index = None
+_embedding_index_lock = threading.Lock()
+
+
+def get_embedding_index():
+    global _embedding_index
+    if _embedding_index is None:
+        with _embedding_index_lock:
+            if _embedding_index is None:
+                from utils.embedding_index import create_embedding_index_from_env
+                _embedding_index = create_embedding_index_from_env(reference_index)
+    return _embedding_index
+
+
+# 2026-10-17 KST: 참고자료 검색 API
+@app.route('/api/reference-search')
+def search_reference_materials():
+    """
+    제목, 키워드, 섹션 요약에서 검색어를 찾아 점수순 결과와 강조된 발췌(snippet)를 반환합니다.
+
+    mode=semantic이면 단어 일치 대신 임베딩 유사도(코사인)로 검색합니다.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "검색어(q)를 입력해주세요."}), 400
+    if len(query) > 200:
+        return jsonify({"error": "검색어는 200자 이하로 입력해주세요."}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "limit은 숫자여야 합니다."}), 400
+    folder = request.args.get('folder') or None
+    mode = request.args.get('mode', 'keyword')
+    if mode not in ('keyword', 'semantic'):
+        return jsonify({"error": "mode는 keyword 또는 semantic이어야 합니다."}), 400
 
-# 2025-01-17 03:00 KST: 전체 내용을 포함하는 HTML 생성 (기존 함수 제거됨)
-# 2025-01-17 14:00 KST: 위의 새로운 함수들로 대체되어 더 이상 사용하지 않음
+    try:
+        if mode == 'semantic':
+            return jsonify(get_embedding_index().search(query, limit=limit, folder=folder))
+        return jsonify(reference_index.search(query, limit=limit, folder=folder))
+    except Exception as e:
+        logger.error(f"Error searching reference materials for '{query}': {e}")
+        return jsonify({"error": "참고자료 검색 실패"}), 500
 
 
 # --- 데이터 파일 서빙 ---
@@ -631,5 +561,6 @@ def serve_data_files(subpath):
     return send_from_directory(DATA_FOLDER, subpath)
 
 
+# 개발 서버. 운영 환경에서는 ASGI 진입점(asgi.py)을 사용합니다. (README 참고)
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
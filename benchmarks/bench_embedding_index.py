@@ -0,0 +1,144 @@
+# benchmarks/bench_embedding_index.py
+"""
+utils.embedding_index.EmbeddingStore의 검색 지연 시간과 메모리 사용량을 청크 수(기본 1k/10k/100k)별로 측정합니다.
+
+청크 벡터는 무작위 정규화 벡터로 만들고(임베딩 속도와 분리), 크기마다 새 프로세스에서 저장소를 열어
+열기 시간, 단일/배치 질의 지연 시간(p50/p95), 상주 메모리(RSS: 익명/파일 매핑 구분, Linux)를 측정합니다.
+파일 매핑(RssFile) 페이지는 같은 인덱스를 여는 모든 워커가 공유합니다.
+HashingEmbedder의 임베딩 처리량은 data/ 참고자료 섹션으로 따로 측정합니다.
+
+사용법: python benchmarks/bench_embedding_index.py [--sizes 1000,10000,100000] [--dtypes int8,float16] [--dim 384]
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.embedding_index import EmbeddingStore, HashingEmbedder
+from utils.reference_index import normalize_abstract
+
+
+def memory_status():
+    """현재 프로세스의 RSS(MB). Linux에서는 익명/파일 매핑 페이지를 나누어 보고합니다."""
+    status = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    status[key] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        status["VmRSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return status
+
+
+def random_vectors(count, dim, seed):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_store(directory, size, dim, dtype, batch=10000):
+    store = EmbeddingStore(directory, dim, dtype=dtype, embedder_name="bench")
+    started = time.perf_counter()
+    for start in range(0, size, batch):
+        count = min(batch, size - start)
+        store.append(random_vectors(count, dim, seed=start),
+                     [(f"doc-{(start + i) // 20}", (start + i) % 20, "bench") for i in range(count)])
+    return time.perf_counter() - started, store.stats()["bytes"]
+
+
+def worker(directory, dim, dtype, queries, k):
+    """새 프로세스에서 저장소를 열고 검색하여 측정값을 JSON으로 출력합니다."""
+    before = memory_status()
+    started = time.perf_counter()
+    store = EmbeddingStore(directory, dim, dtype=dtype, embedder_name="bench")
+    store.search(random_vectors(1, dim, seed=999999)[0], k=k)
+    open_ms = (time.perf_counter() - started) * 1000
+
+    query_vectors = random_vectors(queries, dim, seed=12345)
+    single = []
+    for vector in query_vectors:
+        started = time.perf_counter()
+        store.search(vector, k=k)
+        single.append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    batch_size = 32
+    for start in range(0, queries, batch_size):
+        store.search(query_vectors[start:start + batch_size], k=k)
+    batched_per_query = (time.perf_counter() - started) * 1000 / queries
+    after = memory_status()
+    print(json.dumps({
+        "open_ms": open_ms,
+        "p50_ms": float(np.percentile(single, 50)),
+        "p95_ms": float(np.percentile(single, 95)),
+        "batched_ms_per_query": batched_per_query,
+        "rss_mb": after.get("VmRSS", 0.0),
+        "rss_delta_mb": after.get("VmRSS", 0.0) - before.get("VmRSS", 0.0),
+        "rss_anon_mb": after.get("RssAnon"),
+        "rss_file_mb": after.get("RssFile"),
+    }))
+
+
+def embedding_throughput():
+    texts = []
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, "data", "*_files", "Abstract_*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = normalize_abstract(json.load(f), "bench", os.path.basename(path))
+        except (json.JSONDecodeError, OSError):
+            continue
+        texts.extend(f"{section['title']}\n{section['text']}" for section in record["sections"])
+    if not texts:
+        return
+    embedder = HashingEmbedder()
+    texts = texts * max(1, 2000 // len(texts))
+    started = time.perf_counter()
+    embedder.embed(texts)
+    elapsed = time.perf_counter() - started
+    print(f"HashingEmbedder: {len(texts)} sections in {elapsed:.2f}s ({len(texts) / elapsed:,.0f} sections/s)")
+
+
+def main(sizes, dtypes, dim, queries, k):
+    embedding_throughput()
+    print(f"{'chunks':>8} {'dtype':>7} {'file MB':>8} {'build s':>8} {'open ms':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'batch ms/q':>10} {'RSS MB':>7} {'+RSS MB':>8} {'anon MB':>8} {'file MB':>8}")
+    for size in sizes:
+        for dtype in dtypes:
+            with tempfile.TemporaryDirectory() as directory:
+                build_seconds, file_bytes = build_store(directory, size, dim, dtype)
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", directory, "--dim", str(dim), "--dtypes", dtype,
+                     "--queries", str(queries), "--k", str(k)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+            anon = f"{result['rss_anon_mb']:8.1f}" if result["rss_anon_mb"] is not None else f"{'-':>8}"
+            mapped = f"{result['rss_file_mb']:8.1f}" if result["rss_file_mb"] is not None else f"{'-':>8}"
+            print(f"{size:>8,} {dtype:>7} {file_bytes / 1e6:8.1f} {build_seconds:8.2f} {result['open_ms']:8.1f} "
+                  f"{result['p50_ms']:7.2f} {result['p95_ms']:7.2f} {result['batched_ms_per_query']:10.3f} "
+                  f"{result['rss_mb']:7.1f} {result['rss_delta_mb']:8.1f} {anon} {mapped}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--dtypes", default="int8,float16")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--worker", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.dim, args.dtypes, args.queries, args.k)
+    else:
+        main([int(size) for size in args.sizes.split(",")], args.dtypes.split(","), args.dim, args.queries, args.k)
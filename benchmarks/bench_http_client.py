@@ -0,0 +1,84 @@
+# benchmarks/bench_http_client.py
+"""
+요청마다 새 aiohttp.ClientSession을 만드는 방식과 공유 세션(utils.http_client)을
+재사용하는 방식의 처리량(requests/sec)을 로컬 스텁 HTTP 서버로 비교합니다.
+
+사용법: python benchmarks/bench_http_client.py [--requests 2000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import HTTPClient
+
+
+async def _stub_handler(request):
+    payload = await request.json()
+    return web.json_response({"candidates": [{"content": {"parts": [{"text": payload.get("q", "")}]}}]})
+
+
+async def _start_stub_server():
+    app = web.Application()
+    app.router.add_post("/v1beta/models/stub:generateContent", _stub_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1beta/models/stub:generateContent"
+
+
+async def _post_fresh_session(url, i):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json={"q": str(i)}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+async def _post_pooled(client, url, i):
+    session = client.get_session()
+    async with session.post(url, json={"q": str(i)}) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def _run(label, make_call, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await make_call(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {total:>6} req  {elapsed:7.3f}s  {total / elapsed:10.1f} req/s")
+    return total / elapsed
+
+
+async def main(total, concurrency):
+    runner, url = await _start_stub_server()
+    try:
+        print(f"stub server: {url}  concurrency={concurrency}")
+        fresh = await _run("new session / request", lambda i: _post_fresh_session(url, i), total, concurrency)
+        client = HTTPClient()
+        pooled = await _run("pooled session", lambda i: _post_pooled(client, url, i), total, concurrency)
+        await client.close()
+        print(f"speedup: {pooled / fresh:.2f}x")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
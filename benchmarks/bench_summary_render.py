@@ -0,0 +1,84 @@
+# benchmarks/bench_summary_render.py
+"""
+data/*_files/Abstract_*.json 코퍼스에 대해 기존 문자열 += 렌더러와 utils.summary_renderer의
+처리량(documents/sec)을 비교합니다.
+
+기존 렌더러는 utils.summary_renderer로 옮기기 전 리비전(LEGACY_REVISION)의 backend.py에서
+generate_*/detect_document_type/get_document_* 함수만 `git show`로 읽어 불러옵니다.
+
+사용법: python benchmarks/bench_summary_render.py [--rounds 200] [--legacy-revision <rev>]
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.summary_renderer import render_summary_html
+
+# backend.py의 generate_* 함수가 utils.summary_renderer로 대체되기 직전 리비전
+LEGACY_REVISION = "106fdc75d49313d7f057ac25fb04f5f01d4f1d08"
+LEGACY_FUNCTIONS = ("detect_document_type", "get_document_title", "get_document_keywords")
+
+
+def load_legacy_renderer(revision):
+    """revision의 backend.py에서 기존 HTML 생성 함수만 골라 실행하고 generate_enhanced_summary_html을 반환합니다."""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:backend.py"], cwd=ROOT_DIR, check=True, capture_output=True, text=True,
+        encoding="utf-8",
+    ).stdout
+    tree = ast.parse(source)
+    tree.body = [node for node in tree.body if isinstance(node, ast.FunctionDef)
+                 and (node.name.startswith("generate_") or node.name in LEGACY_FUNCTIONS)]
+    namespace = {}
+    exec(compile(tree, f"{revision}:backend.py", "exec"), namespace)
+    return namespace["generate_enhanced_summary_html"]
+
+
+def load_corpus():
+    documents = []
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, 'data', '*_files', 'Abstract_*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                documents.append((os.path.relpath(path, ROOT_DIR), json.load(f)))
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"skip {path}: {e}")
+    return documents
+
+
+def measure(label, render, documents, rounds):
+    started = time.perf_counter()
+    total_bytes = 0
+    for _ in range(rounds):
+        for _, content in documents:
+            total_bytes += len(render(content))
+    elapsed = time.perf_counter() - started
+    renders = rounds * len(documents)
+    print(f"{label:<10} {renders:>7} renders  {elapsed:7.3f}s  {renders / elapsed:10.1f} docs/s  "
+          f"{total_bytes / elapsed / 1e6:7.1f} MB/s")
+    return renders / elapsed
+
+
+def main(rounds, legacy_revision):
+    generate_enhanced_summary_html = load_legacy_renderer(legacy_revision)
+    documents = load_corpus()
+    print(f"corpus: {len(documents)} documents")
+    for name, _ in documents:
+        print(f"  - {name}")
+    legacy = measure("legacy", generate_enhanced_summary_html, documents, rounds)
+    current = measure("renderer", render_summary_html, documents, rounds)
+    print(f"speedup: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--legacy-revision", default=LEGACY_REVISION)
+    args = parser.parse_args()
+    main(args.rounds, args.legacy_revision)
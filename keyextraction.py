@@ -2,12 +2,20 @@
 import os
 import sys
 import json
+import time
+import hashlib
 import asyncio
+import argparse
 import anthropic
-import fitz  # PyMuPDF
 from dotenv import load_dotenv
 import re  # ⭐ 추가: 정규식을 위해 필요
 
+from utils.rate_limit import TokenBucket, classify_error
+from utils.text_chunking import estimate_tokens, split_into_chunks
+from utils.text_extraction import DEFAULT_MAX_CHARS, extract_pages_from_path, extract_text_from_path
+
+SUMMARY_MODEL = "claude-sonnet-4-20250514"
+
 
 # --- 유틸리티 함수 ---
 def get_api_key(api_name):
@@ -15,27 +23,14 @@ def get_api_key(api_name):
     load_dotenv()
     return os.getenv(api_name)
 
-def read_file_content(file_path):
-    """파일 경로를 받아 확장자에 따라 텍스트 내용을 추출합니다."""
-    _, file_extension = os.path.splitext(file_path)
-    file_extension = file_extension.lower()
-
-    content = ""
+def read_file_content(file_path, max_chars=DEFAULT_MAX_CHARS):
+    """파일 경로를 받아 확장자에 따라 텍스트 내용을 추출합니다. (API 토큰 제한을 고려하여 max_chars까지만 읽음)"""
     try:
-        if file_extension == '.pdf':
-            doc = fitz.open(file_path)
-            for page in doc:
-                content += page.get_text()
-            doc.close()
-        elif file_extension in ['.txt', '.md', '.json', '.csv', '.py', '.html', '.css', '.js']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        else:
-            print(f"지원하지 않는 파일 형식입니다: {file_extension}")
-            return None
-        
-        # API 토큰 제한을 고려하여 콘텐츠 길이 제한
-        return content[:15000] if len(content) > 15000 else content
+        content = extract_text_from_path(file_path, max_chars)
+        if content is None:
+            _, file_extension = os.path.splitext(file_path)
+            print(f"지원하지 않는 파일 형식입니다: {file_extension.lower()}")
+        return content
     except Exception as e:
         print(f"파일을 읽는 중 오류가 발생했습니다 ({file_path}): {e}")
         return None
@@ -66,58 +61,78 @@ def validate_and_fix_json(text):
             print("JSON 자동 수정 실패. 원본 텍스트를 반환합니다.")
             raise
 
-# ===================================================================
-# 2025-09-17 23:45 KST: workingdir 인자를 받도록 함수 시그니처 수정
-# ===================================================================
-async def summarize_document(working_dir, input_filename, output_filename):
-    """지정된 작업 디렉토리 내의 문서를 요약하고 결과를 JSON 파일로 저장합니다."""
-    
-    print(f"작업 디렉토리: {working_dir}")
+class SummarizationError(Exception):
+    """재시도해도 해결되지 않는 요약 실패(입력 파일/템플릿 누락, JSON 파싱 실패 등)."""
 
-    # 1. 경로 설정
-    if not os.path.isdir(working_dir):
-        print(f"오류: 작업 디렉토리를 찾을 수 없습니다 - {working_dir}")
-        return
-        
-    input_file_path = os.path.join(working_dir, input_filename)
-    if not os.path.exists(input_file_path):
-        print(f"오류: 입력 파일을 찾을 수 없습니다 - {input_file_path}")
-        return
 
-    # 2. 프롬프트 템플릿 로드
+# ===================================================================
+# 2026-10-17 KST: 배치 모드 지원을 위해 템플릿 로드, API 호출, 결과 저장 단계를 분리
+# ===================================================================
+def load_prompt_template(working_dir):
+    """작업 디렉토리의 prompt_templates.json에서 첫 번째 템플릿을 읽습니다."""
     prompt_template_path = os.path.join(working_dir, 'prompt_templates.json')
     if not os.path.exists(prompt_template_path):
-        print(f"오류: 'prompt_templates.json' 파일을 다음 위치에서 찾을 수 없습니다 - {working_dir}")
-        return
-        
+        raise SummarizationError(f"'prompt_templates.json' 파일을 다음 위치에서 찾을 수 없습니다 - {working_dir}")
+
     try:
         with open(prompt_template_path, 'r', encoding='utf-8') as f:
             templates = json.load(f)
-            if isinstance(templates, list) and len(templates) > 0 and 'template' in templates[0]:
-                prompt_template = templates[0]['template']
-            else:
-                raise ValueError("프롬프트 템플릿 형식이 올바르지 않습니다.")
     except Exception as e:
-        print(f"프롬프트 템플릿 파일을 읽는 중 오류 발생: {e}")
-        return
+        raise SummarizationError(f"프롬프트 템플릿 파일을 읽는 중 오류 발생: {e}")
 
-    # 3. 입력 파일 내용 읽기
-    file_content = read_file_content(input_file_path)
-    if not file_content:
-        return
+    if isinstance(templates, list) and len(templates) > 0 and 'template' in templates[0]:
+        return templates[0]['template']
+    raise SummarizationError("프롬프트 템플릿 형식이 올바르지 않습니다.")
+
+
+def extract_json_text(summary_text):
+    """Claude 응답에서 코드블록 등을 제거하고 JSON 부분만 추출합니다."""
+    # ⭐ 수정: 더 강력한 JSON 추출 로직
+    if summary_text.startswith("```json"):
+        # ```json과 ``` 사이의 내용 추출
+        json_match = re.search(r'```json\s*(.*?)\s*```', summary_text, re.DOTALL)
+        if json_match:
+            summary_text = json_match.group(1).strip()
+    elif summary_text.startswith("```"):
+        # 일반 코드블록 처리
+        json_match = re.search(r'```\s*(.*?)\s*```', summary_text, re.DOTALL)
+        if json_match:
+            summary_text = json_match.group(1).strip()
+    
+    # ⭐ 추가: JSON이 {로 시작하지 않으면 찾아서 추출
+    if not summary_text.startswith('{'):
+        json_match = re.search(r'\{.*\}', summary_text, re.DOTALL)
+        if json_match:
+            summary_text = json_match.group(0)
+    return summary_text
+
+
+async def call_claude(client, prompt, max_tokens, bucket=None):
+    """Claude API를 한 번 호출하고 응답 텍스트를 반환합니다. bucket이 있으면 호출 전에 토큰을 소비합니다."""
+    if bucket is not None:
+        await bucket.acquire()
+    response = await client.messages.create(
+        model=SUMMARY_MODEL,
+        max_tokens=max_tokens,
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return response.content[0].text.strip()
 
-    # 4. ANTHROPIC API 설정 및 호출
-    api_key = get_api_key("ANTHROPIC_API_KEY")
-    if not api_key:
-        print("오류: .env 파일에 ANTHROPIC_API_KEY가 설정되지 않았습니다.")
-        return
 
+def parse_summary_json(summary_text, label):
+    """Claude 응답 텍스트에서 JSON을 추출하여 파싱합니다. 실패하면 SummarizationError를 발생시킵니다."""
     try:
-        # Claude 비동기 클라이언트 생성
-        client = anthropic.AsyncAnthropic(api_key=api_key)
+        return validate_and_fix_json(extract_json_text(summary_text))
+    except Exception as json_error:
+        raise SummarizationError(f"'{label}' JSON 파싱 실패: {json_error}")
+
 
-        # ⭐ 수정: 더 명확한 JSON 요청 프롬프트
-        final_prompt = f"""다음은 '{input_filename}' 파일의 내용입니다.
+async def request_summary(client, input_filename, file_content, prompt_template, verbose=True, bucket=None):
+    """Claude API로 문서 요약을 요청하고 파싱된 JSON을 반환합니다. API 오류는 그대로 전달합니다."""
+    # ⭐ 수정: 더 명확한 JSON 요청 프롬프트
+    final_prompt = f"""다음은 '{input_filename}' 파일의 내용입니다.
 
 ---
 {file_content}
@@ -131,84 +146,557 @@ async def summarize_document(working_dir, input_filename, output_filename):
 2. JSON 외의 다른 설명이나 텍스트는 절대 포함하지 마세요.
 3. JSON 객체가 완전히 닫혀있는지 확인하세요.
 4. 문자열 값에는 이스케이프 문자를 올바르게 사용하세요."""
-     
-        print(f"Claude API로 '{input_filename}' 파일 요약 요청 중...")
-        
-        response = await client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,  # ⭐ 수정: 토큰 수를 늘려서 응답이 잘리지 않도록
-            messages=[
-                {"role": "user", "content": final_prompt}
-            ]
-        )
-        
-        summary_text = response.content[0].text.strip()
-        
+ 
+    print(f"Claude API로 '{input_filename}' 파일 요약 요청 중...")
+    
+    # ⭐ 수정: 토큰 수를 늘려서 응답이 잘리지 않도록
+    summary_text = await call_claude(client, final_prompt, max_tokens=8000, bucket=bucket)
+    
+    if verbose:
         # ⭐ 추가: 디버깅을 위한 원본 응답 출력
         print("=== Claude 원본 응답 ===")
         print(summary_text[:500] + "..." if len(summary_text) > 500 else summary_text)
         print("=====================")
-        
-        # ⭐ 수정: 더 강력한 JSON 추출 로직
-        if summary_text.startswith("```json"):
-            # ```json과 ``` 사이의 내용 추출
-            json_match = re.search(r'```json\s*(.*?)\s*```', summary_text, re.DOTALL)
-            if json_match:
-                summary_text = json_match.group(1).strip()
-        elif summary_text.startswith("```"):
-            # 일반 코드블록 처리
-            json_match = re.search(r'```\s*(.*?)\s*```', summary_text, re.DOTALL)
-            if json_match:
-                summary_text = json_match.group(1).strip()
-        
-        # ⭐ 추가: JSON이 {로 시작하지 않으면 찾아서 추출
-        if not summary_text.startswith('{'):
-            json_match = re.search(r'\{.*\}', summary_text, re.DOTALL)
-            if json_match:
-                summary_text = json_match.group(0)
-        
+    
+    summary_text = extract_json_text(summary_text)
+    
+    if verbose:
         print("=== 추출된 JSON ===")
         print(summary_text)
         print("==================")
 
-        # ⭐ 수정: 강화된 JSON 파싱 로직
-        try:
-            summary_json = validate_and_fix_json(summary_text)
-            print("JSON 파싱 성공!")
-        except Exception as json_error:
-            print(f"JSON 파싱 실패: {json_error}")
-            print("응답 텍스트:")
-            print(summary_text)
-            return
+    # ⭐ 수정: 강화된 JSON 파싱 로직
+    try:
+        summary_json = validate_and_fix_json(summary_text)
+        print("JSON 파싱 성공!")
+        return summary_json
+    except Exception as json_error:
+        raise SummarizationError(f"'{input_filename}' JSON 파싱 실패: {json_error}")
+
+
+# ===================================================================
+# 2026-10-17 KST: 긴 문서용 청크 map-reduce 요약
+#   15,000자 제한을 넘는 문서는 페이지/섹션 경계로 나눈 청크를 동시에 요약(map)한 뒤
+#   부분 요약 JSON들을 하나의 Abstract 스키마로 병합(reduce)합니다.
+# ===================================================================
+CHUNK_CHARS = 12000
+CHUNK_CONCURRENCY = 4
+MAX_INPUT_TOKENS = 200000
+CHUNK_SUMMARY_MAX_TOKENS = 4000
+
+
+def plan_chunks(pages, chunk_chars=CHUNK_CHARS, max_input_tokens=MAX_INPUT_TOKENS):
+    """
+    페이지 목록을 청크로 나누고, 추정 입력 토큰 합계가 max_input_tokens를 넘지 않도록 앞에서부터 선택합니다.
+
+    Returns:
+        tuple: (선택된 청크 목록, 전체 청크 수, 선택된 청크의 추정 토큰 수)
+    """
+    chunks = split_into_chunks(pages, chunk_chars)
+    selected = []
+    total_tokens = 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk)
+        if selected and max_input_tokens and total_tokens + tokens > max_input_tokens:
+            break
+        selected.append(chunk)
+        total_tokens += tokens
+    return selected, len(chunks), total_tokens
+
+
+async def request_chunk_summary(client, input_filename, chunk, index, total, prompt_template, bucket=None):
+    """문서의 한 부분(청크)을 최종 템플릿과 같은 구조의 부분 요약 JSON으로 요약합니다."""
+    prompt = f"""다음은 '{input_filename}' 문서를 {total}개 부분으로 나눈 것 중 {index}번째 부분입니다.
+
+---
+{chunk}
+---
+
+아래 요청사항의 JSON 구조를 그대로 따르되, 이 부분에 실제로 나오는 내용만으로 채워 부분 요약을 작성해줘.
+이 부분에 해당 내용이 없는 항목은 빈 문자열이나 빈 배열로 두고, 내용을 추측하여 채우지 마세요.
+{prompt_template}
+
+중요: 
+1. 응답은 반드시 유효한 JSON 형식으로만 작성하세요.
+2. JSON 외의 다른 설명이나 텍스트는 절대 포함하지 마세요.
+3. 고유명사, 수치, 일정, 조직명은 원문 그대로 보존하세요."""
+
+    summary_text = await call_claude(client, prompt, max_tokens=CHUNK_SUMMARY_MAX_TOKENS, bucket=bucket)
+    return parse_summary_json(summary_text, f"{input_filename} ({index}/{total})")
+
+
+async def merge_chunk_summaries(client, input_filename, partial_summaries, prompt_template, bucket=None):
+    """부분 요약 JSON 목록을 하나의 최종 요약 JSON으로 병합합니다."""
+    partials = "\n\n".join(
+        f"[부분 {index}/{len(partial_summaries)}]\n{json.dumps(partial, ensure_ascii=False)}"
+        for index, partial in enumerate(partial_summaries, start=1)
+    )
+    prompt = f"""다음은 '{input_filename}' 문서를 순서대로 나누어 요약한 부분 요약 JSON들입니다.
+
+---
+{partials}
+---
+
+위 부분 요약들을 문서 전체에 대한 하나의 요약으로 병합하여, 아래 요청사항을 따라 작성해줘:
+{prompt_template}
+
+병합 규칙:
+1. 중복되는 항목은 하나로 합치고, 서로 다른 부분의 내용은 빠짐없이 반영하세요.
+2. 문서 제목, 목적처럼 문서 전체를 설명하는 항목은 앞부분의 내용을 우선하세요.
+3. 부분 요약에 없는 내용을 새로 만들지 마세요.
+
+중요: 
+1. 응답은 반드시 유효한 JSON 형식으로만 작성하세요.
+2. JSON 외의 다른 설명이나 텍스트는 절대 포함하지 마세요.
+3. JSON 객체가 완전히 닫혀있는지 확인하세요.
+4. 문자열 값에는 이스케이프 문자를 올바르게 사용하세요."""
+
+    summary_text = await call_claude(client, prompt, max_tokens=8000, bucket=bucket)
+    return parse_summary_json(summary_text, input_filename)
+
+
+async def request_chunked_summary(client, input_filename, pages, prompt_template, verbose=True, bucket=None,
+                                  chunk_chars=CHUNK_CHARS, chunk_concurrency=CHUNK_CONCURRENCY,
+                                  max_input_tokens=MAX_INPUT_TOKENS, partial_cache=None):
+    """
+    긴 문서를 청크로 나누어 동시에 요약한 뒤 하나의 JSON으로 병합합니다.
+
+    동시에 요약하는 청크 수는 chunk_concurrency로 제한하고, 추정 입력 토큰이 max_input_tokens를
+    넘으면 뒤쪽 청크는 제외하고 경고를 출력합니다.
+    partial_cache(딕셔너리)를 주면 완료된 부분 요약을 저장해 두고, 같은 문서를 재시도할 때 다시 요청하지 않습니다.
+    일부 청크가 실패해도 나머지 청크의 요청이 끝날 때까지 기다린 뒤 첫 번째 오류를 발생시킵니다.
+    """
+    chunks, chunk_count, input_tokens = plan_chunks(pages, chunk_chars, max_input_tokens)
+    if not chunks:
+        raise SummarizationError(f"'{input_filename}'에서 요약할 내용을 찾지 못했습니다.")
+    if len(chunks) < chunk_count:
+        print(f"경고: '{input_filename}'의 추정 입력 토큰이 {max_input_tokens}을 넘어 "
+              f"{chunk_count}개 청크 중 앞의 {len(chunks)}개만 요약합니다.")
+    print(f"Claude API로 '{input_filename}' 파일 분할 요약 요청 중... "
+          f"({len(chunks)}개 청크, 추정 입력 {input_tokens} 토큰)")
+
+    semaphore = asyncio.Semaphore(chunk_concurrency)
+    if partial_cache is None:
+        partial_cache = {}
+
+    def cache_key(index, chunk):
+        # 청크 프롬프트에는 청크 번호와 전체 청크 수가 들어가므로 함께 구분합니다.
+        return index, len(chunks), hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+    reused = sum(1 for index, chunk in enumerate(chunks, start=1) if cache_key(index, chunk) in partial_cache)
+    if reused:
+        print(f"  - 이전 시도에서 완료된 부분 요약 {reused}개를 재사용합니다 ('{input_filename}')")
 
+    async def summarize_chunk(index, chunk):
+        key = cache_key(index, chunk)
+        if key in partial_cache:
+            return partial_cache[key]
+        async with semaphore:
+            partial = await request_chunk_summary(client, input_filename, chunk, index, len(chunks),
+                                                  prompt_template, bucket=bucket)
+        partial_cache[key] = partial
+        if verbose:
+            print(f"  - 부분 요약 완료 ({index}/{len(chunks)})")
+        return partial
+
+    partial_summaries = await asyncio.gather(
+        *(summarize_chunk(index, chunk) for index, chunk in enumerate(chunks, start=1)),
+        return_exceptions=True,
+    )
+    for result in partial_summaries:
+        if isinstance(result, BaseException):
+            raise result
+    if len(partial_summaries) == 1:
+        return partial_summaries[0]
+
+    summary_json = await merge_chunk_summaries(client, input_filename, partial_summaries, prompt_template, bucket=bucket)
+    print("JSON 병합 성공!")
+    return summary_json
+
+
+def read_document_pages(file_path):
+    """파일 경로에서 페이지 단위 텍스트 목록을 읽습니다. 실패하면 None을 반환합니다."""
+    try:
+        pages = extract_pages_from_path(file_path)
+        if pages is None:
+            _, file_extension = os.path.splitext(file_path)
+            print(f"지원하지 않는 파일 형식입니다: {file_extension.lower()}")
+        return pages
     except Exception as e:
-        print(f"Claude API 호출 또는 결과 처리 중 오류 발생: {e}")
-        print(f"오류 타입: {type(e).__name__}")  # ⭐ 추가: 오류 타입 출력
-        return 
+        print(f"파일을 읽는 중 오류가 발생했습니다 ({file_path}): {e}")
+        return None
 
 
-    # 5. 결과 JSON 파일로 저장
+def save_summary(working_dir, input_filename, output_filename, summary_json):
+    """요약 결과를 원본 파일명과 함께 JSON 파일로 저장하고 저장 경로를 반환합니다."""
     final_output = {
         "original_file_name": input_filename,
         **summary_json
     }
     
     output_path = os.path.join(working_dir, output_filename)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(final_output, f, ensure_ascii=False, indent=2)
+    return output_path
 
+
+def index_saved_summaries(output_paths):
+    """
+    2026-10-17 KST: 새로 저장한 요약을 참고자료 검색 인덱스(전문/임베딩)에 바로 추가합니다.
+    서버의 주기적 재색인을 기다리지 않아도 되며, 색인에 실패해도 요약 결과에는 영향이 없습니다.
+    numpy 로딩, 임베딩 계산, 인덱스 파일 쓰기를 수행하는 동기 함수이므로 이벤트 루프에서는
+    asyncio.to_thread로 호출하고, 배치 모드에서는 모든 문서를 처리한 뒤 한 번에 호출합니다.
+    """
+    output_paths = [path for path in output_paths if os.path.basename(path).startswith("Abstract_")]
+    if not output_paths:
+        return
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_output, f, ensure_ascii=False, indent=2)
+        from utils.embedding_index import index_abstracts
+        index_abstracts(output_paths)
+    except Exception as e:
+        print(f"경고: 참고자료 인덱스 갱신 실패 ({', '.join(output_paths)}): {e}")
+
+
+async def _summarize_document(client, working_dir, input_filename, output_filename, prompt_template=None, verbose=True,
+                              bucket=None, chunked=True, chunk_options=None, partial_cache=None, index=True):
+    """
+    문서 하나를 요약하여 저장합니다. 실패하면 예외를 발생시킵니다.
+
+    chunked가 True이고 문서가 DEFAULT_MAX_CHARS보다 길면 청크 map-reduce로 전체 내용을 요약하고,
+    그렇지 않으면 앞부분 DEFAULT_MAX_CHARS자만 한 번에 요약합니다.
+    partial_cache는 재시도 사이에 완료된 부분 요약을 보관합니다. (request_chunked_summary 참고)
+    index가 True이면 저장한 요약을 스레드에서 참고자료 인덱스에 추가합니다. (배치 모드는 마지막에 한 번에 추가)
+    """
+    if not os.path.isdir(working_dir):
+        raise SummarizationError(f"작업 디렉토리를 찾을 수 없습니다 - {working_dir}")
+        
+    input_file_path = os.path.join(working_dir, input_filename)
+    if not os.path.exists(input_file_path):
+        raise SummarizationError(f"입력 파일을 찾을 수 없습니다 - {input_file_path}")
+
+    if prompt_template is None:
+        prompt_template = load_prompt_template(working_dir)
+
+    pages = read_document_pages(input_file_path)
+    file_content = "".join(pages) if pages else ""
+    if not file_content.strip():
+        raise SummarizationError(f"입력 파일에서 내용을 읽지 못했습니다 - {input_file_path}")
+
+    settings = summary_settings(chunked, chunk_options, len(file_content))
+    if settings["mode"] == "chunked":
+        summary_json = await request_chunked_summary(client, input_filename, pages, prompt_template, verbose=verbose,
+                                                     bucket=bucket, partial_cache=partial_cache, **(chunk_options or {}))
+    else:
+        summary_json = await request_summary(client, input_filename, file_content[:DEFAULT_MAX_CHARS], prompt_template,
+                                             verbose=verbose, bucket=bucket)
+    output_path = save_summary(working_dir, input_filename, output_filename, summary_json)
+    record_manifest_entry(working_dir, input_filename, output_filename, settings=settings)
+    if index:
+        await asyncio.to_thread(index_saved_summaries, [output_path])
+    return output_path
+
+
+# ===================================================================
+# 2025-09-17 23:45 KST: workingdir 인자를 받도록 함수 시그니처 수정
+# ===================================================================
+async def summarize_document(working_dir, input_filename, output_filename):
+    """지정된 작업 디렉토리 내의 문서를 요약하고 결과를 JSON 파일로 저장합니다."""
+    
+    print(f"작업 디렉토리: {working_dir}")
+
+    api_key = get_api_key("ANTHROPIC_API_KEY")
+    if not api_key:
+        print("오류: .env 파일에 ANTHROPIC_API_KEY가 설정되지 않았습니다.")
+        return
+
+    try:
+        # Claude 비동기 클라이언트 생성
+        client = anthropic.AsyncAnthropic(api_key=api_key)
+        output_path = await _summarize_document(client, working_dir, input_filename, output_filename)
         print(f"\n요약 완료! 결과가 다음 파일에 저장되었습니다: {output_path}")
+    except SummarizationError as e:
+        print(f"오류: {e}")
     except Exception as e:
-        print(f"결과 파일을 저장하는 중 오류 발생: {e}")
+        print(f"Claude API 호출 또는 결과 처리 중 오류 발생: {e}")
+        print(f"오류 타입: {type(e).__name__}")  # ⭐ 추가: 오류 타입 출력
+
+
+# ===================================================================
+# 2026-10-17 KST: 증분 생성 - 폴더별 manifest에 원본/템플릿 해시와 모델을 기록하여 변경된 문서만 재요약
+# ===================================================================
+MANIFEST_FILENAME = '.abstract_manifest.json'
+
+
+def file_sha256(path):
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_folder_manifest(working_dir):
+    """작업 폴더의 manifest({출력 파일명: 생성 정보})를 읽습니다. 없거나 손상되었으면 빈 딕셔너리를 반환합니다."""
+    manifest_path = os.path.join(working_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"manifest를 읽을 수 없어 새로 만듭니다 ({manifest_path}): {e}")
+        return {}
+
+
+def summary_settings(chunked=True, chunk_options=None, source_chars=None):
+    """
+    요약 결과에 영향을 주는 요약 방식 설정을 manifest 항목 형식으로 반환합니다.
+
+    원본 길이(source_chars)가 DEFAULT_MAX_CHARS를 넘고 chunked이면 "chunked" 방식이며 청크 크기와 입력 토큰 상한을,
+    그렇지 않으면 "single" 방식입니다. (chunk_concurrency는 결과에 영향이 없어 기록하지 않음)
+    """
+    settings = {"mode": "chunked" if chunked and source_chars > DEFAULT_MAX_CHARS else "single",
+                "source_chars": source_chars}
+    if settings["mode"] == "chunked":
+        options = chunk_options or {}
+        settings["chunk_chars"] = options.get("chunk_chars", CHUNK_CHARS)
+        settings["max_input_tokens"] = options.get("max_input_tokens", MAX_INPUT_TOKENS)
+    return settings
+
+
+def build_manifest_entry(working_dir, input_filename):
+    """현재 원본 파일, 프롬프트 템플릿, 모델 기준의 manifest 항목을 만듭니다."""
+    return {
+        "source": input_filename,
+        "source_sha256": file_sha256(os.path.join(working_dir, input_filename)),
+        "template_sha256": file_sha256(os.path.join(working_dir, 'prompt_templates.json')),
+        "model": SUMMARY_MODEL,
+    }
+
+
+def is_up_to_date(working_dir, input_filename, output_filename, manifest=None, chunked=True, chunk_options=None):
+    """
+    출력 파일이 존재하고, 기록된 원본/템플릿 해시와 모델, 요약 방식(분할 여부와 청크 설정)이 현재와 같으면 True를 반환합니다.
+
+    요약 방식이 기록되지 않은 항목(--mark-current로 기록한 기존 출력 파일)은 해시와 모델만 비교합니다.
+    """
+    if not os.path.exists(os.path.join(working_dir, output_filename)):
+        return False
+    manifest = load_folder_manifest(working_dir) if manifest is None else manifest
+    recorded = manifest.get(output_filename)
+    if not recorded:
+        return False
+    try:
+        current = build_manifest_entry(working_dir, input_filename)
+    except OSError:
+        return False
+    if "mode" in recorded:
+        # 원본 해시가 같으면 길이도 같으므로, 기록된 길이로 현재 설정에서의 요약 방식을 계산합니다.
+        if recorded.get("source_chars") is None:
+            return False
+        current.update(summary_settings(chunked, chunk_options, recorded["source_chars"]))
+    return all(recorded.get(key) == value for key, value in current.items())
+
+
+def record_manifest_entry(working_dir, input_filename, output_filename, settings=None):
+    """생성된 출력 파일의 원본/템플릿 해시와 모델(및 요약 방식 settings, summary_settings 참고)을 작업 폴더의 manifest에 기록합니다."""
+    manifest = load_folder_manifest(working_dir)
+    entry = build_manifest_entry(working_dir, input_filename)
+    entry["generated_at"] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    if settings:
+        entry.update(settings)
+    manifest[output_filename] = entry
+
+    manifest_path = os.path.join(working_dir, MANIFEST_FILENAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+# ===================================================================
+# 2026-10-17 KST: 배치 모드 - 여러 문서를 동시성/속도 제한 하에 병렬 요약
+# ===================================================================
+SUPPORTED_BATCH_EXTENSIONS = ('.pdf',)
+
+
+def load_manifest(manifest_path):
+    """
+    (folder, input, output) 작업 목록을 읽습니다.
+
+    manifest 파일은 [{"folder": ..., "input": ..., "output": ...}] 또는
+    [[folder, input, output], ...] 형식의 JSON 배열입니다. folder는 manifest 파일 위치 기준 상대 경로도 허용합니다.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            folder, input_filename, output_filename = entry['folder'], entry['input'], entry['output']
+        else:
+            folder, input_filename, output_filename = entry
+        folder = folder.replace('\\', os.sep)
+        if not os.path.isabs(folder):
+            folder = os.path.join(base_dir, folder)
+        jobs.append((folder, input_filename, output_filename))
+    return jobs
+
+
+def discover_jobs(root_dir):
+    """
+    root_dir(및 하위 폴더) 중 prompt_templates.json이 있는 폴더의 문서를 찾아 작업 목록을 만듭니다.
+    출력 파일명은 Abstract_<입력 파일명>.json입니다.
+    """
+    jobs = []
+    for folder, _, filenames in os.walk(root_dir):
+        if 'prompt_templates.json' not in filenames:
+            continue
+        for filename in sorted(filenames):
+            stem, extension = os.path.splitext(filename)
+            if extension.lower() in SUPPORTED_BATCH_EXTENSIONS:
+                jobs.append((folder, filename, f"Abstract_{stem}.json"))
+    return jobs
+
+
+async def run_batch(jobs, concurrency=4, requests_per_minute=30, retries=3, retry_delay=2.0, force=False,
+                    chunked=True, chunk_options=None):
+    """
+    여러 문서를 하나의 AsyncAnthropic 클라이언트로 병렬 요약합니다.
+
+    동시에 처리하는 문서 수는 concurrency로, API 호출 속도는 토큰 버킷(requests_per_minute)으로
+    제한합니다. 일시적인 API 오류(utils.rate_limit.classify_error 기준)는 지수 백오프(Retry-After가 더 길면 그만큼)로
+    최대 retries번 재시도하며, 긴 문서는 이미 완료된 청크를 다시 요약하지 않고 실패한 청크와 병합만 다시 요청합니다.
+    마지막에 파일별 처리 결과와 소요 시간을 출력합니다.
+    force가 False이면 manifest 기준으로 최신 상태인(원본, 템플릿, 모델, 요약 방식이 같은) 출력 파일은 건너뜁니다.
+    긴 문서의 청크 요약 호출도 같은 토큰 버킷을 공유하므로 전체 호출 속도는 requests_per_minute를 넘지 않습니다.
+    저장한 요약은 모든 문서를 처리한 뒤 스레드에서 한 번에 참고자료 인덱스에 추가합니다.
+    """
+    skipped = []
+    if not force:
+        pending = []
+        for job in jobs:
+            (skipped if is_up_to_date(*job, chunked=chunked, chunk_options=chunk_options) else pending).append(job)
+        for folder, input_filename, output_filename in skipped:
+            print(f"[최신] {os.path.join(folder, output_filename)} - 원본, 템플릿, 요약 방식이 변경되지 않아 건너뜁니다.")
+        print(f"총 {len(jobs)}건 중 {len(skipped)}건 최신, {len(pending)}건 재생성")
+        jobs = pending
+    skipped_results = [{"folder": folder, "input": input_filename, "output": output_filename,
+                        "status": "최신", "seconds": 0.0, "attempts": 0, "message": ""}
+                       for folder, input_filename, output_filename in skipped]
+    if not jobs:
+        return skipped_results
+
+    api_key = get_api_key("ANTHROPIC_API_KEY")
+    if not api_key:
+        print("오류: .env 파일에 ANTHROPIC_API_KEY가 설정되지 않았습니다.")
+        return []
+
+    # 재시도는 classify_error와 토큰 버킷이 모두 담당하므로 SDK 자체 재시도는 끕니다. (재시도 호출도 --rate 제한을 받도록)
+    client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket.per_minute(requests_per_minute)
+    templates = {}
+
+    async def process(folder, input_filename, output_filename):
+        started = time.perf_counter()
+        attempts = 0
+        # 이 문서의 완료된 부분 요약 (재시도 사이에 재사용하고, 문서 처리가 끝나면 버림)
+        partial_cache = {}
+        async with semaphore:
+            while True:
+                attempts += 1
+                try:
+                    if folder not in templates:
+                        templates[folder] = load_prompt_template(folder)
+                    await _summarize_document(client, folder, input_filename, output_filename,
+                                              prompt_template=templates[folder], verbose=False, bucket=bucket,
+                                              chunked=chunked, chunk_options=chunk_options, partial_cache=partial_cache,
+                                              index=False)
+                    status, message = "성공", ""
+                    break
+                except SummarizationError as e:
+                    status, message = "실패", str(e)
+                    break
+                except Exception as e:
+                    retryable, _, retry_after = classify_error(e)
+                    if attempts <= retries and retryable:
+                        wait_time = max(retry_delay * (2 ** (attempts - 1)), retry_after or 0.0)
+                        print(f"일시적 오류로 재시도합니다 ({input_filename}, {attempts}/{retries}, {wait_time:.1f}초 후): {e}")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    status, message = "실패", f"{type(e).__name__}: {e}"
+                    break
+        elapsed = time.perf_counter() - started
+        print(f"[{status}] {os.path.join(folder, output_filename)} ({elapsed:.1f}초, 시도 {attempts}회) {message}")
+        return {"folder": folder, "input": input_filename, "output": output_filename,
+                "status": status, "seconds": elapsed, "attempts": attempts, "message": message}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(process(*job) for job in jobs))
+    saved_paths = [os.path.join(r['folder'], r['output']) for r in results if r['status'] == "성공"]
+    await asyncio.to_thread(index_saved_summaries, saved_paths)
+    total_elapsed = time.perf_counter() - started
+
+    print("\n=== 배치 처리 결과 ===")
+    for result in results:
+        print(f"{result['status']:<3} {result['seconds']:7.1f}s  {result['attempts']}회  {result['input']} -> {result['output']}")
+    succeeded = sum(1 for r in results if r['status'] == "성공")
+    print(f"총 {len(results)}건 중 {succeeded}건 성공, {len(skipped)}건 최신(건너뜀), 전체 소요 시간 {total_elapsed:.1f}초")
+    return results + skipped_results
+
+
+def parse_batch_args(argv):
+    parser = argparse.ArgumentParser(description="문서를 요약하여 Abstract_*.json 파일을 생성합니다 (배치 모드).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--batch", metavar="DIR", help="prompt_templates.json이 있는 폴더(하위 폴더 포함)의 PDF를 모두 요약")
+    source.add_argument("--manifest", metavar="FILE", help="(folder, input, output) 작업 목록 JSON 파일")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 문서 수 (기본 4)")
+    parser.add_argument("--rate", type=float, default=30, help="분당 최대 API 호출 수 (기본 30)")
+    parser.add_argument("--retries", type=int, default=3, help="일시적 오류 재시도 횟수 (기본 3)")
+    parser.add_argument("--force", action="store_true", help="manifest와 관계없이 모든 문서를 다시 요약")
+    parser.add_argument("--no-chunking", action="store_true",
+                        help=f"긴 문서도 분할하지 않고 앞부분 {DEFAULT_MAX_CHARS}자만 요약 (기존 방식)")
+    parser.add_argument("--chunk-chars", type=int, default=CHUNK_CHARS, help=f"청크당 최대 글자 수 (기본 {CHUNK_CHARS})")
+    parser.add_argument("--chunk-concurrency", type=int, default=CHUNK_CONCURRENCY,
+                        help=f"문서 하나에서 동시에 요약할 청크 수 (기본 {CHUNK_CONCURRENCY})")
+    parser.add_argument("--max-input-tokens", type=int, default=MAX_INPUT_TOKENS,
+                        help=f"문서 하나당 요약에 사용할 추정 입력 토큰 상한 (기본 {MAX_INPUT_TOKENS})")
+    parser.add_argument("--mark-current", action="store_true",
+                        help="API를 호출하지 않고, 이미 존재하는 출력 파일을 현재 원본/템플릿 기준 최신으로 manifest에 기록")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
     # ===================================================================
     # 2025-09-17 23:45 KST: 명령어 인자 3개(작업폴더, 입력, 출력)를 받도록 수정
+    # 2026-10-17 KST: --batch/--manifest 배치 모드 추가
+    # 2026-10-17 KST: 긴 문서 청크 map-reduce 요약 (--no-chunking으로 기존 방식 사용)
     # ===================================================================
+    if len(sys.argv) > 1 and sys.argv[1].startswith('--'):
+        args = parse_batch_args(sys.argv[1:])
+        batch_jobs = load_manifest(args.manifest) if args.manifest else discover_jobs(args.batch)
+        if not batch_jobs:
+            print("처리할 문서가 없습니다.")
+            sys.exit(0)
+        if args.mark_current:
+            for job_folder, job_input, job_output in batch_jobs:
+                if os.path.exists(os.path.join(job_folder, job_output)) and os.path.exists(os.path.join(job_folder, job_input)):
+                    record_manifest_entry(job_folder, job_input, job_output)
+                    print(f"[기록] {os.path.join(job_folder, job_output)}")
+            sys.exit(0)
+        batch_chunk_options = {"chunk_chars": args.chunk_chars, "chunk_concurrency": args.chunk_concurrency,
+                               "max_input_tokens": args.max_input_tokens}
+        batch_results = asyncio.run(run_batch(batch_jobs, args.concurrency, args.rate, args.retries, force=args.force,
+                                              chunked=not args.no_chunking, chunk_options=batch_chunk_options))
+        sys.exit(0 if batch_results and all(r['status'] in ("성공", "최신") for r in batch_results) else 1)
+
     if len(sys.argv) != 4:
         print("사용법: python keyextraction.py <working_dir> <input_filename> <output_filename.json>")
+        print("       python keyextraction.py --batch <dir> | --manifest <file.json> [--concurrency N] [--rate N] [--retries N] [--force] [--no-chunking]")
         sys.exit(1)
     
     work_dir = sys.argv[1]
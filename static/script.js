@@ -42,6 +42,8 @@ const app = createApp({
     const referenceFiles = ref([]);
     const isLoadingReferences = ref(false);
     const leftPanelTitle = ref('AX 방법론');
+    // 2026-10-17 KST: 서버 대화 기록 ID - 빈 값이면 서버가 새 대화를 만들고 meta/message 이벤트로 ID를 알려줌
+    const conversationId = ref('');
 
     const axMethodology = ref([]);
     const selectedTask = ref(null);
@@ -120,7 +122,7 @@ const app = createApp({
       referenceFiles.value = [];
 
       try {
-        const res = await fetch(`/api/reference-materials/${folderName}`);
+        const res = await fetch(`/api/reference-materials/${encodeURIComponent(folderName)}`);
         if (!res.ok) throw new Error('참고자료를 불러오는 데 실패했습니다.');
         referenceFiles.value = await res.json();
       } catch (e) {
@@ -236,14 +238,72 @@ const app = createApp({
       }
     };
 
-    const displayReferenceContent = (file) => {
-      workspaceContent.value = `<div class="p-4">
-        <h3 class="text-xl font-bold mb-4">${file.original_file_name}</h3>
-        <div class="prose max-w-none mt-2">${file.summary_html}</div>
-      </div>`;
+    // 2026-10-17 KST: 참고자료 본문은 선택 시점에 상세 API에서 지연 로드 (한 번 받은 문서는 재사용)
+    const referenceDetailCache = new Map();
+
+    const fetchReferenceDetail = async (folderName, jsonName) => {
+      const cacheKey = `${folderName}/${jsonName}`;
+      if (referenceDetailCache.has(cacheKey)) return referenceDetailCache.get(cacheKey);
+
+      const res = await fetch(`/api/reference-materials/${encodeURIComponent(folderName)}/${encodeURIComponent(jsonName)}`);
+      if (!res.ok) throw new Error('참고자료를 불러오는 데 실패했습니다.');
+      const detail = await res.json();
+      referenceDetailCache.set(cacheKey, detail);
+      return detail;
+    };
+
+    const displayReferenceContent = async (file) => {
+      const folderName = menuIdToFolderMap[activeMenu.value];
+      if (!folderName) return;
+
+      isLoading.value = true;
+      try {
+        const detail = await fetchReferenceDetail(folderName, file.json_name);
+        workspaceContent.value = `<div class="p-4">
+          <h3 class="text-xl font-bold mb-4">${file.original_file_name}</h3>
+          <div class="prose max-w-none mt-2">${detail.summary_html}</div>
+        </div>`;
+      } catch (e) {
+        console.error('Failed to load reference detail:', e);
+        workspaceContent.value = `<p class="text-red-500 p-4">오류: ${e.message}</p>`;
+      } finally {
+        isLoading.value = false;
+      }
+    };
+
+    // 2026-10-17 KST: SSE 스트리밍 응답 처리용 헬퍼
+    const escapeHtml = (text) => text
+      .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+
+    const readEventStream = async (res, onEvent) => {
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder('utf-8');
+      let buffer = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          let eventName = 'message';
+          const dataLines = [];
+          block.split('\n').forEach(line => {
+            if (line.startsWith('event:')) eventName = line.slice(6).trim();
+            else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+          });
+          if (dataLines.length > 0) onEvent(eventName, JSON.parse(dataLines.join('\n')));
+        }
+      }
     };
 
     // 2025-01-17 15:00 KST: 프롬프트 전송 후 자동 지우기 제거
+    // 2026-10-17 KST: /api/chat/stream으로 전환 - 토큰이 도착하는 대로 표시하고 검증 결과는 이후에 덧붙임
+    // 2026-10-17 KST: 검증 판정(validation)과 개선 답변(refinement)을 별도 이벤트로 받아 순서대로 반영
     const sendMessage = async () => {
       const prompt = chatInput.value.trim();
       if (!prompt) return;
@@ -252,23 +312,62 @@ const app = createApp({
       // chatInput.value = ''; // 2025-01-17 15:00 KST: 제거
       isLoading.value = true;
       workspaceContent.value = '';
+      sourceInfo.value = [];
 
       try {
         const formData = new FormData();
         formData.append('prompt', originalPrompt);
         formData.append('llm_model_choice', llmModelSelect.value);
         formData.append('use_validation', useValidation.value);
-        formData.append('chat_history', JSON.stringify([]));
-
-        const res = await fetch('/api/chat', { method: 'POST', body: formData });
-        const result = await res.json();
-        
-        if (result.error) throw new Error(result.error);
+        // 2026-10-17 KST: 대화 기록 대신 대화 ID만 보냄 (이전 턴은 서버 대화 기록에서 사용)
+        formData.append('conversation_id', conversationId.value);
+
+        const res = await fetch('/api/chat/stream', { method: 'POST', body: formData });
+        if (!res.ok) {
+          const result = await res.json();
+          // 만료되었거나 없는 대화면 다음 전송에서 새 대화를 시작
+          if (res.status === 404) conversationId.value = '';
+          throw new Error(result.error || '요청에 실패했습니다.');
+        }
 
-        agentName.value = result.agent_name;
-        agentDescription.value = result.agent_description;
-        workspaceContent.value = result.response_content;
-        sourceInfo.value = result.source_info || [];
+        let streamedText = '';
+        let answerHtml = '';
+        let feedbackHtml = '';
+        await readEventStream(res, (eventName, data) => {
+          if (data.conversation_id) conversationId.value = data.conversation_id;
+          if (eventName === 'meta') {
+            agentName.value = data.agent_name;
+            agentDescription.value = data.agent_description;
+          } else if (eventName === 'token') {
+            isLoading.value = false;
+            streamedText += data.text;
+            workspaceContent.value = `<div class="whitespace-pre-wrap">${escapeHtml(streamedText)}</div>`;
+          } else if (eventName === 'message') {
+            isLoading.value = false;
+            if (data.agent_name) agentName.value = data.agent_name;
+            if (data.cached) agentName.value = `${agentName.value} (캐시된 응답)`;
+            answerHtml = data.response_content;
+            workspaceContent.value = answerHtml;
+            sourceInfo.value = data.source_info || [];
+            if (data.validation_pending) {
+              workspaceContent.value += `<p class="validation-pending text-gray-500 mt-4">수행 결과를 검증하는 중...</p>`;
+            }
+          } else if (eventName === 'validation') {
+            feedbackHtml = data.feedback_html;
+            workspaceContent.value = answerHtml + feedbackHtml;
+            if (data.refinement_pending) {
+              workspaceContent.value += `<p class="validation-pending text-gray-500 mt-4">검증 피드백을 반영하여 답변을 개선하는 중...</p>`;
+            }
+            sourceInfo.value = [...sourceInfo.value, ...(data.source_info || [])];
+            agentName.value = `${agentName.value} (검증 완료)`;
+          } else if (eventName === 'refinement') {
+            if (data.refinement_content) answerHtml = data.refinement_content;
+            feedbackHtml += data.error_html || '';
+            workspaceContent.value = answerHtml + feedbackHtml;
+          } else if (eventName === 'error') {
+            throw new Error(data.error);
+          }
+        });
       } catch (e) {
         workspaceContent.value = `<p class="text-red-500 p-4">오류: ${e.message}</p>`;
         agentName.value = '오류 발생';
@@ -277,6 +376,15 @@ const app = createApp({
       }
     };
 
+    // 2026-10-17 KST: 새 대화 시작 - 다음 전송부터 이전 대화 기록 없이 새 서버 대화를 사용
+    const startNewConversation = () => {
+      conversationId.value = '';
+      workspaceContent.value = '';
+      sourceInfo.value = [];
+      agentName.value = '준비 완료';
+      agentDescription.value = 'AX Consulting HUB가 준비되었습니다.';
+    };
+
     // 2025-01-17 15:00 KST: 새로 추가 - 명시적 프롬프트 지우기 함수
     const clearInput = () => {
       chatInput.value = '';
@@ -309,7 +417,8 @@ const app = createApp({
       expandedTasks, promptGroups, activePromptIndex, isLoadingPrompts,
       
       sendMessage, handleInput, setActiveMenu, selectTask, isExpanded,
-      displayReferenceContent, selectPromptGroup, clearInput // 2025-01-17 15:00 KST: 추가
+      displayReferenceContent, selectPromptGroup, clearInput, // 2025-01-17 15:00 KST: 추가
+      conversationId, startNewConversation // 2026-10-17 KST: 추가
     };
   }
 });
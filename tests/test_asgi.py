@@ -0,0 +1,16 @@
+# tests/test_asgi.py
+from starlette.testclient import TestClient
+
+import asgi
+
+
+def test_chat_routes_answer_cors_preflight():
+    client = TestClient(asgi.app)
+    for path in ('/api/chat', '/api/chat/stream'):
+        response = client.options(path, headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type",
+        })
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "*"
@@ -0,0 +1,100 @@
+# tests/test_context_window.py
+import asyncio
+import importlib
+import os
+import threading
+import time
+import types
+
+import pytest
+
+import agents.context_window as context_window_module
+from agents.base_agent import BaseAgent
+from agents.context_window import context_window
+
+
+class HistoryAgent(BaseAgent):
+    """대화 기록을 토큰 예산에 맞춰 변환만 하고 고정 답변을 돌려주는 에이전트."""
+    context_budget = 300
+
+    def __init__(self):
+        self.name = "테스트 에이전트"
+        self.description = "테스트용"
+
+    async def process_request(self, prompt, chat_history, use_validation):
+        self.format_history(chat_history)
+        return {"response_content": "<p>답변</p>", "response_text": "답변", "source_info": []}
+
+    async def stream_request(self, prompt, chat_history):
+        self.format_history(chat_history)
+        yield {"event": "token", "data": {"text": "답변"}}
+        yield {"event": "message", "data": {"response_text": "답변", "source_info": []}}
+
+
+@pytest.fixture(scope="module")
+def backend(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("backend")
+    cwd = os.getcwd()
+    os.environ["REFERENCE_INDEX_PATH"] = str(directory / "reference_index.db")
+    os.environ["RAG_ENABLED"] = "false"
+    os.chdir(directory)
+    try:
+        module = importlib.import_module("backend")
+    finally:
+        os.chdir(cwd)
+    module.router.agents["Gemini"] = HistoryAgent()
+    return module
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    """요약 호출을 기록하고, release가 설정될 때까지 요약을 끝내지 않는 보조 모델로 대체합니다."""
+    calls = []
+    release = threading.Event()
+
+    async def complete(prompt):
+        calls.append(prompt)
+        await asyncio.to_thread(release.wait, 5)
+        return f"요약 {len(calls)}"
+
+    fake = types.SimpleNamespace(backend=types.SimpleNamespace(complete=complete))
+    monkeypatch.setattr(context_window_module, "get_validator", lambda: fake)
+    monkeypatch.setattr(context_window, "min_summary_turns", 2)
+    monkeypatch.setattr(context_window, "summarize", True)
+    yield calls, release
+    release.set()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("path", ["/api/chat/stream", "/api/chat"])
+def test_summary_runs_in_background_across_requests(backend, summarizer, path):
+    calls, release = summarizer
+    store = backend.router.conversation_store
+    conversation_id = store.create()
+    conversation = store.get_history(conversation_id).conversation
+    client = backend.app.test_client()
+
+    covered = []
+    for _ in range(2):
+        release.clear()
+        for number in range(6):
+            store.append_exchange(conversation_id, f"질문 {number} " + "가나다라마바사 " * 20, "답변 " + "아자차카타파하 " * 20)
+        response = client.post(path, data={"prompt": "이어서", "conversation_id": conversation_id, "llm_model_choice": "Gemini"})
+        assert response.status_code == 200
+        response.get_data()
+        # 응답은 요약이 끝나기를 기다리지 않습니다.
+        assert conversation.summarizing is True
+        release.set()
+        wait_until(lambda: not conversation.summarizing)
+        assert conversation.summary is not None
+        covered.append(conversation.summary[0])
+
+    assert len(calls) == 2
+    assert conversation.summary[1] == "요약 2"
+    assert covered[1] > covered[0]
@@ -0,0 +1,36 @@
+# tests/test_embedding_index.py
+import gc
+import weakref
+
+import numpy as np
+
+from utils.embedding_index import EmbeddingStore, HashingEmbedder
+
+
+def test_embedder_feature_cache_does_not_pin_instances():
+    embedder = HashingEmbedder(dim=16)
+    embedder.embed(["참고자료 검색"])
+    ref = weakref.ref(embedder)
+    del embedder
+    gc.collect()
+    assert ref() is None
+
+
+def test_search_retries_when_generation_files_are_compacted_away(tmp_path):
+    embedder = HashingEmbedder(dim=16)
+    reader = EmbeddingStore(str(tmp_path), dim=16)
+    writer = EmbeddingStore(str(tmp_path), dim=16)
+    writer.append(embedder.embed(["법령 정보", "차세대 시스템", "생성형 AI"]),
+                  [("a", 0, "s1"), ("b", 0, "s2"), ("c", 0, "s3")])
+
+    # 다른 프로세스가 세대를 읽은 직후 압축하여 이전 세대 파일을 지운 상황
+    stale = reader._info()
+    writer.delete_doc("b")
+    writer.compact()
+    real_info = reader._info
+    answers = iter([stale])
+    reader._info = lambda: next(answers, None) or real_info()
+
+    [hits] = reader.search(embedder.embed(["생성형 AI"])[0], k=1)
+    assert reader.row_keys([hits[0][0]])[hits[0][0]] == ("c", 0)
+    assert np.isclose(hits[0][1], 1.0, atol=0.05)
@@ -0,0 +1,96 @@
+# tests/test_keyextraction.py
+import asyncio
+import threading
+
+import keyextraction
+from keyextraction import DEFAULT_MAX_CHARS, is_up_to_date, record_manifest_entry, summary_settings
+
+
+def make_folder(tmp_path):
+    (tmp_path / "prompt_templates.json").write_text('[{"template": "요약해줘"}]', encoding="utf-8")
+    (tmp_path / "report.pdf").write_bytes(b"%PDF-1.4 test")
+    (tmp_path / "Abstract_report.json").write_text("{}", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_switching_summary_mode_invalidates_manifest_entry(tmp_path):
+    folder = make_folder(tmp_path)
+    long_document = DEFAULT_MAX_CHARS * 3
+    record_manifest_entry(folder, "report.pdf", "Abstract_report.json",
+                          settings=summary_settings(True, {"chunk_chars": 8000}, long_document))
+
+    assert is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=True, chunk_options={"chunk_chars": 8000})
+    assert not is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=False)
+    assert not is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=True)
+    assert not is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=True,
+                             chunk_options={"chunk_chars": 8000, "max_input_tokens": 1000})
+
+
+def test_short_document_ignores_chunk_settings(tmp_path):
+    folder = make_folder(tmp_path)
+    record_manifest_entry(folder, "report.pdf", "Abstract_report.json", settings=summary_settings(False, None, 1000))
+
+    assert is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=True, chunk_options={"chunk_chars": 500})
+    assert is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=False)
+
+
+def test_mark_current_entry_compares_hashes_only(tmp_path):
+    folder = make_folder(tmp_path)
+    record_manifest_entry(folder, "report.pdf", "Abstract_report.json")
+
+    assert is_up_to_date(folder, "report.pdf", "Abstract_report.json", chunked=False)
+    (tmp_path / "report.pdf").write_bytes(b"%PDF-1.4 changed")
+    assert not is_up_to_date(folder, "report.pdf", "Abstract_report.json")
+    assert keyextraction.load_folder_manifest(folder)["Abstract_report.json"]["source"] == "report.pdf"
+
+
+class OverloadedError(Exception):
+    status_code = 529
+
+
+def test_batch_retry_reuses_completed_chunk_summaries(tmp_path, monkeypatch):
+    folder = make_folder(tmp_path)
+    pages = [f"{number}페이지 " + "가" * (DEFAULT_MAX_CHARS // 2) for number in range(1, 5)]
+    calls = []
+
+    async def fake_call_claude(client, prompt, max_tokens, bucket=None):
+        # 재시도는 배치 재시도와 토큰 버킷만 담당합니다. (SDK 자체 재시도 없음)
+        assert client.max_retries == 0
+        label = "merge" if "부분 요약 JSON들" in prompt else prompt.split("중 ")[1].split("번째")[0]
+        calls.append(label)
+        if label == "2" and calls.count("2") == 1:
+            raise OverloadedError("overloaded")
+        return '{"요약": "%s"}' % label
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(keyextraction, "read_document_pages", lambda path: pages)
+    monkeypatch.setattr(keyextraction, "call_claude", fake_call_claude)
+
+    results = asyncio.run(keyextraction.run_batch([(folder, "report.pdf", "summary.json")], retries=2, retry_delay=0,
+                                                  force=True, chunk_options={"chunk_chars": DEFAULT_MAX_CHARS}))
+
+    assert results[0]["status"] == "성공" and results[0]["attempts"] == 2
+    assert sorted(calls) == ["1", "2", "2", "3", "4", "merge"]
+
+
+def test_batch_indexes_saved_summaries_once_off_the_event_loop(tmp_path, monkeypatch):
+    folder = make_folder(tmp_path)
+    (tmp_path / "other.pdf").write_bytes(b"%PDF-1.4 other")
+    indexed = []
+
+    async def fake_call_claude(client, prompt, max_tokens, bucket=None):
+        return '{"요약": "내용"}'
+
+    def fake_index(output_paths):
+        indexed.append((threading.current_thread() is threading.main_thread(), sorted(output_paths)))
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(keyextraction, "read_document_pages", lambda path: ["짧은 문서"])
+    monkeypatch.setattr(keyextraction, "call_claude", fake_call_claude)
+    monkeypatch.setattr(keyextraction, "index_saved_summaries", fake_index)
+
+    jobs = [(folder, "report.pdf", "Abstract_report.json"), (folder, "other.pdf", "Abstract_other.json")]
+    results = asyncio.run(keyextraction.run_batch(jobs, retry_delay=0, force=True))
+
+    assert [r["status"] for r in results] == ["성공", "성공"]
+    assert indexed == [(False, [str(tmp_path / "Abstract_other.json"), str(tmp_path / "Abstract_report.json")])]
@@ -0,0 +1,44 @@
+# tests/test_rate_limit.py
+import asyncio
+
+from utils.rate_limit import ConcurrencyLimiter
+
+
+def test_slot_returned_when_waiter_cancelled_after_handoff():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 1
+
+        # release()가 슬롯을 넘기고 _wake가 set_result를 호출한 직후, 대기 태스크가 재개되기 전에 취소합니다.
+        limiter.release()
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert waiter.cancelled()
+
+        assert limiter.stats() == {"limit": 1, "active": 0, "waiting": 0}
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        limiter.release()
+
+    asyncio.run(scenario())
+
+
+def test_slot_returned_when_waiter_cancelled_before_wake():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # 슬롯을 넘겨주기로 했지만 _wake가 실행되기 전에 취소된 경우
+        limiter.release()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert limiter.stats() == {"limit": 1, "active": 0, "waiting": 0}
+
+    asyncio.run(scenario())
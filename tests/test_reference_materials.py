@@ -0,0 +1,36 @@
+# tests/test_reference_materials.py
+import json
+
+import backend
+from utils.reference_index import normalize_abstract
+
+
+def test_listing_uses_search_index_normalizer(tmp_path):
+    content = {
+        "original_file_name": "RFP_법령AI.pdf",
+        "rfp_summary": {
+            "report_title": "생성형 AI 법령정보 서비스 ISP",
+            "주요 키워드": ["법령정보", "생성형 AI", "ISP"],
+        },
+    }
+    (tmp_path / "Abstract_RFP.json").write_text(json.dumps(content, ensure_ascii=False), encoding="utf-8")
+
+    [material] = backend.list_reference_materials(str(tmp_path))
+    record = normalize_abstract(content, tmp_path.name, "Abstract_RFP.json")
+
+    assert material["title"] == "생성형 AI 법령정보 서비스 ISP"
+    assert material["keywords"] == ["법령정보", "생성형 AI", "ISP"]
+    assert material["title"] == record["title"]
+    assert material["keywords"] == record["keywords"]
+    assert material["original_file_name"] == "RFP_법령AI.pdf"
+
+
+def test_reference_routes_only_serve_known_folders():
+    client = backend.app.test_client()
+    for path in ("/api/reference-materials/uploads", "/api/reference-materials/uploads/Abstract_x.json",
+                 "/api/reference-materials/..%2Fuploads/Abstract_x.json"):
+        assert client.get(path).status_code in (400, 404)
+    assert client.get("/api/reference-materials/uploads/Abstract_x.json").get_json()["error"] == "잘못된 참고자료 폴더입니다."
+
+    response = client.get("/api/reference-materials/110-Env_files")
+    assert response.status_code == 200 and response.get_json()
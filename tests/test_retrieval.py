@@ -0,0 +1,11 @@
+# tests/test_retrieval.py
+from agents.retrieval import ReferenceRetriever, create_retriever_from_env
+
+
+def test_retrieval_is_opt_in(monkeypatch):
+    index = object()
+    monkeypatch.delenv("RAG_ENABLED", raising=False)
+    assert create_retriever_from_env(index) is None
+
+    monkeypatch.setenv("RAG_ENABLED", "true")
+    assert isinstance(create_retriever_from_env(index), ReferenceRetriever)
@@ -0,0 +1,196 @@
+# tests/test_router.py
+import asyncio
+import types
+
+import pytest
+
+import agents.validator
+from utils.exceptions import APIException
+from agents.openai_agent import OpenAIAgent
+from agents.router import AgentRouter
+from utils.conversation_store import ConversationStore, MemoryConversationBackend
+
+
+@pytest.fixture
+def openai_only(monkeypatch):
+    """GEMINI_API_KEY 없이 OPENAI_API_KEY만 설정하고, OpenAI 호출은 고정 응답으로 대체합니다."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("VALIDATOR_BACKEND", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(agents.validator, "_validator", None)
+
+    async def fake_call(self, prompt, chat_history):
+        return {"text": "안녕하세요"}
+
+    async def fake_stream(self, prompt, chat_history):
+        yield {"event": "token", "data": {"text": "안녕하세요"}}
+        yield {"event": "message", "data": {"response_text": "안녕하세요", "source_info": []}}
+
+    monkeypatch.setattr(OpenAIAgent, "_call_openai_api", fake_call)
+    monkeypatch.setattr(OpenAIAgent, "stream_request", fake_stream)
+    return AgentRouter(hedging=False)
+
+
+def test_openai_routes_without_gemini_key(openai_only):
+    router = openai_only
+    assert router.provider_status()["OpenAI"]["ready"]
+    assert isinstance(router.get_agent("OpenAI"), OpenAIAgent)
+
+    for use_validation in (False, True):
+        name, _, data = asyncio.run(router.handle_request("안녕", [], "OpenAI", use_validation))
+        assert data["response_text"] == "안녕하세요"
+        assert "검증 완료" not in name
+        assert data["source_info"] == []
+
+
+def test_openai_streams_without_gemini_key(openai_only):
+    async def collect():
+        return [event async for event in openai_only.stream_request("안녕", [], "OpenAI", True)]
+
+    events = asyncio.run(collect())
+    assert [event["event"] for event in events] == ["meta", "token", "message"]
+    assert events[-1]["data"]["validation_pending"] is False
+
+
+@pytest.fixture
+def hedged_router(monkeypatch):
+    """Gemini와 OpenAI 두 공급자만 있고 곧바로 헤지 요청을 보내는 라우터."""
+    router = AgentRouter(hedging=True, failover=True)
+    router.agent_specs = {key: router.agent_specs[key] for key in ("Gemini", "OpenAI")}
+    router.fallback_order = ["Gemini", "OpenAI"]
+    router.agents = {key: key for key in router.agent_specs}
+    router.hedge_default_delay = 0.01
+    return router
+
+
+def test_race_discards_result_that_finishes_while_being_cancelled(hedged_router):
+    discarded = []
+
+    async def make_call(agent):
+        if agent == "OpenAI":
+            await asyncio.sleep(0.02)
+            return "openai stream"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # 취소 직전에 끝난 호출처럼 결과를 돌려줍니다.
+            return "gemini stream"
+
+    async def discard(key, result):
+        discarded.append((key, result))
+
+    winner = asyncio.run(hedged_router._race("Gemini", "first_event", make_call, discard))
+    assert winner == ("OpenAI", "openai stream")
+    assert discarded == [("Gemini", "gemini stream")]
+
+
+def test_race_discards_winner_when_sibling_raises(hedged_router):
+    discarded = []
+    started = []
+
+    async def make_call(agent):
+        started.append(agent)
+        if agent == "Gemini":
+            while len(started) < 2:
+                await asyncio.sleep(0.001)
+            # 헤지 요청을 깨우고 바로 끝나므로 두 호출이 같은 asyncio.wait 결과에 함께 들어옵니다.
+            gate.set()
+            return "gemini stream"
+        await gate.wait()
+        raise ValueError("잘못된 요청")
+
+    async def discard(key, result):
+        discarded.append((key, result))
+
+    gate = None
+
+    async def main():
+        nonlocal gate
+        gate = asyncio.Event()
+        return await hedged_router._race("Gemini", "first_event", make_call, discard)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    assert discarded == [("Gemini", "gemini stream")]
+
+
+class RecordingCache:
+    """ResponseCache와 같은 인터페이스로 저장된 키만 기록합니다."""
+    def __init__(self):
+        self.entries = {}
+
+    def make_key(self, model_key, chat_history, prompt, use_validation):
+        return (model_key, prompt, use_validation)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+
+class FixedAgent:
+    def __init__(self, name, error=None):
+        self.name = name
+        self.description = name
+        self.error = error
+
+    async def process_request(self, prompt, chat_history, use_validation):
+        if self.error is not None:
+            raise self.error
+        return {"response_content": f"<p>{self.name}</p>", "response_text": self.name, "source_info": []}
+
+
+def test_failover_response_is_not_cached_for_requested_model(hedged_router):
+    router = hedged_router
+    router.hedging = False
+    router.response_cache = RecordingCache()
+    router.agents = {"Gemini": FixedAgent("Gemini", APIException("일시적 오류", 503)), "OpenAI": FixedAgent("OpenAI")}
+
+    name, _, data = asyncio.run(router.handle_request("안녕", [], "Gemini", False))
+    assert name == "OpenAI"
+    assert router.response_cache.entries == {}
+
+    router.agents["Gemini"].error = None
+    name, _, data = asyncio.run(router.handle_request("안녕", [], "Gemini", False))
+    assert name == "Gemini" and data["cached"] is False
+    assert list(router.response_cache.entries) == [("Gemini", "안녕", False)]
+
+
+def test_stream_returns_conversation_id_for_follow_up_turns(openai_only):
+    router = openai_only
+    router.conversation_store = ConversationStore(MemoryConversationBackend(max_conversations=10, ttl=60))
+
+    async def collect(conversation_id):
+        return [event async for event in router.stream_request("안녕", [], "OpenAI", False, conversation_id)]
+
+    first = asyncio.run(collect(""))
+    conversation_id = first[0]["data"]["conversation_id"]
+    assert first[-1]["event"] == "message" and first[-1]["data"]["conversation_id"] == conversation_id
+
+    second = asyncio.run(collect(conversation_id))
+    assert second[-1]["data"]["conversation_id"] == conversation_id
+    assert len(router.conversation_store.get_history(conversation_id)) == 4
+
+
+def test_empty_conversation_id_without_store_uses_chat_history(openai_only):
+    _, _, data = asyncio.run(openai_only.handle_request("안녕", [], "OpenAI", False, ""))
+    assert "conversation_id" not in data
+
+
+def test_validated_name_is_per_request(openai_only, monkeypatch):
+    router = openai_only
+    fake_validator = types.SimpleNamespace(source_info=[])
+
+    async def fake_validation(self, prompt, response_text, chat_history):
+        return {"feedback_html": "<p>좋음</p>", "refinement_content": None}
+
+    monkeypatch.setattr(OpenAIAgent, "get_validator", lambda self: fake_validator)
+    monkeypatch.setattr(OpenAIAgent, "_call_validation_agent", fake_validation)
+
+    names = [asyncio.run(router.handle_request("안녕", [], "OpenAI", True))[0] for _ in range(2)]
+    plain, _, data = asyncio.run(router.handle_request("안녕", [], "OpenAI", False))
+
+    assert names == ["OpenAI 에이전트 (검증 완료)"] * 2
+    assert plain == "OpenAI 에이전트" and "agent_name" not in data
+    assert router.get_agent("OpenAI").name == "OpenAI 에이전트"
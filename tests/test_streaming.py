@@ -0,0 +1,70 @@
+# tests/test_streaming.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.claude_agent import ClaudeAgent
+from agents.openai_agent import OpenAIAgent
+
+
+class FakeStream:
+    """SDK AsyncStream처럼 async with/async for를 지원하고 close() 호출 여부를 기록합니다."""
+    def __init__(self, items):
+        self.items = items
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        self.closed = True
+
+    async def __aiter__(self):
+        for item in self.items:
+            yield item
+
+
+def openai_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def claude_event(text):
+    return SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=text))
+
+
+def fake_client(path, stream):
+    async def create(**kwargs):
+        return stream
+
+    client = SimpleNamespace()
+    node = client
+    for name in path[:-1]:
+        setattr(node, name, SimpleNamespace())
+        node = getattr(node, name)
+    setattr(node, path[-1], create)
+    return client
+
+
+@pytest.mark.parametrize("agent_cls, env, path, make_item", [
+    (OpenAIAgent, "OPENAI_API_KEY", ("chat", "completions", "create"), openai_chunk),
+    (ClaudeAgent, "ANTHROPIC_API_KEY", ("messages", "create"), claude_event),
+])
+def test_early_stop_closes_sdk_stream(monkeypatch, agent_cls, env, path, make_item):
+    monkeypatch.setenv(env, "test-key")
+    agent = agent_cls()
+    stream = FakeStream([make_item("안녕"), make_item("하세요")])
+    monkeypatch.setattr(agent.clients, "get", lambda: fake_client(path, stream))
+
+    async def stop_after_first_token():
+        events = agent.stream_request("안녕", [])
+        first = await events.__anext__()
+        await events.aclose()
+        return first
+
+    first = asyncio.run(stop_after_first_token())
+    assert first == {"event": "token", "data": {"text": "안녕"}}
+    assert stream.closed
@@ -1,11 +1,12 @@
 import logging
 import os
 import json
-import asyncio
 import aiohttp
-from openai import OpenAI
 from utils.exceptions import APIException
 from utils.config import get_api_key
+from utils.http_client import get_session
+from utils.llm_clients import openai_clients
+from utils.rate_limit import get_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -45,11 +46,14 @@ async def _generate_with_gemini(prompt):
         "parameters": {"sampleCount": 1}
     }
 
+    async def attempt():
+        session = get_session()
+        async with session.post(f"{url}?key={api_key}", headers=headers, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{url}?key={api_key}", headers=headers, json=payload) as response:
-                response.raise_for_status()
-                return await response.json()
+        return await get_limiter("imagen").call(attempt)
     except aiohttp.ClientError as e:
         logger.error(f"Imagen-3.0 API 호출 중 오류 발생: {e}")
         raise APIException(f"이미지 생성에 실패했습니다: {str(e)}", 500)
@@ -57,27 +61,21 @@ async def _generate_with_gemini(prompt):
 
 async def _generate_with_dalle(prompt):
     """
-    OpenAI DALL-E 3를 사용하여 이미지를 비동기적으로 생성합니다.
+    OpenAI DALL-E 3를 사용하여 이미지를 비동기적으로 생성합니다. (공유 AsyncOpenAI 클라이언트 사용)
     """
     api_key = get_api_key("OPENAI_API_KEY")
     if not api_key:
         raise APIException("OpenAI API 키가 설정되지 않았습니다.", 500)
 
     try:
-        client = OpenAI(api_key=api_key)
-        # run_in_executor를 사용하여 동기식 OpenAI 호출을 비동기적으로 만듦
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1024",
-                quality="standard",
-                n=1,
-                response_format="b64_json" # Base64 JSON 형식 요청
-            )
-        )
+        response = await openai_clients.limiter.call(lambda: openai_clients.get().images.generate(
+            model="dall-e-3",
+            prompt=prompt,
+            size="1024x1024",
+            quality="standard",
+            n=1,
+            response_format="b64_json" # Base64 JSON 형식 요청
+        ))
         
         # DALL-E 응답을 Imagen-3.0과 유사한 형식으로 변환하여 반환
         if response.data:
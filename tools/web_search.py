@@ -4,14 +4,32 @@ import os
 import aiohttp
 import asyncio
 
+from utils.cache import LRUCache, SingleFlight
 from utils.exceptions import APIException
 from utils.config import get_api_key
+from utils.http_client import get_session
+from utils.rate_limit import get_limiter
 
 logger = logging.getLogger(__name__)
 
+# 2026-10-17 KST: 검색 결과 캐시와 동일 질의 합치기(single-flight)
+# 워크숍처럼 여러 컨설턴트가 같은 정책/시장 질의를 반복하는 경우 Tavily 호출을 재사용합니다.
+# WEB_SEARCH_CACHE_TTL(초, 기본 600, 0이면 캐시 끔), WEB_SEARCH_CACHE_SIZE(기본 512)
+SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "600"))
+search_cache = LRUCache(max_entries=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "512")), ttl=SEARCH_CACHE_TTL or None)
+search_flight = SingleFlight()
+
+
+def normalize_query(query):
+    """대소문자와 공백 차이만 있는 질의를 같은 캐시 키로 취급합니다."""
+    return " ".join(str(query).split()).casefold()
+
+
 async def web_search_tool(query):
     """
     Tavily API를 사용하여 비동기 웹 검색을 수행하고, 결과를 JSON 형식으로 반환합니다.
+
+    같은 질의의 결과가 캐시에 있으면 재사용하고, 같은 질의가 이미 진행 중이면 그 결과를 함께 받습니다.
     
     Args:
         query (str): 검색할 질의어.
@@ -19,6 +37,41 @@ async def web_search_tool(query):
     Returns:
         dict: 검색 결과를 포함하는 딕셔너리.
     """
+    key = normalize_query(query)
+    if SEARCH_CACHE_TTL > 0:
+        cached = search_cache.get(key)
+        if cached is not None:
+            logger.info(f"Web search cache hit: query='{query}'")
+            return cached
+
+    async def search_once():
+        results = await _search_tavily(query)
+        if SEARCH_CACHE_TTL > 0:
+            search_cache.set(key, results)
+        return results
+
+    results, shared = await search_flight.do(key, search_once)
+    if shared:
+        logger.info(f"Web search joined an in-flight request: query='{query}'")
+    return results
+
+
+def web_search_stats():
+    """검색 캐시 적중률, 합쳐진 호출 수, 실제 Tavily 호출 수와 절약한 호출 수를 반환합니다."""
+    cache = search_cache.stats()
+    flight = search_flight.stats()
+    return {
+        "ttl": SEARCH_CACHE_TTL,
+        "cache": cache,
+        "in_flight": flight["in_flight"],
+        "coalesced": flight["coalesced"],
+        "upstream_calls": flight["executions"],
+        "saved_calls": cache["hits"] + flight["coalesced"],
+    }
+
+
+async def _search_tavily(query):
+    """Tavily 검색 API를 호출합니다."""
     tavily_api_key = get_api_key("TAVILY_API_KEY")
     if not tavily_api_key:
         logger.error("TAVILY_API_KEY 환경 변수가 설정되지 않았습니다.")
@@ -37,13 +90,17 @@ async def web_search_tool(query):
 
     logger.info(f"Tavily API 호출 시작: query='{query}'")
 
+    async def attempt():
+        session = get_session()
+        async with session.post(url, headers=headers, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                response.raise_for_status()
-                search_results = await response.json()
-                logger.info("Tavily API 호출 성공.")
-                return search_results
+        # Tavily 공유 리미터: 속도/동시 호출 제한, 429·5xx 재시도(Retry-After 반영)
+        search_results = await get_limiter("tavily").call(attempt)
+        logger.info("Tavily API 호출 성공.")
+        return search_results
     except aiohttp.ClientError as e:
         logger.error(f"Tavily API 호출 중 클라이언트 오류 발생: {e}")
         raise APIException(f"웹 검색 API 호출에 실패했습니다: {str(e)}", 500)
@@ -1,21 +1,30 @@
 import asyncio
 import aiohttp
+import json
 import logging
 from utils.exceptions import APIException
+from utils.http_client import get_session
+from utils.rate_limit import get_limiter
 
 logger = logging.getLogger(__name__)
 
-async def fetch_with_exponential_backoff(url, payload, retries=5, delay=1.0):
+async def fetch_with_exponential_backoff(url, payload, retries=5, delay=1.0, session=None, headers=None, provider=None):
     """
-    지수 백오프를 사용하여 비동기 HTTP POST 요청을 수행합니다.
+    공급자 리미터와 지수 백오프를 사용하여 비동기 HTTP POST 요청을 수행합니다.
 
-    API 호출이 실패할 경우, 지정된 횟수만큼 재시도하며 지수적으로 대기 시간을 늘립니다.
+    호출은 공급자별 공유 리미터(utils.rate_limit.get_limiter)의 속도/동시 호출 제한을 통과한 뒤 실행됩니다.
+    429, 5xx, 네트워크 오류는 지터를 넣은 지수 백오프로 재시도하며(Retry-After 헤더가 있으면 따름),
+    요청 단위 재시도 예산을 소진하면 더 이상 재시도하지 않습니다. 그 밖의 4xx 오류는 바로 실패합니다.
+    session을 지정하지 않으면 공유 HTTP 세션(utils.http_client)을 사용하므로 커넥션이 재사용됩니다.
 
     Args:
         url (str): API 엔드포인트 URL.
         payload (dict): 요청 바디에 포함될 데이터.
-        retries (int): 재시도 최대 횟수.
-        delay (float): 초기 대기 시간 (초).
+        retries (int): 최대 시도 횟수 (첫 시도 포함).
+        delay (float): 백오프 기본 대기 시간 (초).
+        session (aiohttp.ClientSession | None): 사용할 세션. None이면 공유 세션을 사용합니다.
+        headers (dict | None): 추가 요청 헤더 (예: Authorization).
+        provider (str | None): 공급자 이름 (gemini, tavily, imagen 등). None이면 기본 리미터를 사용합니다.
 
     Returns:
         dict: 성공적인 API 응답의 JSON 데이터.
@@ -24,32 +33,76 @@ async def fetch_with_exponential_backoff(url, payload, retries=5, delay=1.0):
         APIException: 재시도 횟수를 모두 소진하거나 치명적인 오류가 발생한 경우.
     """
     safe_url = url.split("?")[0] # API 키 등 민감 정보를 제외
-    
-    for i in range(retries):
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    # HTTP 상태 코드가 4xx 또는 5xx일 경우 예외 발생
-                    response.raise_for_status()
-                    return await response.json()
-        
-        except aiohttp.ClientResponseError as e:
-            if 400 <= e.status < 500:
-                # 4xx 클라이언트 오류는 재시도하지 않고 바로 예외 발생
-                logger.error(f"Client error ({e.status}) from {safe_url}. Not retrying.")
-                raise APIException(f"API 요청에 실패했습니다: {e.message}", e.status)
-            else:
-                # 5xx 서버 오류는 재시도
-                logger.warning(f"Server error ({e.status}) from {safe_url}. Retrying ({i+1}/{retries}).")
-        
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.warning(f"Network error or timeout on {safe_url}. Retrying ({i+1}/{retries}). Error: {e}")
-        
-        if i < retries - 1:
-            wait_time = delay * (2 ** i)
-            logger.info(f"Waiting for {wait_time:.2f} seconds before next retry.")
-            await asyncio.sleep(wait_time)
-    
+    limiter = get_limiter(provider)
+
+    async def attempt():
+        client_session = session or get_session()
+        async with client_session.post(url, json=payload, headers=headers) as response:
+            # HTTP 상태 코드가 4xx 또는 5xx일 경우 예외 발생 (Retry-After 등 헤더 포함)
+            response.raise_for_status()
+            return await response.json()
+
+    try:
+        return await limiter.call(attempt, retries=retries - 1, base_delay=delay)
+    except aiohttp.ClientResponseError as e:
+        if e.status == 429:
+            logger.error(f"Rate limited (429) by {safe_url}. Giving up.")
+            raise APIException("API 요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요.", 429)
+        if 400 <= e.status < 500:
+            logger.error(f"Client error ({e.status}) from {safe_url}. Not retrying.")
+            raise APIException(f"API 요청에 실패했습니다: {e.message}", e.status)
+        logger.error(f"Server error ({e.status}) from {safe_url}. Giving up.")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Network error or timeout on {safe_url}. Giving up. Error: {e}")
+
     # 모든 재시도 실패
-    logger.error(f"Failed to fetch from {safe_url} after {retries} attempts.")
     raise APIException("API 호출에 지속적으로 실패했습니다. 잠시 후 다시 시도해주세요.", 500)
+
+
+async def stream_sse_json(url, payload, provider=None):
+    """
+    Server-Sent Events 형식으로 응답하는 API(예: Gemini streamGenerateContent?alt=sse)를
+    호출하고, 각 `data:` 이벤트를 JSON으로 파싱하여 순서대로 반환하는 비동기 제너레이터입니다.
+
+    스트림이 끝날 때까지 공급자 리미터의 호출 슬롯을 보유합니다. 응답을 받기 전의 일시적 오류(429, 5xx 등)는
+    재시도하지만, 스트리밍이 시작된 뒤에는 이미 전달된 토큰을 되돌릴 수 없으므로 재시도하지 않습니다.
+
+    Args:
+        url (str): API 엔드포인트 URL.
+        payload (dict): 요청 바디에 포함될 데이터.
+        provider (str | None): 공급자 이름. None이면 기본 리미터를 사용합니다.
+
+    Yields:
+        dict: 이벤트 단위로 파싱된 JSON 데이터.
+
+    Raises:
+        APIException: 연결 또는 응답 처리 중 오류가 발생한 경우.
+    """
+    safe_url = url.split("?")[0]
+    limiter = get_limiter(provider)
+
+    async def open_stream():
+        response = await get_session().post(url, json=payload)
+        response.raise_for_status()
+        return response
+
+    try:
+        async with limiter.slot():
+            response = await limiter.call(open_stream, acquire=False)
+            try:
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if not data or data == "[DONE]":
+                        continue
+                    yield json.loads(data)
+            finally:
+                response.release()
+    except aiohttp.ClientResponseError as e:
+        logger.error(f"Streaming error ({e.status}) from {safe_url}.")
+        raise APIException(f"API 스트리밍 요청에 실패했습니다: {e.message}", e.status)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Network error or timeout while streaming from {safe_url}. Error: {e}")
+        raise APIException("API 스트리밍 중 네트워크 오류가 발생했습니다.", 502)
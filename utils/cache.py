@@ -0,0 +1,159 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    스레드 안전한 LRU 캐시.
+
+    항목 수(max_entries)와 선택적으로 전체 크기(max_bytes, sizeof로 계산)를 기준으로
+    가장 오래 사용되지 않은 항목부터 제거합니다. ttl(초)을 지정하면 만료된 항목은
+    조회 시 miss로 처리됩니다. hit/miss/eviction 횟수를 집계합니다.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=None, ttl=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """키에 해당하는 값을 반환하고 최근 사용으로 표시합니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """값을 저장하고, 한도를 넘으면 오래된 항목부터 제거합니다."""
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self.total_bytes += size
+            while self._data and (len(self._data) > self.max_entries or
+                                  (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """키를 제거하고 값을 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self.total_bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """캐시 상태와 적중률을 딕셔너리로 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class _LeaderCancelled(Exception):
+    """대표 호출이 취소되어 결과가 없음을 기다리던 호출에 알립니다."""
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 비동기 호출을 하나로 합칩니다. (single-flight)
+
+    처음 호출한 쪽(대표)만 실제로 실행하고, 실행 중에 같은 키로 들어온 호출은 대표의 결과나 예외를 그대로 받습니다.
+    결과는 concurrent.futures.Future로 전달하므로 요청마다 이벤트 루프가 다른 Flask 환경에서도 합쳐집니다.
+    기다리던 호출이 취소되어도 대표 호출은 계속되며, 대표 호출이 취소되면 기다리던 호출 중 하나가 새 대표가 됩니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, make_call):
+        """
+        make_call() 코루틴을 키당 한 번만 실행합니다.
+
+        Returns:
+            tuple: (결과, 다른 호출의 결과를 공유했는지 여부)
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._calls[key] = future
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+
+            if not leader:
+                try:
+                    # shield: 기다리던 호출이 취소되어도 공유 Future는 취소하지 않음
+                    return await asyncio.shield(asyncio.wrap_future(future)), True
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = await make_call()
+            except BaseException as e:
+                with self._lock:
+                    self._calls.pop(key, None)
+                future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+                raise
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_result(result)
+            return result, False
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
@@ -0,0 +1,147 @@
+# utils/circuit_breaker.py
+# 2026-10-17 KST: 공급자별 서킷 브레이커와 응답 지연 추적기
+#   - AgentRouter가 오류율이 높은 공급자를 일정 시간 우회하고(failover),
+#     지연 백분위수를 기준으로 헤지 요청(hedged request)을 보낼 시점을 정하는 데 사용합니다.
+#   - 요청마다 이벤트 루프가 다른 Flask 환경에서도 공유되도록 스레드 락으로 상태를 보호합니다.
+
+import collections
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    최근 호출 결과로 오류율을 계산하여 공급자를 차단하는 서킷 브레이커.
+
+    최근 window개 호출 중 min_requests개 이상이 기록되고 실패 비율이 failure_threshold 이상이면
+    열림(open) 상태가 되어 cooldown초 동안 호출을 거부합니다. 이후 반열림(half_open) 상태에서
+    시험 호출 하나만 허용하고, 성공하면 닫힘(closed)으로, 실패하면 다시 열림으로 전환합니다.
+    """
+
+    def __init__(self, name, failure_threshold=0.5, window=20, min_requests=5, cooldown=30.0):
+        self.name = name
+        self.failure_threshold = float(failure_threshold)
+        self.min_requests = int(min_requests)
+        self.cooldown = float(cooldown)
+        self._results = collections.deque(maxlen=int(window))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def available(self):
+        """호출을 허용할 수 있는 상태인지 확인합니다. (시험 호출 슬롯을 차지하지 않음)"""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._probe_in_flight)
+
+    def allow_request(self):
+        """호출을 시작해도 되는지 판단합니다. 반열림 상태에서는 시험 호출 하나만 허용합니다."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._counters["successes"] += 1
+            if self._state == HALF_OPEN:
+                logger.info(f"Circuit '{self.name}' closed after a successful probe.")
+                self._state = CLOSED
+                self._results.clear()
+            self._probe_in_flight = False
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._counters["failures"] += 1
+            self._probe_in_flight = False
+            self._results.append(False)
+            state = self._current_state()
+            failures = self._results.count(False)
+            if state == HALF_OPEN or (
+                state == CLOSED
+                and len(self._results) >= self.min_requests
+                and failures / len(self._results) >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._counters["opened"] += 1
+                logger.warning(
+                    f"Circuit '{self.name}' opened ({failures}/{len(self._results)} recent calls failed). "
+                    f"Routing around it for {self.cooldown:.0f}s."
+                )
+
+    def record_cancel(self):
+        """결과를 판단할 수 없는 호출(취소, 사용자 입력 오류)을 마칩니다. 시험 호출 슬롯만 반환합니다."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            failures = self._results.count(False)
+            return {
+                "state": state,
+                "recent_calls": len(self._results),
+                "recent_failure_rate": round(failures / len(self._results), 3) if self._results else 0.0,
+                "retry_in": round(max(0.0, self._opened_at + self.cooldown - time.monotonic()), 2) if state == OPEN else 0.0,
+                **self._counters,
+            }
+
+
+class LatencyTracker:
+    """최근 응답 시간(초)을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self, size=200):
+        self._samples = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q):
+        """q(0~1) 백분위수를 반환합니다. 기록이 없으면 None."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[index]
+
+    def stats(self):
+        return {
+            "samples": len(self),
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+        }
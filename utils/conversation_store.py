@@ -0,0 +1,295 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def make_turn(role, text):
+    """대화 한 턴을 클라이언트 chat_history와 같은 형식({"role", "parts": [{"text"}]})으로 만듭니다."""
+    return {"role": role, "parts": [{"text": text}]}
+
+
+class Conversation:
+    """
+    서버에 보관하는 하나의 대화.
+
+    턴 목록과 함께 공급자 형식으로 변환한 메시지 목록을 형식별로 캐시합니다. 턴은 뒤에만
+    추가되므로 새 턴만 변환하여 캐시를 이어 붙이며, 대화가 길어져도 요청마다 전체 기록을
+    다시 변환하지 않습니다. 턴별 계산값(토큰 추정치 등)과 이전 대화 요약(agents.context_window)도 함께 보관합니다.
+    """
+
+    def __init__(self, conversation_id, turns=None):
+        self.id = conversation_id
+        self.turns = list(turns or [])
+        self._formatted = {}
+        self._derived = {}
+        # (요약에 포함된 앞쪽 턴 수, 요약 텍스트). 워커 메모리에만 보관합니다.
+        self.summary = None
+        self.summarizing = False
+        self._lock = threading.Lock()
+
+    def extend(self, turns):
+        with self._lock:
+            self.turns.extend(turns)
+
+    def history(self):
+        """현재까지의 턴을 담은 ConversationHistory 스냅샷을 반환합니다."""
+        with self._lock:
+            return ConversationHistory(self, self.turns)
+
+    def formatted(self, format_name, format_turn, length, start=0):
+        """start번째부터 length번째 전까지의 턴을 format_turn으로 변환한 메시지 목록(사본)을 반환합니다."""
+        with self._lock:
+            cached = self._formatted.setdefault(format_name, [])
+            for turn in self.turns[len(cached):length]:
+                cached.append(format_turn(turn))
+            return cached[start:length]
+
+    def derived(self, name, compute, length, start=0):
+        """턴마다 compute(turn)로 계산한 값(토큰 추정치, 첨부 파일 등)을 캐시하여 start~length 구간을 반환합니다."""
+        with self._lock:
+            cached = self._derived.setdefault(name, [])
+            for turn in self.turns[len(cached):length]:
+                cached.append(compute(turn))
+            return cached[start:length]
+
+
+class ConversationHistory(list):
+    """
+    에이전트에 chat_history로 전달하는 대화 기록.
+
+    일반 list처럼 턴을 담고 있으며, formatted()로 대화에 캐시된 공급자 형식 메시지를 가져올 수 있습니다.
+    (agents.base_agent.BaseAgent.format_history 참고)
+    window()로 만든 기록은 앞에 prefix 턴(요약 등)을 붙이고 대화의 start번째 턴부터 담습니다.
+    """
+
+    def __init__(self, conversation, turns, start=0, prefix=()):
+        super().__init__(list(prefix) + list(turns))
+        self.conversation = conversation
+        self.start = start
+        self.prefix = list(prefix)
+
+    @property
+    def end(self):
+        """이 기록에 포함된 마지막 대화 턴의 다음 위치."""
+        return self.start + len(self) - len(self.prefix)
+
+    def formatted(self, format_name, format_turn):
+        return [format_turn(turn) for turn in self.prefix] + \
+            self.conversation.formatted(format_name, format_turn, self.end, self.start)
+
+    def derived(self, name, compute):
+        """턴별 계산값 목록을 반환합니다. 대화에 캐시된 값은 다시 계산하지 않습니다."""
+        return [compute(turn) for turn in self.prefix] + \
+            self.conversation.derived(name, compute, self.end, self.start)
+
+    def window(self, start, prefix):
+        """start번째 턴부터의 최근 기록 앞에 prefix 턴을 붙인 새 기록을 반환합니다."""
+        offset = len(self.prefix)
+        return ConversationHistory(self.conversation, self[offset + start:], self.start + start, prefix)
+
+
+class MemoryConversationBackend:
+    """프로세스 메모리(LRU + TTL)에 대화를 보관하는 저장소. 마지막 사용 후 ttl초가 지나면 만료됩니다."""
+
+    def __init__(self, max_conversations=1000, ttl=86400):
+        self._cache = LRUCache(max_entries=max_conversations, ttl=ttl)
+
+    def create(self, conversation_id):
+        conversation = Conversation(conversation_id)
+        self._cache.set(conversation_id, conversation)
+        return conversation
+
+    def load(self, conversation_id):
+        return self._cache.get(conversation_id)
+
+    def append(self, conversation, turns):
+        conversation.extend(turns)
+        # 만료 시각을 갱신합니다.
+        self._cache.set(conversation.id, conversation)
+
+    def delete(self, conversation_id):
+        return self._cache.pop(conversation_id) is not None
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class SQLiteConversationBackend:
+    """
+    로컬 SQLite 파일에 대화를 보관하는 저장소.
+
+    여러 워커 프로세스가 같은 파일을 공유할 수 있고 재시작 후에도 대화가 유지됩니다.
+    워커마다 최근 대화를 메모리에 두고, 조회 시 다른 워커가 추가한 턴만 읽어 이어 붙입니다.
+    마지막 사용 후 ttl초가 지나면 만료되며, max_conversations를 넘으면 오래된 대화부터 삭제합니다.
+    """
+
+    def __init__(self, path, max_conversations=10000, ttl=86400, local_cache_size=256):
+        self.path = path
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self._local = LRUCache(max_entries=local_cache_size)
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_turns ("
+            " conversation_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, text TEXT NOT NULL,"
+            " PRIMARY KEY (conversation_id, seq))"
+        )
+        self._conn.commit()
+
+    def create(self, conversation_id):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations (id, updated_at) VALUES (?, ?)", (conversation_id, time.time())
+            )
+            self._conn.commit()
+        conversation = Conversation(conversation_id)
+        self._local.set(conversation_id, conversation)
+        return conversation
+
+    def load(self, conversation_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at FROM conversations WHERE id = ? AND updated_at > ?",
+                (conversation_id, time.time() - self.ttl),
+            ).fetchone()
+            if row is None:
+                self._local.pop(conversation_id)
+                return None
+            conversation = self._local.get(conversation_id)
+            if conversation is None:
+                conversation = Conversation(conversation_id)
+                self._local.set(conversation_id, conversation)
+            rows = self._conn.execute(
+                "SELECT role, text FROM conversation_turns WHERE conversation_id = ? AND seq >= ? ORDER BY seq",
+                (conversation_id, len(conversation.turns)),
+            ).fetchall()
+        if rows:
+            conversation.extend([make_turn(role, text) for role, text in rows])
+        return conversation
+
+    def append(self, conversation, turns):
+        now = time.time()
+        with self._lock:
+            start = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM conversation_turns WHERE conversation_id = ?",
+                (conversation.id,),
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO conversation_turns (conversation_id, seq, role, text) VALUES (?, ?, ?, ?)",
+                [(conversation.id, start + i, turn["role"], turn["parts"][0]["text"]) for i, turn in enumerate(turns)],
+            )
+            self._conn.execute("UPDATE conversations SET updated_at = ? WHERE id = ?", (now, conversation.id))
+            self._prune(now)
+            self._conn.commit()
+            # 다른 워커가 그 사이 추가한 턴이 없을 때만 메모리 사본에 바로 반영합니다. (그 외에는 다음 load에서 읽음)
+            if start == len(conversation.turns):
+                conversation.extend(turns)
+
+    def _prune(self, now):
+        expired = "SELECT id FROM conversations WHERE updated_at <= ?"
+        self._conn.execute(f"DELETE FROM conversation_turns WHERE conversation_id IN ({expired})", (now - self.ttl,))
+        self._conn.execute("DELETE FROM conversations WHERE updated_at <= ?", (now - self.ttl,))
+        overflow = "SELECT id FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?"
+        self._conn.execute(f"DELETE FROM conversation_turns WHERE conversation_id IN ({overflow})", (self.max_conversations,))
+        self._conn.execute(f"DELETE FROM conversations WHERE id IN ({overflow})", (self.max_conversations,))
+
+    def delete(self, conversation_id):
+        self._local.pop(conversation_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM conversation_turns WHERE conversation_id = ?", (conversation_id,))
+            deleted = self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,)).rowcount
+            self._conn.commit()
+        return deleted > 0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+
+class ConversationStore:
+    """
+    대화 ID로 대화 기록을 서버에 보관하는 저장소.
+
+    클라이언트는 매 요청마다 전체 chat_history를 보내는 대신 conversation_id와 새 프롬프트만 보내고,
+    서버는 요청이 끝나면 사용자/모델 턴을 이어 붙입니다. 저장소는 MemoryConversationBackend 또는
+    SQLiteConversationBackend 중에서 선택합니다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.created = 0
+        self.appended_turns = 0
+
+    def create(self):
+        """새 대화를 만들고 ID를 반환합니다."""
+        conversation_id = uuid.uuid4().hex
+        self.backend.create(conversation_id)
+        self.created += 1
+        return conversation_id
+
+    def get_history(self, conversation_id):
+        """대화 기록(ConversationHistory)을 반환합니다. 없거나 만료되었으면 None."""
+        conversation = self.backend.load(conversation_id)
+        return conversation.history() if conversation is not None else None
+
+    def append_exchange(self, conversation_id, user_text, model_text):
+        """사용자 프롬프트와 모델 답변을 한 쌍의 턴으로 추가합니다."""
+        conversation = self.backend.load(conversation_id)
+        if conversation is None:
+            logger.warning(f"Conversation '{conversation_id}' expired before the turn could be saved.")
+            return False
+        self.backend.append(conversation, [make_turn("user", user_text), make_turn("model", model_text)])
+        self.appended_turns += 2
+        return True
+
+    def delete(self, conversation_id):
+        return self.backend.delete(conversation_id)
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "conversations": len(self.backend),
+            "created": self.created,
+            "appended_turns": self.appended_turns,
+        }
+
+
+def create_conversation_store_from_env():
+    """
+    환경 변수로 대화 저장소를 구성합니다. 사용하지 않으면 None을 반환합니다.
+
+    - CONVERSATION_STORE_BACKEND: memory(기본) | sqlite | off
+    - CONVERSATION_TTL: 마지막 사용 후 만료 시간(초, 기본 86400)
+    - CONVERSATION_MAX: 최대 대화 수 (기본 1000)
+    - CONVERSATION_STORE_PATH: sqlite 파일 경로 (기본 <프로젝트>/cache/conversations.db)
+    """
+    backend_name = os.getenv("CONVERSATION_STORE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("CONVERSATION_TTL", "86400"))
+    max_conversations = int(os.getenv("CONVERSATION_MAX", "1000"))
+
+    if backend_name == "memory":
+        backend = MemoryConversationBackend(max_conversations=max_conversations, ttl=ttl)
+    elif backend_name == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "conversations.db")
+        path = os.getenv("CONVERSATION_STORE_PATH", default_path)
+        backend = SQLiteConversationBackend(path, max_conversations=max_conversations, ttl=ttl)
+    else:
+        return None
+
+    logger.info(f"Conversation store enabled (backend={backend_name}, ttl={ttl}s, max={max_conversations})")
+    return ConversationStore(backend)
@@ -0,0 +1,491 @@
+"""
+참고자료 의미 검색용 임베딩 인덱스.
+
+참고자료 섹션(utils.reference_index)을 임베딩하여 int8(행별 스케일) 또는 float16으로 양자화한 NumPy 배열을
+파일에 이어 붙여 저장하고, 검색 시 np.memmap으로 읽습니다. 벡터 파일은 읽기 전용으로 매핑되므로
+여러 Flask/gunicorn 워커가 같은 페이지 캐시를 공유하고, 인덱스를 여는 데 시간이 거의 걸리지 않습니다.
+
+행 메타데이터(문서, 섹션 위치, 삭제 여부)와 행 수는 같은 폴더의 SQLite 파일(meta.db)에 둡니다.
+추가는 SQLite 쓰기 잠금(BEGIN IMMEDIATE) 안에서 하므로 여러 프로세스가 동시에 추가해도 안전하며,
+읽는 쪽은 커밋된 행 수만큼만 매핑합니다. 바뀐 문서의 이전 행은 삭제 표시만 하고, 삭제된 행이 많아지면
+새 세대(generation) 파일로 압축합니다.
+
+명령줄에서 동기화하거나 검색할 수 있습니다:
+    python -m utils.embedding_index [--compact] [--query 검색어]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from utils.reference_index import create_reference_index_from_env, make_snippet, to_index_text
+
+logger = logging.getLogger(__name__)
+
+DTYPES = {"int8": np.int8, "float16": np.float16}
+# 검색 시 한 번에 float32로 변환하여 계산하는 행 수. 변환 버퍼(BLOCK_ROWS * dim * 4 bytes)가
+# CPU 캐시에 머무는 크기일 때 가장 빠릅니다. (benchmarks/bench_embedding_index.py)
+BLOCK_ROWS = 4096
+# 삭제 표시된 행 비율이 이 값을 넘으면 동기화 후 압축합니다.
+COMPACT_RATIO = 0.3
+
+
+class HashingEmbedder:
+    """
+    외부 모델 없이 동작하는 로컬 임베딩. 색인 토큰(한글 bigram, 영문 단어)을 부호 있는 특성 해싱으로
+    dim차원 벡터에 누적하고(1 + log(tf) 가중치) L2 정규화합니다. 해시는 crc32이므로 프로세스가 달라도 같은 벡터가 나옵니다.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        # 인스턴스별 캐시 (메서드에 lru_cache를 붙이면 클래스 캐시가 self를 붙잡아 인스턴스가 해제되지 않음)
+        self._feature = functools.lru_cache(maxsize=65536)(self._feature_uncached)
+
+    def _feature_uncached(self, token):
+        h = zlib.crc32(token.encode("utf-8"))
+        return h % self.dim, 1.0 if (h >> 31) & 1 else -1.0
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for token in to_index_text(text).split():
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                index, sign = self._feature(token)
+                vectors[row, index] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 로컬 모델 임베딩. 패키지는 이 임베더를 사용할 때만 불러옵니다."""
+
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                f"EMBEDDING_MODEL={model_name}을(를) 사용하려면 sentence-transformers 패키지가 필요합니다."
+            ) from e
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts):
+        return np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def create_embedder_from_env():
+    """EMBEDDING_MODEL=hashing(기본)이면 HashingEmbedder(EMBEDDING_DIM, 기본 384), 그 외에는 sentence-transformers 모델 이름으로 봅니다."""
+    model = os.getenv("EMBEDDING_MODEL", "hashing")
+    if model == "hashing":
+        return HashingEmbedder(int(os.getenv("EMBEDDING_DIM", "384")))
+    return SentenceTransformerEmbedder(model)
+
+
+def quantize(vectors, dtype):
+    """
+    정규화된 float32 벡터를 저장 형식으로 변환합니다. (양자화 벡터, 행별 스케일 또는 None)
+
+    int8은 행마다 최대 절댓값이 127이 되도록 스케일을 정하므로 코사인 유사도 = scale * (q · v_int8) 입니다.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+class EmbeddingStore:
+    """
+    양자화된 벡터를 이어 붙여 저장하는 메모리 매핑 벡터 저장소.
+
+    파일: vectors-<세대>.<dtype>(행 우선 원시 배열), scales-<세대>.f32(int8 행별 스케일), meta.db(행 메타데이터).
+    """
+
+    def __init__(self, directory, dim, dtype="int8", embedder_name=""):
+        if dtype not in DTYPES:
+            raise ValueError(f"지원하지 않는 임베딩 저장 형식입니다: {dtype} (int8 | float16)")
+        self.directory = directory
+        self.dim = dim
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._view = None
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "meta.db"), check_same_thread=False, timeout=10.0,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS store_rows ("
+            " row_id INTEGER PRIMARY KEY, doc_id TEXT NOT NULL, position INTEGER NOT NULL,"
+            " signature TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS store_rows_doc ON store_rows (doc_id);"
+        )
+        layout = {"dim": str(dim), "dtype": dtype, "embedder": embedder_name}
+        with self._write():
+            info = self._info()
+            if info and any(info.get(key) != value for key, value in layout.items()):
+                # 차원, 저장 형식, 임베딩 모델이 바뀌면 기존 벡터를 쓸 수 없으므로 비웁니다.
+                logger.warning(f"Embedding store layout changed ({info} -> {layout}). Rebuilding {directory}.")
+                self._conn.execute("DELETE FROM store_rows")
+                info = {}
+            if not info:
+                generation = int(self._info().get("generation", "0")) + 1
+                self._set_info(generation=generation, rows=0, deletions=0, **layout)
+                self._remove_stale_files(generation)
+
+    # --- 메타데이터 ---
+    class _Transaction:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+    def _write(self):
+        """프로세스 간 쓰기 잠금을 잡는 트랜잭션. 같은 프로세스의 스레드는 self._lock으로 직렬화합니다."""
+        return self._Transaction(self._conn)
+
+    def _info(self):
+        return dict(self._conn.execute("SELECT key, value FROM store_info").fetchall())
+
+    def _set_info(self, **values):
+        self._conn.executemany(
+            "INSERT INTO store_info (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, str(value)) for key, value in values.items()],
+        )
+
+    def _paths(self, generation):
+        return (os.path.join(self.directory, f"vectors-{generation}.{self.dtype}"),
+                os.path.join(self.directory, f"scales-{generation}.f32"))
+
+    def _remove_stale_files(self, generation):
+        keep = {os.path.basename(path) for path in self._paths(generation)}
+        for name in os.listdir(self.directory):
+            if name.startswith(("vectors-", "scales-")) and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    # 다른 프로세스가 아직 매핑하고 있는 경우(Windows) 다음 압축 때 다시 지웁니다.
+                    pass
+
+    # --- 쓰기 ---
+    def append(self, vectors, rows):
+        """
+        정규화된 벡터와 행 메타데이터 [(doc_id, position, signature)]를 이어 붙입니다.
+
+        벡터를 파일에 쓰고 fsync한 뒤 행 수를 커밋하므로, 커밋된 행은 항상 파일에 존재합니다.
+        """
+        if len(rows) == 0:
+            return
+        quantized, scales = quantize(vectors, self.dtype)
+        with self._lock, self._write():
+            info = self._info()
+            start = int(info["rows"])
+            vector_path, scale_path = self._paths(info["generation"])
+            self._write_at(vector_path, start * self.dim * quantized.itemsize, quantized)
+            if scales is not None:
+                self._write_at(scale_path, start * 4, scales)
+            self._conn.executemany(
+                "INSERT INTO store_rows (row_id, doc_id, position, signature) VALUES (?, ?, ?, ?)",
+                [(start + offset, doc_id, position, signature) for offset, (doc_id, position, signature) in enumerate(rows)],
+            )
+            self._set_info(rows=start + len(rows))
+
+    @staticmethod
+    def _write_at(path, offset, array):
+        # 이전에 중단된 추가가 남긴 꼬리 데이터가 있으면 덮어씁니다.
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.seek(offset)
+            f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+    def delete_doc(self, doc_id):
+        """문서의 행에 삭제 표시를 합니다. 검색에서 제외되며 압축할 때 제거됩니다."""
+        with self._lock, self._write():
+            deleted = self._conn.execute(
+                "UPDATE store_rows SET deleted = 1 WHERE doc_id = ? AND deleted = 0", (doc_id,)
+            ).rowcount
+            if deleted:
+                self._set_info(deletions=int(self._info()["deletions"]) + 1)
+        return deleted
+
+    def compact(self):
+        """삭제 표시된 행을 뺀 새 세대 파일을 만들고 행 번호를 다시 매깁니다."""
+        with self._lock, self._write():
+            info = self._info()
+            generation = int(info["generation"])
+            live = self._conn.execute(
+                "SELECT row_id, doc_id, position, signature FROM store_rows WHERE deleted = 0 ORDER BY row_id"
+            ).fetchall()
+            keep = np.array([row[0] for row in live], dtype=np.int64)
+            old_vectors, old_scales = self._open_arrays(generation, int(info["rows"]))
+            new_vector_path, new_scale_path = self._paths(generation + 1)
+            self._write_at(new_vector_path, 0, old_vectors[keep] if len(keep) else old_vectors[:0])
+            if old_scales is not None:
+                self._write_at(new_scale_path, 0, old_scales[keep] if len(keep) else old_scales[:0])
+            del old_vectors, old_scales
+            self._conn.execute("DELETE FROM store_rows")
+            self._conn.executemany(
+                "INSERT INTO store_rows (row_id, doc_id, position, signature) VALUES (?, ?, ?, ?)",
+                [(row_id, doc_id, position, signature) for row_id, (_, doc_id, position, signature) in enumerate(live)],
+            )
+            self._set_info(generation=generation + 1, rows=len(live), deletions=int(info["deletions"]) + 1)
+        self._view = None
+        self._remove_stale_files(generation + 1)
+        logger.info(f"Embedding store compacted: {int(info['rows'])} -> {len(live)} rows.")
+
+    # --- 읽기 ---
+    def _open_arrays(self, generation, rows):
+        vector_path, scale_path = self._paths(generation)
+        if rows == 0:
+            vectors = np.zeros((0, self.dim), dtype=DTYPES[self.dtype])
+            return vectors, (np.zeros(0, dtype=np.float32) if self.dtype == "int8" else None)
+        vectors = np.memmap(vector_path, dtype=DTYPES[self.dtype], mode="r", shape=(rows, self.dim))
+        scales = np.memmap(scale_path, dtype=np.float32, mode="r", shape=(rows,)) if self.dtype == "int8" else None
+        return vectors, scales
+
+    def _current_view(self):
+        """커밋된 행 수와 세대가 바뀌었을 때만 다시 매핑합니다. (vectors, scales, 삭제 마스크)"""
+        info = self._info()
+        key = (info["generation"], int(info["rows"]), info["deletions"])
+        view = self._view
+        if view is None or view[0] != key:
+            try:
+                vectors, scales = self._open_arrays(info["generation"], key[1])
+            except FileNotFoundError:
+                # 세대를 읽은 뒤 다른 프로세스의 compact()가 파일을 지웠으면 새 세대로 한 번 더 시도합니다.
+                info = self._info()
+                key = (info["generation"], int(info["rows"]), info["deletions"])
+                vectors, scales = self._open_arrays(info["generation"], key[1])
+            deleted = np.zeros(key[1], dtype=bool)
+            deleted_rows = [row[0] for row in self._conn.execute("SELECT row_id FROM store_rows WHERE deleted = 1")]
+            deleted[[row for row in deleted_rows if row < key[1]]] = True
+            view = (key, vectors, scales, deleted if deleted.any() else None)
+            self._view = view
+        return view[1:]
+
+    def search(self, queries, k=10):
+        """
+        질의 벡터(1개 또는 (m, dim) 배열)마다 코사인 유사도 상위 k개 [(row_id, score)]를 반환합니다.
+
+        저장된 벡터를 BLOCK_ROWS행씩 같은 float32 버퍼에 변환해 모든 질의의 점수를 행렬 곱 한 번으로 계산하고,
+        블록마다 argpartition으로 후보를 k개로 줄여 합칩니다. 질의를 모아 보낼수록 질의당 비용이 줄어듭니다.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            vectors, scales, deleted = self._current_view()
+        total = len(vectors)
+        if total == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        buffer = np.empty((min(BLOCK_ROWS, total), self.dim), dtype=np.float32)
+        for start in range(0, total, BLOCK_ROWS):
+            rows = vectors[start:start + BLOCK_ROWS]
+            block = buffer[:len(rows)]
+            np.copyto(block, rows, casting="unsafe")
+            scores = queries @ block.T
+            if scales is not None:
+                scores *= scales[start:start + BLOCK_ROWS]
+            if deleted is not None:
+                scores[:, deleted[start:start + BLOCK_ROWS]] = -np.inf
+            ids = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_ids = np.concatenate([best_ids, ids], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(int(row_id), float(score)) for row_id, score in zip(ids, scores) if np.isfinite(score)]
+            for ids, scores in zip(best_ids, best_scores)
+        ]
+
+    def row_keys(self, row_ids):
+        """행 번호의 (doc_id, position)을 {row_id: (doc_id, position)}로 반환합니다."""
+        if not row_ids:
+            return {}
+        placeholders = ",".join("?" * len(row_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT row_id, doc_id, position FROM store_rows WHERE row_id IN ({placeholders})", list(row_ids)
+            ).fetchall()
+        return {row_id: (doc_id, position) for row_id, doc_id, position in rows}
+
+    def signatures(self):
+        """저장된 문서의 {doc_id: signature} (삭제되지 않은 행 기준)"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT DISTINCT doc_id, signature FROM store_rows WHERE deleted = 0").fetchall())
+
+    def stats(self):
+        with self._lock:
+            info = self._info()
+            deleted = self._conn.execute("SELECT COUNT(*) FROM store_rows WHERE deleted = 1").fetchone()[0]
+        rows = int(info["rows"])
+        vector_path, scale_path = self._paths(info["generation"])
+        size = sum(os.path.getsize(path) for path in (vector_path, scale_path) if os.path.exists(path))
+        return {"rows": rows, "deleted": deleted, "dim": self.dim, "dtype": self.dtype,
+                "generation": int(info["generation"]), "bytes": size}
+
+
+class EmbeddingIndex:
+    """참고자료 인덱스의 섹션을 임베딩 저장소와 동기화하고 의미 검색 결과를 참고자료 정보와 함께 반환합니다."""
+
+    def __init__(self, reference_index, store, embedder, refresh_interval=30.0, batch_size=256):
+        self.reference_index = reference_index
+        self.store = store
+        self.embedder = embedder
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self._checked_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def sync(self):
+        """참고자료 인덱스에서 바뀐 문서의 이전 행을 삭제 표시하고 새 섹션을 임베딩하여 추가합니다."""
+        with self._sync_lock:
+            started = time.perf_counter()
+            current = self.reference_index.document_signatures()
+            stored = self.store.signatures()
+            counts = {"added": 0, "removed": 0, "rows": 0}
+            for doc_id, signature in stored.items():
+                if current.get(doc_id) != signature:
+                    self.store.delete_doc(doc_id)
+                    counts["removed"] += 1
+            for doc_id, signature in current.items():
+                if stored.get(doc_id) == signature:
+                    continue
+                sections = self.reference_index.document_sections(doc_id)
+                for start in range(0, len(sections), self.batch_size):
+                    batch = sections[start:start + self.batch_size]
+                    vectors = self.embedder.embed([f"{title}\n{text}" for _, title, text in batch])
+                    self.store.append(vectors, [(doc_id, position, signature) for position, _, _ in batch])
+                counts["added"] += 1
+                counts["rows"] += len(sections)
+            stats = self.store.stats()
+            if stats["rows"] and stats["deleted"] / stats["rows"] > COMPACT_RATIO:
+                self.store.compact()
+            self._checked_at = time.monotonic()
+        if counts["added"] or counts["removed"]:
+            logger.info(f"Embedding index synced in {(time.perf_counter() - started) * 1000:.0f}ms: {counts}")
+        return counts
+
+    def ensure_fresh(self):
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.sync()
+
+    def search(self, query, limit=20, folder=None):
+        """검색어와 의미가 가까운 섹션을 유사도순으로 반환합니다. 결과 형식은 ReferenceIndex.search와 같습니다."""
+        if folder is None:
+            return self.search_batch([query], limit)[0]
+        # 폴더 조건은 벡터 검색 뒤에 적용하므로 후보를 넉넉히 가져옵니다.
+        response = self.search_batch([query], limit * 5)[0]
+        response["results"] = [result for result in response["results"] if result["folder"] == folder][:limit]
+        return response
+
+    def search_batch(self, queries, limit=20):
+        """여러 검색어를 한 번의 행렬 곱으로 검색합니다."""
+        started = time.perf_counter()
+        self.ensure_fresh()
+        hits = self.store.search(self.embedder.embed(queries), k=limit)
+        keys = self.store.row_keys([row_id for query_hits in hits for row_id, _ in query_hits])
+        sections = self.reference_index.get_sections(set(keys.values()))
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        responses = []
+        for query, query_hits in zip(queries, hits):
+            results = []
+            for row_id, score in query_hits:
+                section = sections.get(keys.get(row_id))
+                if section is None:
+                    continue
+                result = {key: value for key, value in section.items() if key != "text"}
+                result["keywords"] = section["keywords"][:10]
+                result["snippet"] = make_snippet(section["text"] or section["title"], query)
+                result["score"] = round(score, 4)
+                results.append(result)
+            responses.append({"query": query, "results": results, "took_ms": took_ms})
+        return responses
+
+    def stats(self):
+        return {"embedder": self.embedder.name, **self.store.stats()}
+
+
+def create_embedding_index_from_env(reference_index):
+    """
+    환경 변수로 임베딩 인덱스를 구성합니다.
+
+    - EMBEDDING_MODEL: hashing(기본, 로컬 특성 해싱) | sentence-transformers 모델 이름
+    - EMBEDDING_DTYPE: int8(기본) | float16
+    - EMBEDDING_INDEX_DIR: 저장 폴더 (기본 <프로젝트>/cache/embeddings)
+    """
+    embedder = create_embedder_from_env()
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "embeddings")
+    store = EmbeddingStore(
+        os.getenv("EMBEDDING_INDEX_DIR", default_dir),
+        embedder.dim,
+        dtype=os.getenv("EMBEDDING_DTYPE", "int8"),
+        embedder_name=embedder.name,
+    )
+    return EmbeddingIndex(reference_index, store, embedder, refresh_interval=reference_index.refresh_interval)
+
+
+def index_abstracts(paths):
+    """
+    새로 저장된 Abstract_*.json 파일들을 참고자료 인덱스와 임베딩 인덱스에 바로 추가합니다. (keyextraction.py에서 호출)
+
+    파일은 data/<작업 폴더>/ 아래에 있어야 합니다. 참고자료 폴더(data)별로 인덱스를 한 번만 열고
+    모든 파일을 색인한 뒤 임베딩을 한 번 동기화하며, 임베딩은 바뀐 문서만 추가됩니다. 색인한 파일 수를 반환합니다.
+    """
+    by_folder = {}
+    for path in paths:
+        by_folder.setdefault(os.path.dirname(os.path.dirname(os.path.abspath(path))), []).append(path)
+    indexed = 0
+    for data_folder, folder_paths in by_folder.items():
+        reference_index = create_reference_index_from_env(data_folder)
+        changed = sum(1 for path in folder_paths if reference_index.index_file(path))
+        if changed:
+            create_embedding_index_from_env(reference_index).sync()
+        indexed += changed
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참고자료 임베딩 인덱스를 동기화하거나 의미 검색합니다.")
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--data", default=os.path.join(base_dir, "data"), help="참고자료 폴더 (기본: data)")
+    parser.add_argument("--compact", action="store_true", help="삭제 표시된 행을 제거합니다.")
+    parser.add_argument("--query", help="동기화 후 검색할 검색어")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    index = create_embedding_index_from_env(create_reference_index_from_env(args.data))
+    print(json.dumps(index.sync(), ensure_ascii=False))
+    if args.compact:
+        index.store.compact()
+    print(json.dumps(index.stats(), ensure_ascii=False, indent=2))
+    if args.query:
+        print(json.dumps(index.search(args.query), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
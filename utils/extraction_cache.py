@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    업로드 파일에서 추출한 텍스트를 파일 내용의 해시(SHA-256)로 캐싱합니다.
+
+    같은 파일을 다시 첨부하면 임시 파일 저장과 PDF 파싱을 모두 건너뜁니다.
+    메모리 캐시는 전체 문자 수 기준 LRU로 제한되며, disk_dir를 지정하면
+    `<key>.txt` 형태로 디스크에도 보관하여 프로세스 재시작 후에도 재사용합니다.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=512, disk_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=lambda text: len(text.encode('utf-8')))
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data, filename, max_chars):
+        """파일 내용, 확장자, 추출 길이 제한으로 캐시 키를 만듭니다."""
+        _, extension = os.path.splitext(filename)
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{digest}-{extension.lower().lstrip('.')}-{max_chars}"
+
+    def get(self, key):
+        """캐시된 텍스트를 반환합니다. 메모리에 없으면 디스크를 확인합니다."""
+        text = self.memory.get(key)
+        if text is not None or not self.disk_dir:
+            return text
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)  # 디스크 LRU를 위해 최근 사용 시각 갱신
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read extraction cache file {path}: {e}")
+            return None
+
+        self.disk_hits += 1
+        self.memory.set(key, text)
+        return text
+
+    def set(self, key, text):
+        """추출된 텍스트를 메모리(및 디스크)에 저장합니다."""
+        self.memory.set(key, text)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write extraction cache file {path}: {e}")
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _evict_disk(self):
+        """디스크 캐시가 한도를 넘으면 가장 오래 사용되지 않은 파일부터 삭제합니다."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.txt'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        stats = self.memory.stats()
+        # 디스크 적중은 메모리 조회에서 miss로 집계되었으므로 hit로 옮겨 계산
+        stats["hits"] += self.disk_hits
+        stats["misses"] -= self.disk_hits
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_enabled"] = bool(self.disk_dir)
+        return stats
+
+
+def _from_env():
+    return ExtractionCache(
+        max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        disk_dir=os.getenv("EXTRACTION_CACHE_DIR") or None,
+    )
+
+
+extraction_cache = _from_env()
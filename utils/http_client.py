@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+import weakref
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# close_session()이 정리할 클라이언트 (공유 풀, 검증 서비스 등 전용 풀, SDK 클라이언트 풀)
+_clients = weakref.WeakSet()
+
+
+def register_client(client):
+    """close_session()이 함께 정리할 클라이언트를 등록합니다. client는 async close()를 제공해야 합니다."""
+    _clients.add(client)
+    return client
+
+
+class HTTPClient:
+    """
+    프로세스 전역에서 공유하는 aiohttp 세션 관리자.
+
+    aiohttp.ClientSession은 생성된 이벤트 루프에 묶이므로, 실행 중인 루프마다
+    하나의 세션을 만들어 재사용합니다. 같은 루프 안에서는 Gemini 호출, 검증,
+    개선, 웹 검색 등 모든 요청이 커넥션 풀(keep-alive, DNS 캐시)을 공유하므로
+    매 호출마다 TCP+TLS 핸드셰이크를 반복하지 않습니다.
+    """
+
+    def __init__(self, limit=100, limit_per_host=20, keepalive_timeout=60.0,
+                 ttl_dns_cache=300, total_timeout=120.0, connect_timeout=10.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self._sessions = weakref.WeakKeyDictionary()
+        register_client(self)
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    def get_session(self):
+        """현재 이벤트 루프에 묶인 공유 세션을 반환합니다. 없거나 닫혀 있으면 새로 만듭니다."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+            logger.debug("Created pooled HTTP session for event loop %s", id(loop))
+        return session
+
+    async def close(self):
+        """현재 이벤트 루프의 세션을 닫습니다. 요청마다 루프가 새로 만들어지는 환경에서 호출합니다."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    def stats(self):
+        """열려 있는 세션 수를 반환합니다."""
+        return {"open_sessions": sum(1 for s in self._sessions.values() if not s.closed)}
+
+
+def _from_env():
+    return HTTPClient(
+        limit=int(os.getenv("HTTP_POOL_LIMIT", "100")),
+        limit_per_host=int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20")),
+        keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60")),
+        ttl_dns_cache=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+        total_timeout=float(os.getenv("HTTP_TOTAL_TIMEOUT", "120")),
+    )
+
+
+http_client = _from_env()
+
+
+def get_session():
+    """애플리케이션 공유 HTTP 세션을 반환합니다."""
+    return http_client.get_session()
+
+
+async def close_session():
+    """현재 이벤트 루프의 공유 HTTP 세션과 등록된 모든 클라이언트(전용 풀, SDK 클라이언트)를 정리합니다."""
+    for client in list(_clients):
+        await client.close()
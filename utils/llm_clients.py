@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+import weakref
+
+from utils.config import get_api_key
+from utils.http_client import register_client
+from utils.rate_limit import get_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class SDKClientPool:
+    """
+    공급자 SDK의 비동기 클라이언트(AsyncOpenAI, AsyncAnthropic)를 공유하는 풀.
+
+    SDK 클라이언트의 httpx 커넥션 풀은 생성된 이벤트 루프에 묶이므로 실행 중인 루프마다
+    하나의 클라이언트를 만들어 재사용합니다. 호출 속도, 동시 호출 수, 재시도는 공급자 리미터
+    (utils.rate_limit.ProviderLimiter)가 이벤트 루프와 관계없이 프로세스 전체에 적용하므로
+    SDK 자체 재시도는 끕니다.
+    """
+
+    def __init__(self, name, factory, provider):
+        self.name = name
+        self._factory = factory
+        self._clients = weakref.WeakKeyDictionary()
+        self.limiter = get_limiter(provider)
+        register_client(self)
+
+    def get(self):
+        """현재 이벤트 루프에 묶인 공유 클라이언트를 반환합니다. 없으면 새로 만듭니다."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._factory()
+            self._clients[loop] = client
+            logger.debug("Created %s client for event loop %s", self.name, id(loop))
+        return client
+
+    async def close(self):
+        """현재 이벤트 루프의 클라이언트를 닫습니다."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def stats(self):
+        return {"open_clients": len(self._clients)}
+
+
+def _timeout(sdk, prefix):
+    """SDK가 사용하는 httpx 패키지의 Timeout 객체를 만듭니다. (연결 타임아웃은 별도로 짧게 설정)"""
+    return sdk.Timeout(
+        float(os.getenv(f"{prefix}_TIMEOUT", "60")),
+        connect=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", "10")),
+    )
+
+
+def _create_openai_client():
+    import openai
+    return openai.AsyncOpenAI(
+        api_key=get_api_key("OPENAI_API_KEY"),
+        timeout=_timeout(openai, "OPENAI"),
+        max_retries=0,
+    )
+
+
+def _create_anthropic_client():
+    import anthropic
+    return anthropic.AsyncAnthropic(
+        api_key=get_api_key("ANTHROPIC_API_KEY"),
+        timeout=_timeout(anthropic, "ANTHROPIC"),
+        max_retries=0,
+    )
+
+
+# 환경 변수: OPENAI_TIMEOUT / ANTHROPIC_TIMEOUT (초, 기본 60), *_CONNECT_TIMEOUT (기본 10)
+# 속도/동시 호출/재시도 제한은 OPENAI_* / ANTHROPIC_* (RPM, MAX_CONCURRENCY, MAX_RETRIES) - utils.rate_limit 참고
+openai_clients = SDKClientPool("OpenAI", _create_openai_client, "openai")
+anthropic_clients = SDKClientPool("Anthropic", _create_anthropic_client, "anthropic")
@@ -0,0 +1,8 @@
+def render_markdown(text):
+    """
+    마크다운 텍스트를 HTML로 변환합니다.
+
+    markdown 패키지는 처음 렌더링할 때 불러와 서버 시작 시간을 줄입니다.
+    """
+    import markdown
+    return markdown.markdown(text)
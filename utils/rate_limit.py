@@ -0,0 +1,388 @@
+import asyncio
+import collections
+import contextvars
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    비동기 토큰 버킷 레이트 리미터.
+
+    초당 rate개의 토큰이 채워지고 최대 capacity개까지 쌓입니다. acquire()는 토큰이
+    부족하면 채워질 때까지 대기하므로, 동시에 시작된 요청도 설정한 속도로 분산됩니다.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute, capacity=None):
+        """분당 요청 수로 버킷을 만듭니다."""
+        return cls(requests_per_minute / 60.0, capacity if capacity is not None else 1)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens=1.0):
+        """토큰을 소비합니다. 부족하면 필요한 만큼 대기합니다. 대기한 시간(초)을 반환합니다."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class ConcurrencyLimiter:
+    """
+    동시에 실행되는 작업 수를 limit개로 제한하는 비동기 리미터.
+
+    asyncio.Semaphore는 하나의 이벤트 루프에 묶이지만, 이 리미터는 스레드 락으로 상태를
+    보호하고 대기자를 자신의 루프에서 깨우므로 요청마다 이벤트 루프가 다른 환경(Flask async 뷰)에서도
+    프로세스 전체의 동시 실행 수를 제한합니다. `async with limiter:` 형태로 사용합니다.
+    """
+
+    def __init__(self, limit):
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        self.limit = int(limit)
+        self._active = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """슬롯을 얻을 때까지 대기합니다."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    handed_off = False
+                else:
+                    # _wake가 set_result로 슬롯을 넘겨준 뒤, 태스크가 재개되기 전에 취소된 경우
+                    handed_off = waiter[1].done() and not waiter[1].cancelled()
+            # 넘겨받은 슬롯은 여기서 반환합니다. 넘겨받기 전에 취소되었다면 _wake가 반환합니다.
+            if handed_off:
+                self.release()
+            raise
+
+    def release(self):
+        """슬롯을 반환합니다. 대기자가 있으면 슬롯을 그대로 넘겨줍니다."""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._wake, future)
+                    return
+                except RuntimeError:
+                    # 대기자의 이벤트 루프가 이미 닫힌 경우 다음 대기자에게 넘깁니다.
+                    continue
+            self._active -= 1
+
+    def _wake(self, future):
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        with self._lock:
+            return {"limit": self.limit, "active": self._active, "waiting": len(self._waiters)}
+
+
+# ===================================================================
+# 2026-10-17 KST: 공급자별 적응형 속도 제한 + 요청 단위 재시도 예산
+# ===================================================================
+class RetryBudget:
+    """하나의 사용자 요청이 모든 API 호출에 걸쳐 사용할 수 있는 재시도 횟수."""
+
+    def __init__(self, max_retries):
+        self.remaining = max_retries
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """재시도 1회를 차감합니다. 남은 예산이 없으면 False를 반환합니다."""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+_retry_budget = contextvars.ContextVar("retry_budget", default=None)
+
+
+def start_retry_budget(max_retries=None):
+    """
+    현재 요청(컨텍스트)의 재시도 예산을 새로 시작합니다.
+
+    같은 요청에서 만들어진 하위 태스크도 컨텍스트를 복사하므로 같은 예산을 공유합니다.
+    max_retries를 생략하면 RETRY_BUDGET_PER_REQUEST(기본 6)를 사용합니다.
+    """
+    if max_retries is None:
+        max_retries = int(os.getenv("RETRY_BUDGET_PER_REQUEST", "6"))
+    budget = RetryBudget(max_retries)
+    _retry_budget.set(budget)
+    return budget
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환합니다. 해석할 수 없으면 None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def classify_error(error):
+    """
+    예외를 (재시도 가능 여부, 속도 제한(429) 여부, Retry-After 초)로 분류합니다.
+
+    aiohttp 응답 오류, OpenAI/Anthropic SDK 오류(status_code, response.headers), 연결/타임아웃 오류를 처리합니다.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    retry_after = parse_retry_after(headers.get("Retry-After") if headers else None)
+
+    if isinstance(status, int):
+        if status == 429:
+            return True, True, retry_after
+        return status in (408, 409) or status >= 500, False, retry_after
+    if isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+        return True, False, None
+    # SDK의 연결/타임아웃 오류 (openai/anthropic 모두 같은 이름을 사용)
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True, False, None
+    return False, False, None
+
+
+class ProviderLimiter:
+    """
+    외부 API 공급자 하나에 대한 공유 리미터.
+
+    - 토큰 버킷(requests_per_minute)으로 호출 속도를 고르게 분산하고, 동시 호출 수를 제한합니다.
+    - 429를 받으면 Retry-After(없으면 백오프 시간)만큼 이 공급자를 쓰는 모든 호출을 함께 멈추고,
+      호출 속도를 절반으로 낮춘 뒤 성공할 때마다 조금씩 회복합니다(AIMD).
+    - 재시도는 지터를 넣은 지수 백오프로 수행하며, 요청 단위 재시도 예산을 함께 차감합니다.
+
+    스레드 락으로 상태를 보호하므로 요청마다 이벤트 루프가 다른 환경에서도 프로세스 전체에 적용됩니다.
+    """
+
+    def __init__(self, name, requests_per_minute=0, max_concurrency=64, max_retries=4,
+                 base_delay=0.5, max_delay=30.0, burst=None):
+        self.name = name
+        self.rate = requests_per_minute / 60.0 if requests_per_minute else 0.0
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = ConcurrencyLimiter(max_concurrency)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._scale = 1.0
+        self._queued = 0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.budget_exhausted = 0
+        self.wait_seconds = 0.0
+
+    def _reserve(self):
+        """토큰 하나를 예약하고 대기해야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._blocked_until - now)
+            if self.rate:
+                rate = self.rate * self._scale
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * rate)
+                self._updated_at = now
+                self._tokens -= 1.0
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / rate)
+            self.requests += 1
+            self.wait_seconds += delay
+            return delay
+
+    @asynccontextmanager
+    async def slot(self):
+        """속도 제한과 동시 호출 제한을 모두 통과한 뒤 호출 구간을 실행합니다."""
+        delay = self._reserve()
+        with self._lock:
+            self._queued += 1
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.concurrency.acquire()
+        finally:
+            with self._lock:
+                self._queued -= 1
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def record_success(self):
+        with self._lock:
+            self._scale = min(1.0, self._scale + 0.05)
+
+    def record_throttle(self, retry_after=None, attempt=1):
+        """429 응답을 기록하고, 이 공급자를 쓰는 모든 호출을 잠시 멈추며 호출 속도를 낮춥니다."""
+        pause = retry_after if retry_after is not None else self.backoff_delay(attempt)
+        with self._lock:
+            self.throttled += 1
+            self._scale = max(0.1, self._scale * 0.5)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def backoff_delay(self, attempt, retry_after=None, base_delay=None):
+        """attempt번째 재시도 전 대기 시간. Retry-After가 있으면 따르고, 없으면 full jitter 지수 백오프."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+        base_delay = self.base_delay if base_delay is None else base_delay
+        return random.uniform(0, min(self.max_delay, base_delay * (2 ** attempt)))
+
+    async def call(self, make_call, retries=None, acquire=True, base_delay=None):
+        """
+        make_call()을 호출하고, 일시적 오류(429, 5xx, 연결/타임아웃)는 재시도합니다.
+
+        Args:
+            make_call: 인자 없이 호출하면 코루틴을 반환하는 함수. 시도마다 새로 호출됩니다.
+            retries (int | None): 최대 재시도 횟수. None이면 공급자 기본값을 사용합니다.
+            acquire (bool): 시도마다 slot()을 얻을지 여부. 호출자가 이미 slot()을 보유한 경우 False.
+            base_delay (float | None): 백오프 기본 대기 시간. None이면 공급자 기본값을 사용합니다.
+
+        Raises:
+            Exception: 재시도할 수 없는 오류이거나 재시도 횟수/요청 예산을 모두 소진하면 마지막 오류를 그대로 발생시킵니다.
+        """
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                if acquire:
+                    async with self.slot():
+                        result = await make_call()
+                else:
+                    result = await make_call()
+                self.record_success()
+                return result
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                if throttled:
+                    self.record_throttle(retry_after, attempt + 1)
+                if not retryable or attempt >= retries:
+                    raise
+                budget = _retry_budget.get()
+                if budget is not None and not budget.consume():
+                    with self._lock:
+                        self.budget_exhausted += 1
+                    logger.warning(f"[{self.name}] Retry budget exhausted for this request. Giving up: {e}")
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                wait_time = self.backoff_delay(attempt, retry_after, base_delay)
+                logger.warning(f"[{self.name}] Transient error ({type(e).__name__}: {e}). "
+                               f"Retrying ({attempt}/{retries}) in {wait_time:.2f}s.")
+                await asyncio.sleep(wait_time)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "requests_per_minute": round(self.rate * 60, 2),
+                "effective_requests_per_minute": round(self.rate * self._scale * 60, 2),
+                "queued": self._queued,
+                "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "budget_exhausted": self.budget_exhausted,
+                "wait_seconds": round(self.wait_seconds, 2),
+            }
+        concurrency = self.concurrency.stats()
+        stats.update({"max_concurrency": concurrency["limit"], "active": concurrency["active"],
+                      "waiting_for_slot": concurrency["waiting"]})
+        return stats
+
+
+# 공급자별 기본 동시 호출 수. 환경 변수 <PROVIDER>_RPM(0=속도 제한 없음), <PROVIDER>_MAX_CONCURRENCY,
+# <PROVIDER>_MAX_RETRIES로 조정합니다. (예: GEMINI_RPM=60, TAVILY_MAX_CONCURRENCY=8)
+PROVIDER_DEFAULTS = {
+    "gemini": {"max_concurrency": 64},
+    "openai": {"max_concurrency": 64},
+    "anthropic": {"max_concurrency": 64},
+    "tavily": {"max_concurrency": 16},
+    "imagen": {"max_concurrency": 8},
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider):
+    """공급자 이름에 해당하는 공유 리미터를 반환합니다. 처음 요청될 때 환경 변수로 생성합니다."""
+    provider = (provider or "default").lower()
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            prefix = provider.upper().replace("-", "_")
+            defaults = PROVIDER_DEFAULTS.get(provider, {"max_concurrency": 64})
+            limiter = ProviderLimiter(
+                provider,
+                requests_per_minute=float(os.getenv(f"{prefix}_RPM", "0")),
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(defaults["max_concurrency"]))),
+                max_retries=int(os.getenv(f"{prefix}_MAX_RETRIES", "4")),
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def limiter_stats():
+    """생성된 모든 공급자 리미터의 지표(대기열 길이, 429 횟수, 재시도 등)를 반환합니다."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
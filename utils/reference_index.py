@@ -0,0 +1,542 @@
+"""
+참고자료(Abstract_*.json) 전문 검색 인덱스.
+
+data/<task>_files/ 아래의 요약 JSON은 문서마다 스키마가 다르므로(프로젝트 이름/프로젝트이름/report_title,
+sections/subSections, 보고서목차/보고서_목차 등) 먼저 하나의 표준 레코드(normalize_abstract)로 변환한 뒤
+SQLite FTS5 인덱스에 섹션 단위로 저장합니다. 한글은 형태소 분석 없이도 부분 일치가 되도록 2글자 단위
+(bigram)로 색인하고, 검색어도 같은 방식으로 변환하여 구(phrase)로 찾습니다.
+
+인덱스는 파일의 수정 시각과 크기를 비교하여 바뀐 파일만 다시 색인합니다.
+명령줄에서 직접 색인하거나 검색할 수 있습니다:
+    python -m utils.reference_index [--rebuild] [--query 검색어]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from html import escape
+
+from utils.summary_renderer import detect_document_type
+
+logger = logging.getLogger(__name__)
+
+# --- 스키마 별칭 테이블 ---
+# 표준 필드마다 문서 스키마별로 쓰이는 키를 우선순위대로 나열합니다. 최상위와 한 단계 아래 딕셔너리에서 찾습니다.
+FIELD_ALIASES = {
+    "original_file_name": ("original_file_name", "원본이름", "original_filename"),
+    "title": ("프로젝트 이름", "프로젝트이름", "프로젝트_이름", "report_title", "reportTitle", "project_name", "title"),
+    "client": ("고객사 이름", "고객사이름", "고객사_이름", "client"),
+    "date": ("reportDate", "report_date", "보고일자", "작성일"),
+    "keywords": ("핵심키워드", "핵심_키워드", "주요 키워드 10개", "주요 키워드", "주요키워드", "keywords", "section7_keywords"),
+    "summary": ("summary", "요약", "report_objective", "reportObjective", "프로젝트목적", "프로젝트(제안)의 목적", "goal"),
+}
+# 섹션 목록과 하위 섹션 목록에 쓰이는 키
+SECTION_LIST_KEYS = ("sections", "섹션")
+SUBSECTION_KEYS = ("subsections", "subSections", "sub_sections", "하위섹션")
+SECTION_TITLE_KEYS = ("title", "제목", "section_title")
+# 섹션으로 색인하지 않는 메타 정보 키
+META_KEYS = {"original_file_name", "원본이름", "original_filename", "english_filename", "summary_html"}
+
+# 섹션이 이보다 길면 줄 단위로 나누어 여러 행으로 색인합니다. (검색 결과와 프롬프트에 넣을 발췌 단위)
+MAX_SECTION_CHARS = 1200
+# 색인 형식이 바뀌면 올려서 기존 인덱스를 다시 만듭니다.
+INDEX_VERSION = 2
+
+HANGUL_RUN = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]+|[A-Za-z0-9]+")
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+def _find(content, keys, depth=1):
+    """키 목록 중 처음으로 값이 있는 항목을 최상위부터 depth 단계 아래 딕셔너리까지 찾습니다."""
+    levels = [content]
+    for _ in range(depth + 1):
+        next_levels = []
+        for node in levels:
+            for key in keys:
+                value = node.get(key)
+                if value not in (None, "", [], {}):
+                    return value
+            next_levels.extend(v for v in node.values() if isinstance(v, dict))
+        levels = next_levels
+    return None
+
+
+def flatten_text(value):
+    """중첩된 값에서 문자열을 모두 모아 줄 단위 텍스트로 만듭니다."""
+    parts = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for child in node.values():
+                walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+        elif node is not None and not isinstance(node, bool):
+            text = str(node).strip()
+            if text:
+                parts.append(text)
+
+    walk(value)
+    return "\n".join(parts)
+
+
+def _section_records(content):
+    """문서 본문을 (섹션 제목, 텍스트) 목록으로 변환합니다."""
+    records = []
+    alias_keys = {key for keys in FIELD_ALIASES.values() for key in keys}
+
+    def add(title, value):
+        text = flatten_text(value)
+        if text:
+            records.append({"title": str(title), "text": text})
+
+    def add_section_list(items, parent=None):
+        for index, item in enumerate(items, 1):
+            if not isinstance(item, dict):
+                add(parent or f"섹션 {index}", item)
+                continue
+            title = next((item[k] for k in SECTION_TITLE_KEYS if item.get(k)), f"섹션 {index}")
+            full_title = f"{parent} > {title}" if parent else title
+            subsections = next((item[k] for k in SUBSECTION_KEYS if isinstance(item.get(k), list)), None)
+            body = {k: v for k, v in item.items() if k not in SECTION_TITLE_KEYS and k not in SUBSECTION_KEYS}
+            if subsections:
+                add(full_title, body)
+                add_section_list(subsections, full_title)
+            else:
+                add(full_title, body)
+
+    def walk(node, parent=None):
+        for key, value in node.items():
+            if key in META_KEYS or (parent is None and key in alias_keys and not isinstance(value, (dict, list))):
+                continue
+            title = f"{parent} > {key}" if parent else key
+            if key in SECTION_LIST_KEYS and isinstance(value, list):
+                add_section_list(value, parent)
+            elif isinstance(value, dict) and parent is None and sum(isinstance(v, (dict, list)) for v in value.values()) > 1:
+                # report_summary, proposal_summary 같은 묶음은 한 단계 펼쳐서 하위 항목별로 색인합니다.
+                walk(value, key)
+            elif key in FIELD_ALIASES["keywords"]:
+                continue
+            else:
+                add(title, value)
+
+    walk(content)
+    return records
+
+
+def split_section(text, max_chars=MAX_SECTION_CHARS):
+    """긴 섹션 텍스트를 줄 경계에서 max_chars 이하의 조각으로 나눕니다. 한 줄이 더 길면 글자 수로 자릅니다."""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def normalize_abstract(content, folder, json_name):
+    """요약 JSON 하나를 표준 레코드(제목, 고객사, 키워드, 요약, 섹션 목록 등)로 변환합니다."""
+    keywords = _find(content, FIELD_ALIASES["keywords"]) or []
+    if isinstance(keywords, str):
+        keywords = [k.strip() for k in re.split(r"[,\n]", keywords) if k.strip()]
+    original_file_name = _find(content, FIELD_ALIASES["original_file_name"], depth=0) or json_name
+    summary = _find(content, FIELD_ALIASES["summary"])
+    return {
+        "doc_id": f"{folder}/{json_name}",
+        "folder": folder,
+        "json_name": json_name,
+        "original_file_name": str(original_file_name),
+        "title": str(_find(content, FIELD_ALIASES["title"]) or original_file_name),
+        "client": str(_find(content, FIELD_ALIASES["client"]) or ""),
+        "date": str(_find(content, FIELD_ALIASES["date"]) or ""),
+        "document_type": detect_document_type(content),
+        "keywords": [str(k) for k in keywords if k] if isinstance(keywords, list) else [],
+        "summary": flatten_text(summary) if summary else "",
+        "sections": _section_records(content),
+    }
+
+
+# --- 색인/검색어 변환 ---
+def _runs(text):
+    return HANGUL_RUN.findall(text or "")
+
+
+def to_index_text(text):
+    """한글·한자는 2글자 단위(bigram)로, 영문·숫자는 소문자 단어로 변환하여 FTS 색인용 텍스트를 만듭니다."""
+    tokens = []
+    for run in _runs(text):
+        if run.isascii():
+            tokens.append(run.lower())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return " ".join(tokens)
+
+
+def build_match_query(query, any_term=False, max_terms=64):
+    """
+    검색어를 FTS5 MATCH 식으로 변환합니다. 단어가 없으면 None.
+
+    기본은 모든 단어를 포함하는(AND) 섹션을 찾습니다. any_term=True면 문장 형태의 질문에서 검색하도록
+    색인 토큰(한글 bigram, 영문 단어) 중 하나라도 포함하는(OR) 섹션을 찾고, 순위는 bm25에 맡깁니다.
+    """
+    if any_term:
+        tokens = list(dict.fromkeys(to_index_text(query).split()))[:max_terms]
+        return " OR ".join(f'"{token}"' for token in tokens) if tokens else None
+    clauses = []
+    for run in _runs(query):
+        if run.isascii():
+            clauses.append(f'"{run.lower()}"*')
+        elif len(run) == 1:
+            clauses.append(f'"{run}"*')
+        else:
+            clauses.append('"' + " ".join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+    return " AND ".join(clauses) if clauses else None
+
+
+def make_snippet(text, query, width=120):
+    """원문에서 검색어가 처음 나오는 부분을 잘라 <mark>로 강조한 HTML 조각을 만듭니다."""
+    terms = sorted({run.lower() for run in _runs(query)}, key=len, reverse=True)
+    if not terms:
+        return escape(text[:width])
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.I)
+    match = pattern.search(text)
+    start = max(0, match.start() - width // 3) if match else 0
+    end = min(len(text), start + width)
+    excerpt = " ".join(text[start:end].split())
+    marked = pattern.sub(lambda m: f"{MARK_START}{m.group(0)}{MARK_END}", excerpt)
+    html = escape(marked).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+    return ("…" if start > 0 else "") + html + ("…" if end < len(text) else "")
+
+
+class ReferenceIndex:
+    """
+    참고자료 표준 레코드를 보관하고 FTS5로 검색하는 SQLite 인덱스.
+
+    문서(reference_documents)와 섹션(reference_sections)의 원문은 일반 테이블에, 색인용 bigram 텍스트는
+    FTS5 테이블(reference_fts)에 저장합니다. 문서 머리(제목, 고객사, 키워드, 요약)는 position 0인 섹션으로 색인합니다.
+    검색 점수는 bm25이며 제목 > 키워드 > 섹션 제목 > 본문 순으로 가중치를 줍니다.
+    refresh_interval초마다 한 번 data 폴더를 훑어 바뀐 파일만 다시 색인합니다.
+    """
+
+    BM25_WEIGHTS = (0.0, 10.0, 5.0, 3.0, 1.0)  # section_id, title, keywords, heading, body
+
+    def __init__(self, data_folder, path, refresh_interval=30.0):
+        self.data_folder = data_folder
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._checked_at = 0.0
+        self._errors = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS reference_documents; DROP TABLE IF EXISTS reference_sections;"
+                "DROP TABLE IF EXISTS reference_fts;"
+                f"PRAGMA user_version = {INDEX_VERSION};"
+            )
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS reference_documents ("
+            " doc_id TEXT PRIMARY KEY, folder TEXT NOT NULL, json_name TEXT NOT NULL,"
+            " original_file_name TEXT, title TEXT, client TEXT, date TEXT, document_type TEXT,"
+            " keywords TEXT, summary TEXT, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS reference_sections ("
+            " section_id INTEGER PRIMARY KEY, doc_id TEXT NOT NULL, position INTEGER NOT NULL,"
+            " title TEXT, text TEXT);"
+            "CREATE INDEX IF NOT EXISTS reference_sections_doc ON reference_sections (doc_id);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS reference_fts USING fts5("
+            " section_id UNINDEXED, title, keywords, heading, body, tokenize='unicode61');"
+        )
+        self._conn.commit()
+
+    # --- 색인 ---
+    def _scan(self):
+        """data 폴더의 Abstract_*.json 파일 {doc_id: (경로, 폴더, 파일명, mtime_ns, size)}를 반환합니다."""
+        files = {}
+        if not os.path.isdir(self.data_folder):
+            return files
+        for folder in os.scandir(self.data_folder):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.is_file() and entry.name.startswith("Abstract_") and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    files[f"{folder.name}/{entry.name}"] = (entry.path, folder.name, entry.name, stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def refresh(self, force=False):
+        """바뀐 파일만 다시 색인하고 삭제된 파일을 제거합니다. force=True면 전체를 다시 색인합니다."""
+        started = time.perf_counter()
+        files = self._scan()
+        counts = {"added": 0, "updated": 0, "removed": 0, "errors": 0}
+        with self._lock:
+            indexed = dict(((row[0], (row[1], row[2])) for row in
+                            self._conn.execute("SELECT doc_id, mtime_ns, size FROM reference_documents")))
+            for doc_id in set(indexed) - set(files):
+                self._delete(doc_id)
+                counts["removed"] += 1
+            for doc_id, (path, folder, json_name, mtime_ns, size) in files.items():
+                if not force and indexed.get(doc_id) == (mtime_ns, size):
+                    continue
+                if not force and self._errors.get(doc_id, (None,))[0] == (mtime_ns, size):
+                    continue
+                if self._ingest(path, folder, json_name, mtime_ns, size):
+                    counts["updated" if doc_id in indexed else "added"] += 1
+                else:
+                    counts["errors"] += 1
+            self._conn.commit()
+            self._checked_at = time.monotonic()
+        if any(counts.values()):
+            logger.info(f"Reference index refreshed in {(time.perf_counter() - started) * 1000:.0f}ms: {counts}")
+        return counts
+
+    def index_file(self, path):
+        """
+        Abstract_*.json 파일 하나를 바로 색인합니다. (keyextraction.py가 새 요약을 저장한 직후 등)
+
+        파일은 data 폴더 바로 아래의 작업 폴더에 있어야 합니다. 성공하면 True를 반환합니다.
+        """
+        folder = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        stat = os.stat(path)
+        with self._lock:
+            indexed = self._ingest(path, folder, os.path.basename(path), stat.st_mtime_ns, stat.st_size)
+            self._conn.commit()
+        return indexed
+
+    def _ingest(self, path, folder, json_name, mtime_ns, size):
+        doc_id = f"{folder}/{json_name}"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = normalize_abstract(json.load(f), folder, json_name)
+        except Exception as e:
+            logger.error(f"Failed to index reference file {path}: {e}")
+            self._errors[doc_id] = ((mtime_ns, size), str(e))
+            return False
+        self._errors.pop(doc_id, None)
+        self._delete(doc_id)
+        self._insert(record, mtime_ns, size)
+        return True
+
+    def ensure_fresh(self):
+        """마지막 확인 후 refresh_interval초가 지났으면 바뀐 파일을 다시 색인합니다."""
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.refresh()
+
+    def _delete(self, doc_id):
+        self._conn.execute(
+            "DELETE FROM reference_fts WHERE section_id IN (SELECT section_id FROM reference_sections WHERE doc_id = ?)",
+            (doc_id,),
+        )
+        self._conn.execute("DELETE FROM reference_sections WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM reference_documents WHERE doc_id = ?", (doc_id,))
+
+    def _insert(self, record, mtime_ns, size):
+        self._conn.execute(
+            "INSERT INTO reference_documents (doc_id, folder, json_name, original_file_name, title, client, date,"
+            " document_type, keywords, summary, mtime_ns, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record["doc_id"], record["folder"], record["json_name"], record["original_file_name"], record["title"],
+             record["client"], record["date"], record["document_type"],
+             json.dumps(record["keywords"], ensure_ascii=False), record["summary"], mtime_ns, size),
+        )
+        title_text = to_index_text(record["title"])
+        keyword_text = to_index_text(" ".join(record["keywords"]))
+        header = {"title": "개요", "text": "\n".join(filter(None, [record["client"], record["summary"]]))}
+        rows = []
+        for section in [header] + record["sections"]:
+            pieces = split_section(section["text"])
+            for number, piece in enumerate(pieces, 1):
+                rows.append((f"{section['title']} ({number}/{len(pieces)})" if len(pieces) > 1 else section["title"], piece))
+        for position, (section_title, text) in enumerate(rows):
+            section_id = self._conn.execute(
+                "INSERT INTO reference_sections (doc_id, position, title, text) VALUES (?, ?, ?, ?)",
+                (record["doc_id"], position, section_title, text),
+            ).lastrowid
+            # 문서 제목과 키워드는 머리 섹션에만 색인하여 같은 문서의 모든 섹션이 제목만으로 일치하지 않게 합니다.
+            self._conn.execute(
+                "INSERT INTO reference_fts (section_id, title, keywords, heading, body) VALUES (?, ?, ?, ?, ?)",
+                (section_id, title_text if position == 0 else "", keyword_text if position == 0 else "",
+                 to_index_text(section_title), to_index_text(text)),
+            )
+
+    # --- 검색 ---
+    def search(self, query, limit=20, folder=None, per_document=3):
+        """
+        검색어와 일치하는 섹션을 점수순으로 반환합니다. 한 문서에서는 최대 per_document개 섹션만 반환합니다.
+
+        Returns:
+            dict: query, results([{doc_id, folder, json_name, title, original_file_name, document_type,
+                  keywords, section, snippet, score}]), took_ms
+        """
+        started = time.perf_counter()
+        results = []
+        for row in self._match(build_match_query(query), limit, folder, per_document):
+            text = row.pop("text")
+            row["keywords"] = row["keywords"][:10]
+            row["snippet"] = make_snippet(text or row["title"], query)
+            results.append(row)
+        return {"query": query, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def rank_sections(self, text, limit=10, per_document=2):
+        """
+        문장 형태의 질문과 관련된 섹션을 bm25 순으로 반환합니다. (프롬프트에 넣을 참고자료 검색용)
+
+        질문의 색인 토큰 중 하나라도 포함하는 섹션을 찾고, 결과마다 원문(text)과
+        질문 토큰 중 섹션 제목·본문에 포함된 비율(coverage)을 함께 반환합니다.
+        """
+        query_tokens = set(to_index_text(text).split())
+        results = self._match(build_match_query(text, any_term=True), limit, None, per_document)
+        for row in results:
+            section_tokens = set(to_index_text(f"{row['section']}\n{row['text']}").split())
+            if row["section"] == "개요":
+                section_tokens |= set(to_index_text(f"{row['title']}\n{' '.join(row['keywords'])}").split())
+            row["coverage"] = round(len(query_tokens & section_tokens) / len(query_tokens), 3) if query_tokens else 0.0
+        return results
+
+    def _match(self, match, limit, folder, per_document):
+        """MATCH 식으로 섹션을 검색하여 bm25 순으로 반환합니다. 한 문서에서는 최대 per_document개만 반환합니다."""
+        self.ensure_fresh()
+        if not match:
+            return []
+        sql = (
+            "SELECT s.doc_id, s.title, s.text, d.folder, d.json_name, d.title, d.original_file_name,"
+            " d.document_type, d.keywords, bm25(reference_fts, ?, ?, ?, ?, ?) AS score"
+            " FROM reference_fts JOIN reference_sections s ON s.section_id = reference_fts.section_id"
+            " JOIN reference_documents d ON d.doc_id = s.doc_id"
+            " WHERE reference_fts MATCH ?" + (" AND d.folder = ?" if folder else "") +
+            " ORDER BY score LIMIT ?"
+        )
+        params = [*self.BM25_WEIGHTS, match] + ([folder] if folder else []) + [limit * per_document * 2]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        results = []
+        per_doc = {}
+        for doc_id, section_title, text, doc_folder, json_name, title, original, doc_type, keywords, score in rows:
+            if per_doc.get(doc_id, 0) >= per_document:
+                continue
+            per_doc[doc_id] = per_doc.get(doc_id, 0) + 1
+            results.append({
+                "doc_id": doc_id,
+                "folder": doc_folder,
+                "json_name": json_name,
+                "title": title,
+                "original_file_name": original,
+                "document_type": doc_type,
+                "keywords": json.loads(keywords or "[]"),
+                "section": section_title,
+                "text": text,
+                "score": round(-score, 4),
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+    def document_signatures(self):
+        """색인된 문서의 {doc_id: "mtime_ns:size"}를 반환합니다. (다른 인덱스의 증분 동기화용)"""
+        self.ensure_fresh()
+        with self._lock:
+            rows = self._conn.execute("SELECT doc_id, mtime_ns, size FROM reference_documents").fetchall()
+        return {doc_id: f"{mtime_ns}:{size}" for doc_id, mtime_ns, size in rows}
+
+    def document_sections(self, doc_id):
+        """문서의 섹션 [(position, 섹션 제목, 원문)]을 순서대로 반환합니다. 머리 섹션(position 0)에는 문서 제목과 키워드를 붙입니다."""
+        with self._lock:
+            document = self._conn.execute(
+                "SELECT title, keywords FROM reference_documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT position, title, text FROM reference_sections WHERE doc_id = ? ORDER BY position", (doc_id,)
+            ).fetchall()
+        if document is None:
+            return []
+        header = f"{document[0]}\n{' '.join(json.loads(document[1] or '[]'))}"
+        return [(position, title, f"{header}\n{text}" if position == 0 else text) for position, title, text in rows]
+
+    def get_sections(self, keys):
+        """(doc_id, position) 목록의 섹션과 문서 정보를 {(doc_id, position): dict}로 반환합니다."""
+        results = {}
+        with self._lock:
+            for doc_id, position in keys:
+                row = self._conn.execute(
+                    "SELECT s.title, s.text, d.folder, d.json_name, d.title, d.original_file_name, d.document_type, d.keywords"
+                    " FROM reference_sections s JOIN reference_documents d ON d.doc_id = s.doc_id"
+                    " WHERE s.doc_id = ? AND s.position = ?",
+                    (doc_id, position),
+                ).fetchone()
+                if row is None:
+                    continue
+                section_title, text, folder, json_name, title, original, doc_type, keywords = row
+                results[(doc_id, position)] = {
+                    "doc_id": doc_id,
+                    "folder": folder,
+                    "json_name": json_name,
+                    "title": title,
+                    "original_file_name": original,
+                    "document_type": doc_type,
+                    "keywords": json.loads(keywords or "[]"),
+                    "section": section_title,
+                    "text": text,
+                }
+        return results
+
+    def stats(self):
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM reference_documents").fetchone()[0]
+            sections = self._conn.execute("SELECT COUNT(*) FROM reference_sections").fetchone()[0]
+        return {
+            "documents": documents,
+            "sections": sections,
+            "errors": {doc_id: error for doc_id, (_, error) in self._errors.items()},
+        }
+
+
+def create_reference_index_from_env(data_folder):
+    """
+    환경 변수로 참고자료 검색 인덱스를 구성합니다.
+
+    - REFERENCE_INDEX_PATH: sqlite 파일 경로 (기본 <프로젝트>/cache/reference_index.db)
+    - REFERENCE_INDEX_REFRESH: data 폴더 변경 확인 주기(초, 기본 30)
+    """
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "reference_index.db")
+    path = os.getenv("REFERENCE_INDEX_PATH", default_path)
+    refresh_interval = float(os.getenv("REFERENCE_INDEX_REFRESH", "30"))
+    return ReferenceIndex(data_folder, path, refresh_interval=refresh_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참고자료(Abstract_*.json) 검색 인덱스를 만들거나 검색합니다.")
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--data", default=os.path.join(base_dir, "data"), help="참고자료 폴더 (기본: data)")
+    parser.add_argument("--rebuild", action="store_true", help="모든 파일을 다시 색인합니다.")
+    parser.add_argument("--query", help="색인 후 검색할 검색어")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    index = create_reference_index_from_env(args.data)
+    print(json.dumps(index.refresh(force=args.rebuild), ensure_ascii=False))
+    print(json.dumps(index.stats(), ensure_ascii=False, indent=2))
+    if args.query:
+        print(json.dumps(index.search(args.query), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
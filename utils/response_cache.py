@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """프로세스 메모리(LRU + TTL)에 응답을 보관하는 캐시 백엔드."""
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class SQLiteCacheBackend:
+    """
+    로컬 SQLite 파일에 응답을 보관하는 캐시 백엔드.
+
+    여러 워커 프로세스가 같은 파일을 공유할 수 있고 재시작 후에도 캐시가 유지됩니다.
+    만료 시각(expires_at)이 지난 항목은 조회되지 않으며, max_entries를 넘으면
+    최근 사용 시각(last_access)이 가장 오래된 항목부터 삭제합니다.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl=3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    동일한 LLM 요청에 대한 응답 캐시.
+
+    정규화된 모델 선택, 대화 기록, 프롬프트, 검증 여부로 키를 만들며,
+    저장소는 MemoryCacheBackend 또는 SQLiteCacheBackend 중에서 선택합니다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_choice, chat_history, prompt, use_validation):
+        """요청 구성 요소를 정규화하여 SHA-256 캐시 키를 만듭니다."""
+        normalized = json.dumps({
+            "model": model_choice.strip(),
+            "history": chat_history or [],
+            "prompt": prompt.strip(),
+            "validation": bool(use_validation),
+        }, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_response_cache_from_env():
+    """
+    환경 변수로 응답 캐시를 구성합니다. 캐시를 사용하지 않으면 None을 반환합니다.
+
+    - RESPONSE_CACHE_BACKEND: off(기본) | memory | sqlite
+    - RESPONSE_CACHE_TTL: 만료 시간(초, 기본 3600)
+    - RESPONSE_CACHE_MAX_ENTRIES: 최대 항목 수 (기본 1024)
+    - RESPONSE_CACHE_PATH: sqlite 파일 경로 (기본 <프로젝트>/cache/response_cache.db)
+    """
+    backend_name = os.getenv("RESPONSE_CACHE_BACKEND", "off").lower()
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+    if backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries=max_entries, ttl=ttl)
+    elif backend_name == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "response_cache.db")
+        path = os.getenv("RESPONSE_CACHE_PATH", default_path)
+        backend = SQLiteCacheBackend(path, max_entries=max_entries, ttl=ttl)
+    else:
+        return None
+
+    logger.info(f"Response cache enabled (backend={backend_name}, ttl={ttl}s, max_entries={max_entries})")
+    return ResponseCache(backend)
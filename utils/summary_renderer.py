@@ -0,0 +1,308 @@
+"""
+참고자료(Abstract_*.json) 요약 HTML 렌더러.
+
+모든 값은 요소 본문용으로 이스케이프하며(_e), HTML 조각은 리스트에 모아 마지막에 한 번만 합칩니다.
+문서 유형 감지 규칙(DOCUMENT_TYPE_RULES)과 유형별 본문 렌더러(RENDERERS)는 테이블로 관리하므로,
+새 문서 유형은 register_document_type / register_renderer로 추가합니다.
+"""
+from html import escape
+
+
+def _e(value):
+    """
+    값을 문자열로 변환하여 요소 본문용으로 HTML 이스케이프합니다. (속성 값에는 사용하지 않음)
+
+    요소 본문에서는 따옴표를 이스케이프할 필요가 없으므로 &, <, >만 처리하며, 대부분의 값(한글 본문, 키)에는
+    이 문자들이 없으므로 있을 때만 html.escape를 호출합니다.
+    """
+    if type(value) is not str:
+        value = str(value)
+    if '&' in value or '<' in value or '>' in value:
+        return escape(value, quote=False)
+    return value
+
+
+# --- 문서 정보 추출 ---
+def get_document_title(content):
+    """스키마별로 다른 프로젝트 이름 키를 순서대로 확인하여 문서 제목을 반환합니다."""
+    return (content.get('프로젝트 이름') or
+            content.get('프로젝트이름') or
+            content.get('프로젝트_이름') or
+            content.get('reportTitle') or
+            content.get('original_file_name', '문서'))
+
+
+def get_document_keywords(content):
+    """스키마별로 다른 키워드 키를 순서대로 확인하여 핵심 키워드 목록을 반환합니다."""
+    return (content.get('핵심키워드') or
+            content.get('핵심_키워드') or
+            content.get('주요 키워드 10개') or
+            content.get('keywords', []))
+
+
+# --- 문서 유형 감지 규칙 테이블 ---
+# (문서 유형, 판별 함수) 목록을 순서대로 검사하여 처음 일치하는 유형을 사용합니다.
+DOCUMENT_TYPE_RULES = []
+
+
+def register_document_type(doc_type):
+    """문서 유형 판별 함수를 규칙 테이블 끝에 등록하는 데코레이터."""
+    def decorator(func):
+        DOCUMENT_TYPE_RULES.append((doc_type, func))
+        return func
+    return decorator
+
+
+@register_document_type('proposal')
+def _is_proposal(content):
+    return '제안' in content.get('프로젝트 이름', '') or '제안' in content.get('original_file_name', '')
+
+
+@register_document_type('kickoff')
+def _is_kickoff(content):
+    original_name = content.get('original_file_name', '')
+    return '착수' in original_name or 'kickoff' in original_name.lower()
+
+
+@register_document_type('environment')
+def _is_environment(content):
+    original_name = content.get('original_file_name', '')
+    return '환경분석' in original_name or 'Env' in original_name
+
+
+@register_document_type('it_analysis')
+def _is_it_analysis(content):
+    return 'IT' in content.get('original_file_name', '') or 'IT' in content.get('프로젝트_이름', '')
+
+
+def detect_document_type(content):
+    """JSON 내용을 분석하여 문서 유형을 감지합니다. 일치하는 규칙이 없으면 'generic'을 반환합니다."""
+    for doc_type, matches in DOCUMENT_TYPE_RULES:
+        if matches(content):
+            return doc_type
+    return 'generic'
+
+
+# --- 문서 유형별 렌더러 테이블 ---
+RENDERERS = {}
+
+
+def register_renderer(doc_type):
+    """문서 유형별 본문 렌더러를 등록하는 데코레이터. 렌더러는 (content, out) 인자를 받아 out에 조각을 추가합니다."""
+    def decorator(func):
+        RENDERERS[doc_type] = func
+        return func
+    return decorator
+
+
+def render_summary_html(content):
+    """JSON 내용을 문서 유형에 따라 최적화된 HTML로 생성합니다."""
+    out = ['<div class="reference-content">']
+    render_header_section(content, out)
+    renderer = RENDERERS.get(detect_document_type(content), RENDERERS['generic'])
+    renderer(content, out)
+    out.append('</div>')
+    return ''.join(out)
+
+
+# --- 공통 섹션 ---
+def render_header_section(content, out):
+    """공통 헤더 섹션(제목, 원본 파일, 핵심 키워드)을 생성합니다."""
+    out.append(f'<h1 class="document-title">{_e(get_document_title(content))}</h1>')
+
+    original_name = content.get('original_file_name') or content.get('원본이름')
+    if original_name:
+        out.append(f'<div class="file-info"><strong>원본 파일:</strong> {_e(original_name)}</div>')
+
+    keywords = get_document_keywords(content)
+    if keywords:
+        out.append('<div class="keywords-section"><h3>핵심 키워드</h3><div class="keywords-container">')
+        out.extend(f'<span class="keyword-tag">{_e(keyword)}</span>' for keyword in keywords[:15])
+        out.append('</div></div>')
+
+
+def _render_subsection(title, body, out):
+    out.append(f'<div class="subsection"><h4>{_e(title)}</h4><p>{_e(body)}</p></div>')
+
+
+def _render_objectives(heading, objectives, out):
+    out.append(f'<section class="report-objectives"><h2>{_e(heading)}</h2><ul class="objectives-list">')
+    out.extend(f'<li>{_e(objective)}</li>' for objective in objectives)
+    out.append('</ul></section>')
+
+
+def render_table_of_contents(toc_data, out):
+    """목차 정보를 HTML로 생성합니다."""
+    out.append('<section class="table-of-contents"><h2>보고서 목차</h2><div class="toc-container">')
+    if isinstance(toc_data, list):
+        for item in toc_data:
+            if isinstance(item, dict):
+                out.append(f'<div class="toc-major">{_e(item.get("대분류", ""))}</div>')
+                if item.get("소분류"):
+                    out.extend(f'<div class="toc-minor">• {_e(sub_item)}</div>' for sub_item in item["소분류"])
+            else:
+                out.append(f'<div class="toc-item">{_e(item)}</div>')
+    out.append('</div></section>')
+
+
+def render_hierarchical_toc(toc_data, out):
+    """계층적 목차를 HTML로 생성합니다."""
+    out.append('<section class="table-of-contents"><h2>보고서 목차</h2><div class="toc-hierarchical">')
+    for key, value in toc_data.items():
+        level = len(key.split('.'))
+        out.append(f'<div class="toc-level-{min(level, 4)}"><strong>{_e(key)}</strong> {_e(value)}</div>')
+    out.append('</div></section>')
+
+
+def render_content_summary(summary_data, out):
+    """본문 요약을 HTML로 생성합니다."""
+    out.append('<section class="content-summary"><h2>상세 내용</h2>')
+    if isinstance(summary_data, list):
+        for item in summary_data:
+            if isinstance(item, dict):
+                out.append(f'<div class="summary-item"><h4>{_e(item.get("세부목차", ""))}</h4>'
+                           f'<p>{_e(item.get("내용", ""))}</p></div>')
+    elif isinstance(summary_data, dict):
+        for key, value in summary_data.items():
+            out.append(f'<div class="summary-item"><h4>{_e(key.replace("_", " "))}</h4><p>{_e(value)}</p></div>')
+    out.append('</section>')
+
+
+def _render_analysis_items(heading, items, out, skip_keys=()):
+    out.append(f'<section class="content-summary"><h2>{_e(heading)}</h2>')
+    for key, value in items.items():
+        if key in skip_keys:
+            continue
+        out.append(f'<div class="analysis-item"><h4>{_e(key.replace("_", " "))}</h4><p>{_e(value)}</p></div>')
+    out.append('</section>')
+
+
+def render_key_findings(findings_data, out):
+    """개선기회 및 Key Finding을 HTML로 생성합니다."""
+    out.append('<section class="key-findings"><h2>핵심 발견사항 및 개선기회</h2>')
+    for item in findings_data:
+        # 유형별 아이콘 추가
+        finding_type = item.get('유형') or item.get('구분', '')
+        icon = '💡' if '개선기회' in finding_type else '🔍' if 'Key Finding' in finding_type else '📋'
+        content = item.get('요약내용') or item.get('내용', '')
+        out.append(
+            '<div class="finding-item"><div class="finding-header">'
+            f'<span class="finding-icon">{icon}</span>'
+            f'<span class="finding-type">{_e(finding_type)}</span>'
+            f'<span class="finding-title">{_e(item.get("장표제목", ""))}</span>'
+            f'</div><div class="finding-content">{_e(content)}</div></div>'
+        )
+    out.append('</section>')
+
+
+def render_improvement_opportunities(opportunities, out):
+    """개선기회를 HTML로 생성합니다."""
+    out.append('<section class="improvement-opportunities"><h2>개선기회</h2>')
+    for opportunity in opportunities:
+        out.append(f'<div class="opportunity-item"><h4>💡 {_e(opportunity.get("세부목차", ""))}</h4>'
+                   f'<div class="opportunity-content">{_e(opportunity.get("요약내용", ""))}</div></div>')
+    out.append('</section>')
+
+
+def render_implementation_plan(plan_data, out):
+    """수행방안을 HTML로 생성합니다."""
+    out.append('<section class="implementation-plan"><h2>수행 방안</h2>')
+    for key, value in plan_data.items():
+        out.append(f'<div class="plan-section"><h3>{_e(key)}</h3>')
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                out.append(f'<div class="plan-subsection"><h4>{_e(sub_key)}</h4><p>{_e(sub_value)}</p></div>')
+        else:
+            out.append(f'<p>{_e(value)}</p>')
+        out.append('</div>')
+    out.append('</section>')
+
+
+# --- 문서 유형별 본문 렌더러 ---
+@register_renderer('proposal')
+def render_proposal_content(content, out):
+    """제안서 유형의 컨텐츠를 생성합니다."""
+    out.append('<section class="project-overview"><h2>프로젝트 개요</h2>')
+    if content.get('고객사 이름'):
+        out.append(f'<div class="info-item"><strong>고객사:</strong> {_e(content["고객사 이름"])}</div>')
+    for key, title in (('프로젝트(제안)의 배경', '프로젝트 배경'),
+                       ('프로젝트(제안)의 범위', '프로젝트 범위'),
+                       ('프로젝트(제안)의 목적', '프로젝트 목적')):
+        if content.get(key):
+            _render_subsection(title, content[key], out)
+    out.append('</section>')
+
+    out.append('<section class="proposal-strategy"><h2>제안 전략 및 특장점</h2>')
+    for key, title in (('제안 전략 혹은 컨설팅 전략', '컨설팅 전략'),
+                       ('제안의 특장점', '제안의 특장점'),
+                       ('기대효과', '기대 효과')):
+        if content.get(key):
+            _render_subsection(title, content[key], out)
+    out.append('</section>')
+
+    if content.get('수행방안 혹은 컨설팅 방안'):
+        render_implementation_plan(content['수행방안 혹은 컨설팅 방안'], out)
+
+
+@register_renderer('kickoff')
+def render_kickoff_content(content, out):
+    """착수보고서 유형의 컨텐츠를 생성합니다."""
+    if content.get('보고서목표'):
+        _render_objectives('프로젝트 목표', content['보고서목표'], out)
+    if content.get('보고서목차'):
+        render_table_of_contents(content['보고서목차'], out)
+    if content.get('본문요약'):
+        render_content_summary(content['본문요약'], out)
+    if content.get('개선기회키파인딩'):
+        render_key_findings(content['개선기회키파인딩'], out)
+
+
+@register_renderer('environment')
+def render_environment_content(content, out):
+    """환경분석서 유형의 컨텐츠를 생성합니다."""
+    if content.get('보고서목표'):
+        _render_objectives('분석 목표', content['보고서목표'], out)
+    if content.get('보고서목차'):
+        out.append('<section class="table-of-contents"><h2>보고서 목차</h2><div class="toc-container">')
+        out.extend(f'<div class="toc-item"><strong>{_e(key)}.</strong> {_e(value)}</div>'
+                   for key, value in content['보고서목차'].items())
+        out.append('</div></section>')
+    if content.get('본문요약'):
+        _render_analysis_items('상세 분석 내용', content['본문요약'], out, skip_keys=('수행단계', '환경분석프로세스'))
+    if content.get('개선기회'):
+        render_improvement_opportunities(content['개선기회'], out)
+
+
+@register_renderer('it_analysis')
+def render_it_analysis_content(content, out):
+    """IT 현황분석서 유형의 컨텐츠를 생성합니다."""
+    if content.get('보고서의_목표'):
+        _render_objectives('분석 목표', content['보고서의_목표'], out)
+    if content.get('보고서_목차'):
+        render_hierarchical_toc(content['보고서_목차'], out)
+    if content.get('본문_요약'):
+        _render_analysis_items('IT 현황 분석 결과', content['본문_요약'], out)
+    if content.get('개선기회_key_finding'):
+        render_key_findings(content['개선기회_key_finding'], out)
+
+
+GENERIC_SKIP_KEYS = {'original_file_name', '원본이름', '핵심키워드', '핵심_키워드', '주요 키워드 10개', 'keywords'}
+
+
+@register_renderer('generic')
+def render_generic_content(content, out):
+    """일반적인 문서 유형의 컨텐츠를 생성합니다."""
+    for key, value in content.items():
+        if key in GENERIC_SKIP_KEYS:
+            continue
+        out.append(f'<section class="content-section"><h2>{_e(key.replace("_", " "))}</h2>')
+        if isinstance(value, list):
+            out.append('<ul>')
+            out.extend(f'<li>{_e(item)}</li>' for item in value)
+            out.append('</ul>')
+        elif isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                out.append(f'<h4>{_e(sub_key)}</h4><p>{_e(sub_value)}</p>')
+        else:
+            out.append(f'<p>{_e(value)}</p>')
+        out.append('</section>')
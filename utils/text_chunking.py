@@ -0,0 +1,91 @@
+import math
+import re
+
+# backend.build_prompt_with_uploads가 프롬프트 앞에 붙이는 첨부 파일 블록
+ATTACHMENT_BLOCK = re.compile(r"--- 파일: (?P<name>.+?) ---\n(?P<body>.*?)\n--- 파일 끝 ---\n?", re.S)
+
+# 장/절 번호, 로마 숫자, "1.2.3", "가.", 마크다운 헤더 등 섹션 시작으로 볼 수 있는 줄
+SECTION_HEADING = re.compile(
+    r'^\s*(?:제\s*\d+\s*[장절편]|[IVXⅠ-Ⅻ]+\.\s|\d+(?:\.\d+)*\.?\s|[가-하]\.\s|#{1,6}\s|[■□●◆▶]\s?)'
+)
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 토큰 수를 대략적으로 추정합니다.
+
+    영문/숫자는 약 4자당 1토큰, 한글 등 비ASCII 문자는 약 1.5자당 1토큰으로 계산합니다.
+    정확한 토크나이저 없이 예산 관리에 쓰기 위한 보수적인 추정값입니다.
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_chars / 1.5)
+
+
+def clip_tokens(text, max_tokens):
+    """텍스트를 대략 max_tokens 토큰 이내로 자릅니다."""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    return text[:max(1, int(len(text) * max_tokens / tokens))].rstrip() + " …(생략)"
+
+
+def strip_attachments(text):
+    """첨부 파일 블록을 파일 이름 참조로 바꿉니다."""
+    return ATTACHMENT_BLOCK.sub(lambda m: f"[첨부: {m.group('name')}]\n", text)
+
+
+def split_sections(text):
+    """텍스트를 섹션 제목으로 보이는 줄 앞에서 나눕니다. 제목이 없으면 빈 줄(문단) 단위로 나눕니다."""
+    lines = text.splitlines(keepends=True)
+    sections = []
+    current = []
+    for line in lines:
+        if current and SECTION_HEADING.match(line):
+            sections.append(''.join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append(''.join(current))
+    if len(sections) <= 1:
+        sections = [p for p in re.split(r'(\n\s*\n)', text) if p]
+    return sections
+
+
+def _split_oversized(text, max_chars):
+    """max_chars보다 긴 텍스트를 섹션 → 문단 → 고정 길이 순으로 잘게 나눕니다."""
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    for section in split_sections(text):
+        if len(section) <= max_chars:
+            pieces.append(section)
+        else:
+            pieces.extend(section[i:i + max_chars] for i in range(0, len(section), max_chars))
+    return pieces
+
+
+def split_into_chunks(pages, max_chars=12000):
+    """
+    페이지 텍스트 목록을 max_chars 이하의 청크로 묶습니다.
+
+    가능한 한 페이지 경계에서 나누고, 한 페이지가 max_chars를 넘으면 섹션/문단 경계에서 나눕니다.
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for page in pages:
+        for piece in _split_oversized(page, max_chars):
+            if current and current_len + len(piece) > max_chars:
+                chunks.append(''.join(current))
+                current = []
+                current_len = 0
+            current.append(piece)
+            current_len += len(piece)
+    if current:
+        chunks.append(''.join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -0,0 +1,90 @@
+import os
+
+TEXT_EXTENSIONS = ['.txt', '.md', '.json', '.csv', '.py', '.html', '.css', '.js']
+DEFAULT_MAX_CHARS = 15000
+
+
+def _fitz():
+    """PyMuPDF는 불러오는 비용이 커서 서버 시작을 늦추므로 PDF를 처음 읽을 때 불러옵니다."""
+    import fitz  # PyMuPDF
+    return fitz
+
+
+def extract_text(data, filename, max_chars=DEFAULT_MAX_CHARS):
+    """
+    메모리에 있는 파일 바이트에서 텍스트를 추출합니다.
+
+    PDF는 `fitz.open(stream=...)`으로 디스크를 거치지 않고 열며, 누적 글자 수가
+    max_chars에 도달하면 나머지 페이지는 읽지 않습니다.
+
+    Args:
+        data (bytes): 파일 내용.
+        filename (str): 확장자 판별에 사용할 파일 이름.
+        max_chars (int | None): 추출할 최대 글자 수. None이면 제한하지 않습니다.
+
+    Returns:
+        str | None: 추출된 텍스트. 지원하지 않는 형식이면 None.
+
+    Raises:
+        Exception: 파일을 파싱하거나 디코딩하지 못한 경우.
+    """
+    _, file_extension = os.path.splitext(filename)
+    file_extension = file_extension.lower()
+
+    if file_extension == '.pdf':
+        with _fitz().open(stream=data, filetype='pdf') as doc:
+            return _read_pdf_pages(doc, max_chars)
+    elif file_extension in TEXT_EXTENSIONS:
+        text = data.decode('utf-8')
+        return text[:max_chars] if max_chars is not None else text
+    else:
+        return None
+
+
+def extract_text_from_path(file_path, max_chars=DEFAULT_MAX_CHARS):
+    """파일 경로에서 텍스트를 추출합니다. 동작은 extract_text와 같습니다."""
+    _, file_extension = os.path.splitext(file_path)
+    file_extension = file_extension.lower()
+
+    if file_extension == '.pdf':
+        with _fitz().open(file_path) as doc:
+            return _read_pdf_pages(doc, max_chars)
+    elif file_extension in TEXT_EXTENSIONS:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read(max_chars) if max_chars is not None else f.read()
+    else:
+        return None
+
+
+def extract_pages_from_path(file_path):
+    """
+    파일 경로에서 페이지 단위 텍스트 목록을 추출합니다. 글자 수 제한 없이 전체를 읽습니다.
+
+    PDF는 페이지마다 하나의 항목을, 텍스트 파일은 전체를 하나의 항목으로 반환합니다.
+    지원하지 않는 형식이면 None을 반환합니다.
+    """
+    _, file_extension = os.path.splitext(file_path)
+    file_extension = file_extension.lower()
+
+    if file_extension == '.pdf':
+        with _fitz().open(file_path) as doc:
+            return [page.get_text() for page in doc]
+    elif file_extension in TEXT_EXTENSIONS:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [f.read()]
+    else:
+        return None
+
+
+def _read_pdf_pages(doc, max_chars):
+    """글자 수 한도에 도달할 때까지만 페이지 텍스트를 모아 하나의 문자열로 합칩니다."""
+    parts = []
+    length = 0
+    for page in doc:
+        text = page.get_text()
+        parts.append(text)
+        length += len(text)
+        if max_chars is not None and length >= max_chars:
+            break
+    content = "".join(parts)
+    return content[:max_chars] if max_chars is not None else content